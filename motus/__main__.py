@@ -2,16 +2,36 @@
 
 import argparse
 import asyncio
+import contextlib
+import functools
 import importlib
 import logging
+import os
+import queue
+import shutil
+import signal
 import sys
+import tempfile
+from collections.abc import Coroutine, Iterator
 from pathlib import Path
+from typing import Any
 
+from aiohttp import web
+
+from motus import bench, exporter, metrics, tracing
+from motus.breaker import BREAKER_POLICIES, BreakerRegistry
 from motus.core import DecisionEngine
+from motus.event_queue import QUEUE_POLICIES, EventQueue
 from motus.logging_config import setup_logging
 from motus.persistence import Persistence
 from motus.registry import ADAPTER_REGISTRY, INGESTOR_REGISTRY
-from motus.utils import load_rules_from_folder, watch_rules_folder
+from motus.retry import RetryPolicy
+from motus.sharding import INBOX_POLL_SECONDS, ShardRouter, WorkerPool
+from motus.spool import DeadLetterSpool
+from motus.utils import RuleCache, load_rules_from_folder, watch_rules_folder
+
+# Seconds replaced adapters stay open so in-flight actions can complete.
+_ADAPTER_RETIRE_GRACE = 30.0
 
 
 def _collect_plugin_requirements(rules: list[dict]) -> tuple[dict, dict]:
@@ -49,29 +69,27 @@ def _normalize_rules(rules: list[dict]) -> list[dict]:
     """Normalize rule fields: enforce lists for 'when' and 'then'."""
     normalized: list[dict] = []
     for rule in rules:
-        rule_copy = dict(rule)
-
-        when = rule_copy.get("when")
+        when = rule.get("when")
         if not isinstance(when, list):
             msg = "Rule '{}' must define 'when' as a list".format(
-                rule_copy.get(
+                rule.get(
                     "name",
                     "<unnamed>",
                 ),
             )
             raise TypeError(msg)
 
-        then = rule_copy.get("then")
+        then = rule.get("then")
         if not isinstance(then, list):
             msg = "Rule '{}' must define 'then' as a list of actions".format(
-                rule_copy.get(
+                rule.get(
                     "name",
                     "<unnamed>",
                 ),
             )
             raise TypeError(msg)
 
-        normalized.append(rule_copy)
+        normalized.append(rule)
 
     return normalized
 
@@ -168,18 +186,340 @@ def _build_stack_with_retry(
         return build_stack_from_rules(rules)
 
 
-async def _run_engine(rules_folder: str, plugins_root: str | None) -> None:
-    """Run Motus using the provided rules folder and plugin root."""
+async def _start_adapters(adapters: list, logger: logging.Logger) -> None:
+    """Run adapter startup hooks (open sessions, pools)."""
+    for adapter in adapters:
+        await adapter.startup()
+    logger.debug("Started %d adapter(s)", len(adapters))
+
+
+async def _stop_adapters(adapters: list, logger: logging.Logger) -> None:
+    """Run adapter shutdown hooks, logging failures."""
+    for adapter in adapters:
+        try:
+            await adapter.shutdown()
+        except Exception:
+            logger.exception(
+                "Adapter shutdown failed: %s",
+                adapter.__class__.__name__,
+            )
+
+
+async def _retire_adapters(adapters: list, logger: logging.Logger) -> None:
+    """Shut replaced adapters down once in-flight actions had time to finish."""
+    try:
+        await asyncio.sleep(_ADAPTER_RETIRE_GRACE)
+    finally:
+        await _stop_adapters(adapters, logger)
+
+
+@contextlib.contextmanager
+def _cancel_on_signals(
+    future: asyncio.Future,
+    logger: logging.Logger,
+) -> Iterator[None]:
+    """Cancel `future` on SIGTERM or SIGINT while the block runs.
+
+    The caller's cleanup then closes the engine, the adapters and the audit
+    database. A second signal during that cleanup has its default effect.
+    """
+    loop = asyncio.get_running_loop()
+    signals = (signal.SIGTERM, signal.SIGINT)
+
+    def _stop(signum: int) -> None:
+        logger.info("Received %s, shutting down", signal.Signals(signum).name)
+        future.cancel()
+
+    for signum in signals:
+        loop.add_signal_handler(signum, _stop, signum)
+    try:
+        yield
+    finally:
+        for signum in signals:
+            loop.remove_signal_handler(signum)
+
+
+async def _run_until_signalled(
+    tasks: list[Any],
+    logger: logging.Logger,
+) -> None:
+    """Run `tasks` together until one fails or a stop signal arrives."""
+    running = asyncio.gather(*tasks)
+    try:
+        with _cancel_on_signals(running, logger):
+            await running
+    except asyncio.CancelledError:
+        current = asyncio.current_task()
+        if current is not None and current.cancelling():
+            raise
+
+
+class _InboxClosedError(Exception):
+    """Raised in an engine worker once its inbox is closed and drained."""
+
+
+async def _drain_inbox(inbox: Any, event_queue: EventQueue) -> None:  # noqa: ANN401
+    """Move events from a worker's inter-process inbox to its event queue."""
+    get = functools.partial(inbox.get, timeout=INBOX_POLL_SECONDS)
+    while True:
+        try:
+            event = await asyncio.to_thread(get)
+        except queue.Empty:
+            continue
+        if event is None:
+            await event_queue.join()
+            raise _InboxClosedError
+        await event_queue.put(event)
+
+
+def _worker_main(
+    shard: int,
+    inbox: Any,  # noqa: ANN401
+    rules_folder: str,
+    plugins_root: str | None,
+    settings: dict[str, Any],
+) -> None:
+    """Run one engine worker process fed by the sharding front-end."""
+    rules_cache = settings["rules_cache"]
+    dead_letter_dir = settings["dead_letter_dir"]
+    try:
+        asyncio.run(
+            _run_engine(
+                rules_folder,
+                plugins_root,
+                event_queue=EventQueue(**settings["queue"]),
+                persistence=Persistence(**_shard_audit(settings["audit"], shard)),
+                rule_cache=RuleCache(rules_cache) if rules_cache else None,
+                inbox=inbox,
+                tracer=_tracer(settings["trace"]),
+                replay_dead_letters=settings["dead_letter_replay"],
+                dead_letters=DeadLetterSpool(Path(dead_letter_dir) / f"shard-{shard}")
+                if dead_letter_dir
+                else None,
+                **settings["engine"],
+            ),
+        )
+    except (_InboxClosedError, KeyboardInterrupt):
+        logging.getLogger("motus.main").info("Engine worker %d stopped", shard)
+
+
+def _shard_audit(audit: dict[str, Any], shard: int) -> dict[str, Any]:
+    """Return the audit settings of one worker: its own database and archive.
+
+    Workers sharing one SQLite file would contend for its write lock and
+    each run retention on it, archiving and dropping the same partitions.
+    """
+    db_path = Path(audit.get("db_path", "motus.db"))
+    archive_dir = audit.get("archive_dir")
+    return {
+        **audit,
+        "db_path": str(db_path.with_stem(f"{db_path.stem}-shard-{shard}")),
+        "archive_dir": str(Path(archive_dir) / f"shard-{shard}")
+        if archive_dir
+        else None,
+    }
+
+
+def _tracer(options: dict[str, float] | None) -> tracing.Tracer | None:
+    """Build the event tracer configured on the command line, if any."""
+    return tracing.Tracer(**options) if options is not None else None
+
+
+async def _run_frontend(  # noqa: PLR0913
+    rules_folder: str,
+    plugins_root: str | None,
+    pool: WorkerPool,
+    router: ShardRouter,
+    *,
+    rule_cache: RuleCache | None = None,
+    metrics_address: tuple[str, int] | None = None,
+) -> None:
+    """Run the ingestors and hand every event to its engine worker process.
+
+    Rules are only read here to know which ingestors to start; each worker
+    loads and reloads them on its own. Metrics of all processes are served
+    on `metrics_address` when given. SIGTERM and SIGINT stop the ingestors
+    and let the workers finish their queued events.
+    """
+    setup_logging()
+    logger = logging.getLogger("motus.main")
+    logger.info("Motus front-end starting %d engine worker(s)", len(pool.queues))
+    import_all_plugins(plugins_root)
+    rules = _normalize_rules(load_rules_from_folder(rules_folder, rule_cache))
+    ingestor_defs, _, _ = _build_stack_with_retry(rules, plugins_root, logger)
+    ingestors: dict[str, asyncio.Task] = {}
+
+    def _start_ingestors(defs: list) -> None:
+        for ing_cls, params in defs:
+            key = getattr(ing_cls, "plugin_name", ing_cls.__name__)
+            if key in ingestors and not ingestors[key].done():
+                continue
+            instance = ing_cls(router.offer, **params)
+            instance.put_callback = router.put
+            instance.batch_callback = router.offer_batch
+            ingestors[key] = asyncio.create_task(instance.start())
+            logger.info(
+                "Ingestor started: %s with params %s",
+                ing_cls.__name__,
+                params,
+            )
+
+    async def _refresh_ingestors(updated_rules: list[dict]) -> None:
+        try:
+            defs, _, _ = _build_stack_with_retry(
+                _normalize_rules(updated_rules),
+                plugins_root,
+                logger,
+            )
+        except (RuntimeError, TypeError):
+            logger.exception("Reload failed during ingestor rebuild")
+            return
+        _start_ingestors(defs)
+
+    pool.start()
+    _start_ingestors(ingestor_defs)
+    metrics_runner = await _start_exporter(metrics_address, logger)
+    logger.info(
+        "Routing events by '%s' with policy %s",
+        router.key,
+        router.policy,
+    )
+    try:
+        await _run_until_signalled(
+            [
+                pool.supervise(),
+                watch_rules_folder(
+                    rules_folder,
+                    None,
+                    logger=logging.getLogger("motus.rules_watcher"),
+                    on_change=_refresh_ingestors,
+                    cache=rule_cache,
+                ),
+                *ingestors.values(),
+            ],
+            logger,
+        )
+    finally:
+        for task in ingestors.values():
+            task.cancel()
+        await _stop_exporter(metrics_runner)
+        await asyncio.to_thread(pool.stop)
+
+
+async def _start_exporter(
+    address: tuple[str, int] | None,
+    logger: logging.Logger,
+    tracer: tracing.Tracer | None = None,
+) -> web.AppRunner | None:
+    """Serve `/metrics` on `address` (host, port) when one is configured.
+
+    The `/debug` endpoints are added when a `tracer` is given.
+    """
+    if address is None:
+        return None
+    runner = await exporter.start_metrics_server(*address, tracer=tracer)
+    logger.info("Metrics served on http://%s:%d%s", *address, exporter.METRICS_PATH)
+    return runner
+
+
+async def _stop_exporter(runner: web.AppRunner | None) -> None:
+    """Shut down a metrics server started by `_start_exporter`."""
+    if runner is not None:
+        await runner.cleanup()
+
+
+def _metrics_folder() -> Path:
+    """Return the metrics directory owned by this process (kept across exec)."""
+    return Path(tempfile.gettempdir()) / f"motus-metrics-{os.getpid()}"
+
+
+def _enable_multiprocess_metrics() -> None:
+    """Re-execute with a shared Prometheus directory for all processes.
+
+    prometheus_client picks its storage when imported, so the variable must
+    be set before this process imports it again. The process image is
+    replaced (same pid, so `_metrics_folder` still matches) by the exact
+    original command line, interpreter options included, and inherits the
+    environment plus that variable. The variable being set is what stops
+    the new process from re-executing again.
+    """
+    if os.environ.get(metrics.MULTIPROC_ENV):
+        return
+    folder = _metrics_folder()
+    shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True)
+    os.environ[metrics.MULTIPROC_ENV] = str(folder)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execv(sys.executable, sys.orig_argv)  # noqa: S606
+
+
+def _cleanup_multiprocess_metrics() -> None:
+    """Remove the metrics directory created by `_enable_multiprocess_metrics`."""
+    folder = _metrics_folder()
+    if os.environ.get(metrics.MULTIPROC_ENV) == str(folder):
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _engine_jobs(
+    engine: DecisionEngine,
+    event_queue: EventQueue,
+    inbox: Any | None,  # noqa: ANN401
+    *,
+    replay_dead_letters: bool,
+) -> list[Coroutine[Any, Any, object]]:
+    """Return the optional jobs running next to the engine workers."""
+    jobs: list[Coroutine[Any, Any, object]] = []
+    if inbox is not None:
+        jobs.append(_drain_inbox(inbox, event_queue))
+    if replay_dead_letters:
+        jobs.append(engine.replay_dead_letters())
+    return jobs
+
+
+async def _run_engine(  # noqa: PLR0913, PLR0915
+    rules_folder: str,
+    plugins_root: str | None,
+    *,
+    event_queue: EventQueue | None = None,
+    persistence: Persistence | None = None,
+    rule_cache: RuleCache | None = None,
+    inbox: Any | None = None,  # noqa: ANN401
+    metrics_address: tuple[str, int] | None = None,
+    tracer: tracing.Tracer | None = None,
+    replay_dead_letters: bool = False,
+    **engine_options: object,
+) -> None:
+    """Run Motus using the provided rules folder and plugin root.
+
+    Events flow from ingestors through `event_queue` to the engine workers and
+    decisions are audited through `persistence`. Parsed rule files are reused
+    from `rule_cache` when given. With an `inbox` (a multiprocessing queue fed
+    by the sharding front-end) no ingestors are started and events are read
+    from it instead. Metrics are served on `metrics_address` (host, port)
+    when given, along with the debug endpoints of `tracer`. With
+    `replay_dead_letters` the engine's dead-letter spool is replayed once the
+    engine runs. Extra keyword arguments are forwarded to the DecisionEngine.
+
+    SIGTERM and SIGINT stop the ingestors and close the engine (emitting open
+    aggregate windows and spooling pending retries), the adapters and the
+    audit database, so write-behind records are flushed.
+    """
+    event_queue = event_queue or EventQueue()
     setup_logging()
     logger = logging.getLogger("motus.main")
     logger.info("Motus is starting up...")
     import_all_plugins(plugins_root)
     extra = f" + custom from {plugins_root}" if plugins_root else ""
     logger.info("Plugins imported: bundled motus/plugins%s", extra)
-    rules = _normalize_rules(load_rules_from_folder(rules_folder))
+    rules = _normalize_rules(load_rules_from_folder(rules_folder, rule_cache))
     logger.info("Loaded %d rule(s) from folder '%s'", len(rules), rules_folder)
-    persistence = Persistence()
-    logger.info("Persistence initialized")
+    persistence = persistence or Persistence()
+    await persistence.start()
+    logger.info(
+        "Persistence initialized (%s)",
+        "write-behind" if persistence.write_behind else "synchronous",
+    )
     ingestor_defs, adapters, rules = _build_stack_with_retry(
         rules,
         plugins_root,
@@ -189,16 +529,25 @@ async def _run_engine(rules_folder: str, plugins_root: str | None) -> None:
         "Adapters loaded: %s",
         [adapter.__class__.__name__ for adapter in adapters],
     )
-    engine = DecisionEngine(rules, adapters, persistence)
+    await _start_adapters(adapters, logger)
+    engine = DecisionEngine(
+        rules,
+        adapters,
+        persistence,
+        tracer=tracer,
+        **engine_options,
+    )
     logger.info("DecisionEngine ready")
     # Instantiate and start all ingestors; track them by plugin name
     ingestors: dict[str, asyncio.Task] = {}
 
     async def _start_ingestor(ing_cls: type, params: dict) -> None:
         instance = ing_cls(
-            lambda event: asyncio.create_task(engine.handle_event(event)),
+            event_queue.offer,
             **params,
         )
+        instance.put_callback = event_queue.put
+        instance.batch_callback = event_queue.offer_batch
         task = asyncio.create_task(instance.start())
         key = getattr(ing_cls, "plugin_name", ing_cls.__name__)
         ingestors[key] = task
@@ -208,8 +557,11 @@ async def _run_engine(rules_folder: str, plugins_root: str | None) -> None:
             params,
         )
 
-    for ing_cls, params in ingestor_defs:
-        await _start_ingestor(ing_cls, params)
+    if inbox is None:
+        for ing_cls, params in ingestor_defs:
+            await _start_ingestor(ing_cls, params)
+
+    retiring: set[asyncio.Task] = set()
 
     async def _reload_stack(updated_rules: list[dict]) -> None:
         """Reload plugins and rebuild adapters/ingestors when rules change."""
@@ -224,9 +576,13 @@ async def _run_engine(rules_folder: str, plugins_root: str | None) -> None:
             logger.exception("Reload failed during stack rebuild")
             return
 
-        engine.adapters = new_adapters
-        engine.rules = normalized_rules
-        for ing_cls, params in ing_defs:
+        await _start_adapters(new_adapters, logger)
+        old_adapters = engine.adapters
+        await engine.reload(normalized_rules, new_adapters)
+        retirement = asyncio.create_task(_retire_adapters(old_adapters, logger))
+        retiring.add(retirement)
+        retirement.add_done_callback(retiring.discard)
+        for ing_cls, params in ing_defs if inbox is None else ():
             key = getattr(ing_cls, "plugin_name", ing_cls.__name__)
             if key not in ingestors or ingestors[key].done():
                 await _start_ingestor(ing_cls, params)
@@ -238,6 +594,22 @@ async def _run_engine(rules_folder: str, plugins_root: str | None) -> None:
         )
 
     tasks = list(ingestors.values())
+    tasks.append(event_queue.run(engine.handle_event))
+    tasks.extend(
+        _engine_jobs(
+            engine,
+            event_queue,
+            inbox,
+            replay_dead_letters=replay_dead_letters,
+        ),
+    )
+    logger.info(
+        "Event queue ready: size %d, policy %s, %d worker(s)",
+        event_queue.maxsize,
+        event_queue.policy,
+        event_queue.workers,
+    )
+    metrics_runner = await _start_exporter(metrics_address, logger, tracer)
     watcher = logging.getLogger("motus.rules_watcher")
     tasks.append(
         watch_rules_folder(
@@ -245,13 +617,24 @@ async def _run_engine(rules_folder: str, plugins_root: str | None) -> None:
             engine,
             logger=watcher,
             on_change=_reload_stack,
+            cache=rule_cache,
         ),
     )
-    await asyncio.gather(*tasks)
-
-
-def main() -> None:
-    """CLI entrypoint to start Motus with the provided rules and plugins."""
+    try:
+        await _run_until_signalled(tasks, logger)
+    finally:
+        stopping = [*ingestors.values(), *retiring]
+        for task in stopping:
+            task.cancel()
+        await asyncio.gather(*stopping, return_exceptions=True)
+        await engine.close()
+        await _stop_adapters(engine.adapters, logger)
+        await persistence.close()
+        await _stop_exporter(metrics_runner)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Return the command line parser of the engine."""
     parser = argparse.ArgumentParser(description="Motus Event-Driven Automation Engine")
     parser.add_argument(
         "--rules-folder",
@@ -265,10 +648,299 @@ def main() -> None:
         default=None,
         help="Optional custom root containing ingestors/ and adapters/",
     )
+    parser.add_argument(
+        "--adapter-concurrency",
+        type=int,
+        default=None,
+        help="Maximum in-flight actions per adapter (default: unlimited)",
+    )
+    parser.add_argument(
+        "--action-timeout",
+        type=float,
+        default=None,
+        help="Timeout in seconds applied to each action (default: none)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help=(
+            "Group actions marked batch: true for batch-capable adapters "
+            "(1 disables batching)"
+        ),
+    )
+    parser.add_argument(
+        "--batch-linger",
+        type=float,
+        default=0.05,
+        help="Maximum seconds an action waits for its batch to fill",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=10000,
+        help="Maximum number of events buffered before the queue policy applies",
+    )
+    parser.add_argument(
+        "--queue-policy",
+        choices=QUEUE_POLICIES,
+        default="block",
+        help="Behavior when the event queue is full",
+    )
+    parser.add_argument(
+        "--engine-workers",
+        type=int,
+        default=8,
+        help="Number of workers draining the event queue",
+    )
+    parser.add_argument(
+        "--audit-write-behind",
+        action="store_true",
+        help="Buffer audit records and write them in background batches",
+    )
+    parser.add_argument(
+        "--audit-batch-size",
+        type=int,
+        default=500,
+        help="Buffered audit records that trigger a batch write",
+    )
+    parser.add_argument(
+        "--audit-flush-interval",
+        type=float,
+        default=1.0,
+        help="Maximum seconds between background audit writes",
+    )
+    parser.add_argument(
+        "--audit-max-buffer",
+        type=int,
+        default=10000,
+        help="Buffered audit records that force a synchronous write",
+    )
+    parser.add_argument(
+        "--audit-retention-days",
+        type=int,
+        default=None,
+        help="Drop daily audit partitions older than this many days",
+    )
+    parser.add_argument(
+        "--audit-archive-dir",
+        type=str,
+        default=None,
+        help="Archive expired audit partitions as gzipped JSON lines here",
+    )
+    parser.add_argument(
+        "--rules-cache",
+        type=str,
+        default=None,
+        help="Directory caching parsed rule files across restarts",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Engine processes; events are sharded across them by --partition-key",
+    )
+    parser.add_argument(
+        "--partition-key",
+        type=str,
+        default="source",
+        help=(
+            "Dotted event key used to pick the engine process; events sharing "
+            "a value keep their order (use --engine-workers 1 for strict order)"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on this port at /metrics (off by default)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        type=str,
+        default="0.0.0.0",  # noqa: S104 - scraped from other hosts by design
+        help="Interface the metrics endpoint binds to",
+    )
+    parser.add_argument(
+        "--trace-slow-ms",
+        type=float,
+        default=None,
+        help=(
+            "Trace event stages and log events slower than this; with "
+            "--metrics-port, /debug/slow and /debug/profile are served too"
+        ),
+    )
+    parser.add_argument(
+        "--trace-sample-rate",
+        type=float,
+        default=1.0,
+        help="Share of events traced when --trace-slow-ms is set",
+    )
+    parser.add_argument(
+        "--retry-attempts",
+        type=int,
+        default=3,
+        help="Attempts per failed action, retried in the background (1 disables)",
+    )
+    parser.add_argument(
+        "--retry-base-delay",
+        type=float,
+        default=0.5,
+        help="Seconds before the first retry; doubles on every further retry",
+    )
+    parser.add_argument(
+        "--retry-max-delay",
+        type=float,
+        default=30.0,
+        help="Upper bound in seconds between two retries",
+    )
+    parser.add_argument(
+        "--dead-letter-dir",
+        type=str,
+        default=None,
+        help="Spool actions that exhausted their retries to this directory",
+    )
+    parser.add_argument(
+        "--dead-letter-replay",
+        action="store_true",
+        help="Replay the dead-letter spool against the adapters on startup",
+    )
+    parser.add_argument(
+        "--breaker-policy",
+        choices=("off", *BREAKER_POLICIES),
+        default="off",
+        help=(
+            "Circuit breakers per adapter (and per URL for http_post): while "
+            "open, actions fail fast or go to the dead-letter spool (spool "
+            "requires --dead-letter-dir)"
+        ),
+    )
+    parser.add_argument(
+        "--breaker-failure-rate",
+        type=float,
+        default=0.5,
+        help="Share of failed recent calls that opens a breaker",
+    )
+    parser.add_argument(
+        "--breaker-slow-call-ms",
+        type=float,
+        default=None,
+        help="Calls at least this slow count against a breaker as well",
+    )
+    parser.add_argument(
+        "--breaker-min-calls",
+        type=int,
+        default=20,
+        help="Recent calls needed before a breaker may open",
+    )
+    parser.add_argument(
+        "--breaker-open-seconds",
+        type=float,
+        default=30.0,
+        help="Time a breaker stays open before probing the target again",
+    )
+    return parser
+
+
+def main() -> None:
+    """CLI entrypoint to start Motus with the provided rules and plugins."""
+    if sys.argv[1:2] == ["bench"]:
+        sys.exit(bench.main(sys.argv[2:]))
+    parser = _build_parser()
     args = parser.parse_args()
+    if args.breaker_policy == "spool" and args.dead_letter_dir is None:
+        parser.error("--breaker-policy spool requires --dead-letter-dir")
+    metrics_address = (
+        None if args.metrics_port is None else (args.metrics_host, args.metrics_port)
+    )
 
     rules_folder = str(Path(args.rules_folder).resolve())
-    asyncio.run(_run_engine(rules_folder, args.plugins_root))
+    rule_cache = RuleCache(args.rules_cache) if args.rules_cache else None
+    settings: dict[str, Any] = {
+        "queue": {
+            "maxsize": args.queue_size,
+            "policy": args.queue_policy,
+            "workers": args.engine_workers,
+        },
+        "audit": {
+            "write_behind": args.audit_write_behind,
+            "batch_size": args.audit_batch_size,
+            "flush_interval": args.audit_flush_interval,
+            "max_buffer": args.audit_max_buffer,
+            "retention_days": args.audit_retention_days,
+            "archive_dir": args.audit_archive_dir,
+        },
+        "engine": {
+            "adapter_concurrency": args.adapter_concurrency,
+            "action_timeout": args.action_timeout,
+            "batch_size": args.batch_size,
+            "batch_linger": args.batch_linger,
+            "retry_policy": RetryPolicy(
+                max_attempts=args.retry_attempts,
+                base_delay=args.retry_base_delay,
+                max_delay=args.retry_max_delay,
+            ),
+            "breakers": None
+            if args.breaker_policy == "off"
+            else BreakerRegistry(
+                args.breaker_policy,
+                failure_rate=args.breaker_failure_rate,
+                slow_call=None
+                if args.breaker_slow_call_ms is None
+                else args.breaker_slow_call_ms / 1000,
+                min_calls=args.breaker_min_calls,
+                open_for=args.breaker_open_seconds,
+            ),
+        },
+        "rules_cache": args.rules_cache,
+        "dead_letter_dir": args.dead_letter_dir,
+        "dead_letter_replay": args.dead_letter_replay,
+        "trace": None
+        if args.trace_slow_ms is None
+        else {
+            "slow_threshold": args.trace_slow_ms / 1000,
+            "sample_rate": args.trace_sample_rate,
+        },
+    }
+    if args.workers > 1:
+        _enable_multiprocess_metrics()
+        pool = WorkerPool(
+            "motus.__main__:_worker_main",
+            args.workers,
+            args.queue_size,
+            args=(rules_folder, args.plugins_root, settings),
+        )
+        router = ShardRouter(pool.queues, args.partition_key, args.queue_policy)
+        try:
+            asyncio.run(
+                _run_frontend(
+                    rules_folder,
+                    args.plugins_root,
+                    pool,
+                    router,
+                    rule_cache=rule_cache,
+                    metrics_address=metrics_address,
+                ),
+            )
+        finally:
+            _cleanup_multiprocess_metrics()
+        return
+    asyncio.run(
+        _run_engine(
+            rules_folder,
+            args.plugins_root,
+            event_queue=EventQueue(**settings["queue"]),
+            persistence=Persistence(**settings["audit"]),
+            rule_cache=rule_cache,
+            metrics_address=metrics_address,
+            tracer=_tracer(settings["trace"]),
+            replay_dead_letters=args.dead_letter_replay,
+            dead_letters=DeadLetterSpool(args.dead_letter_dir)
+            if args.dead_letter_dir
+            else None,
+            **settings["engine"],
+        ),
+    )
 
 
 if __name__ == "__main__":
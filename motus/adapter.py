@@ -6,12 +6,28 @@ from typing import Any
 
 
 class OutputAdapter(abc.ABC):
-    """Base class for output adapters."""
+    """Base class for output adapters.
+
+    Set `max_concurrency` to cap in-flight actions for this adapter instead of
+    the engine-wide default. Adapters that can send many actions at once set
+    `supports_batching` and override `execute_batch`.
+    """
+
+    max_concurrency: int | None = None
+    supports_batching: bool = False
 
     def __init__(self) -> None:
         """Initialize a logger for the adapter instance."""
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    async def startup(self) -> None:
+        """Acquire long-lived resources (sessions, pools) before use."""
+        return
+
+    async def shutdown(self) -> None:
+        """Release resources acquired in startup."""
+        return
+
     @abc.abstractmethod
     async def execute(
         self,
@@ -19,3 +35,22 @@ class OutputAdapter(abc.ABC):
         event: dict[str, Any],
     ) -> None:
         """Execute an action against the target system."""
+
+    async def execute_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]],
+    ) -> list[Exception | None] | None:
+        """Execute several (action, event) pairs at once.
+
+        Return None when every item succeeded, or one entry per item holding
+        the exception that item failed with (None for successes).
+        """
+        outcomes: list[Exception | None] = []
+        for action, event in items:
+            try:
+                await self.execute(action, event)
+            except Exception as exc:  # noqa: BLE001 - reported per item
+                outcomes.append(exc)
+            else:
+                outcomes.append(None)
+        return outcomes
@@ -0,0 +1,92 @@
+"""Engine-side micro-batching of actions for batch-capable adapters."""
+
+import asyncio
+import contextlib
+from typing import Any
+
+from motus.adapter import OutputAdapter
+
+_Pending = tuple[dict[str, Any], dict[str, Any], asyncio.Future]
+
+
+class ActionBatcher:
+    """Accumulate actions for one adapter and hand them over in batches.
+
+    A batch is sent once `max_size` actions are pending or `max_linger`
+    seconds after its first action arrived, whichever comes first. Each
+    caller awaits the outcome of its own action; if a batch cannot report
+    per-action outcomes, every caller in it gets the error.
+    """
+
+    def __init__(
+        self,
+        adapter: OutputAdapter,
+        max_size: int,
+        max_linger: float,
+        limit: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Create a batcher for `adapter`, optionally bounded by `limit`."""
+        self.adapter = adapter
+        self.max_size = max_size
+        self.max_linger = max_linger
+        self._limit = limit
+        self._pending: list[_Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Queue an action and wait until its batch has been executed."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((action, event, future))
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_linger,
+                self.flush,
+            )
+        await future
+
+    def flush(self) -> None:
+        """Send the pending actions as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def close(self) -> None:
+        """Send the pending actions now and wait for every batch in flight."""
+        self.flush()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _run(self, batch: list[_Pending]) -> None:
+        items = [(action, event) for action, event, _ in batch]
+        try:
+            async with self._limit or contextlib.nullcontext():
+                outcomes = await self.adapter.execute_batch(items)
+            if outcomes is None:
+                outcomes = [None] * len(batch)
+            for (_, _, future), outcome in zip(batch, outcomes, strict=True):
+                if future.done():
+                    continue
+                if outcome is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(outcome)
+        except Exception as exc:  # noqa: BLE001 - forwarded to every caller
+            _fail(batch, exc)
+        except asyncio.CancelledError:
+            _fail(batch, RuntimeError("Action batch was cancelled"))
+            raise
+
+
+def _fail(batch: list[_Pending], error: Exception) -> None:
+    """Complete every future of `batch` still pending with `error`."""
+    for _, _, future in batch:
+        if not future.done():
+            future.set_exception(error)
@@ -0,0 +1,455 @@
+"""Synthetic benchmarks for the engine, ingestion, persistence and adapters.
+
+Run with `python -m motus bench`. Each scenario reports events/sec,
+p50/p95/p99 latency and peak traced memory as JSON, and `--baseline`
+turns a previous report into a regression gate.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from motus import serialization
+from motus.adapter import OutputAdapter
+from motus.core import DecisionEngine
+from motus.event_queue import EventQueue
+from motus.persistence import Persistence
+from motus.plugins.adapters.http_post import HTTPPostAdapter
+from motus.plugins.ingestors.webhook import WebhookIngestor
+
+_LEVELS = ("bronze", "silver", "gold", "platinum")
+_SOURCES = 16
+
+
+@dataclass(frozen=True, slots=True)
+class BenchConfig:
+    """Shape of the synthetic workload."""
+
+    rules: int = 1000
+    depth: int = 2
+    spread: float = 100.0
+    types: int = 20
+    events: int = 20000
+    concurrency: int = 16
+    batch: int = 100
+    memory_sample: int = 1000
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class ScenarioResult:
+    """Measurements of one scenario run."""
+
+    name: str
+    mode: str
+    events: int
+    seconds: float
+    events_per_sec: float
+    latency_ms: dict[str, float]
+    memory_peak_bytes: int
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+class NullAdapter(OutputAdapter):
+    """Adapter that accepts every action and does nothing."""
+
+    plugin_name = "null"
+
+    async def execute(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Discard the action."""
+        _ = (action, event)
+
+
+def synthetic_rules(config: BenchConfig) -> list[dict[str, Any]]:
+    """Generate rules keyed by event type with nested AND/OR thresholds."""
+    rng = random.Random(config.seed)  # noqa: S311 - reproducible workload
+    return [
+        {
+            "name": f"bench-{number}",
+            "when": [
+                {"type": f"type{number % config.types}"},
+                _nested_condition(rng, config.depth, config.spread),
+            ],
+            "then": [{"target": "null"}],
+        }
+        for number in range(config.rules)
+    ]
+
+
+def _nested_condition(rng: random.Random, depth: int, spread: float) -> dict:
+    if depth <= 0:
+        return {"metadata.value": f">={rng.uniform(0, spread):.2f}"}
+    operator = "and" if depth % 2 else "or"
+    return {
+        operator: [
+            _nested_condition(rng, depth - 1, spread),
+            {"metadata.level": rng.choice(_LEVELS)},
+        ],
+    }
+
+
+def synthetic_events(config: BenchConfig, count: int) -> list[dict[str, Any]]:
+    """Generate events matching the type and value ranges of the rules."""
+    rng = random.Random(config.seed + 1)  # noqa: S311 - reproducible workload
+    return [
+        {
+            "type": f"type{rng.randrange(config.types)}",
+            "source": f"source{rng.randrange(_SOURCES)}",
+            "metadata": {
+                "value": round(rng.uniform(0, config.spread), 2),
+                "level": rng.choice(_LEVELS),
+            },
+        }
+        for _ in range(count)
+    ]
+
+
+def percentile(sorted_values: list[int], fraction: float) -> int:
+    """Return the nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def _timed_calls(
+    items: list[Any],
+    call: Callable[[Any], Awaitable[Any]],
+    concurrency: int = 1,
+) -> list[int]:
+    """Await `call` for every item with bounded concurrency; return latencies."""
+    latencies: list[int] = []
+    pending: Iterator[Any] = iter(items)
+
+    async def worker() -> None:
+        for item in pending:
+            started = time.perf_counter_ns()
+            await call(item)
+            latencies.append(time.perf_counter_ns() - started)
+
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    return latencies
+
+
+async def bench_engine(config: BenchConfig, events: list[dict]) -> list[int]:
+    """Evaluate events in-process with DecisionEngine.handle_event."""
+    engine = DecisionEngine(synthetic_rules(config), [NullAdapter()])
+    return await _timed_calls(events, engine.handle_event)
+
+
+async def bench_persistence(config: BenchConfig, events: list[dict]) -> list[int]:
+    """Write one synchronous audit record per event."""
+    return await _persist(config, events, write_behind=False)
+
+
+async def bench_persistence_write_behind(
+    config: BenchConfig,
+    events: list[dict],
+) -> list[int]:
+    """Buffer audit records and flush them in background batches."""
+    return await _persist(config, events, write_behind=True)
+
+
+async def _persist(
+    config: BenchConfig,
+    events: list[dict],
+    *,
+    write_behind: bool,
+) -> list[int]:
+    rules = synthetic_rules(config)
+    with tempfile.TemporaryDirectory() as folder:
+        persistence = Persistence(
+            str(Path(folder) / "bench.db"),
+            write_behind=write_behind,
+        )
+        await persistence.start()
+        latencies: list[int] = []
+        for number, event in enumerate(events):
+            started = time.perf_counter_ns()
+            persistence.save_decision(event, rules[number % len(rules)])
+            latencies.append(time.perf_counter_ns() - started)
+            if write_behind and number % config.batch == 0:
+                await asyncio.sleep(0)
+        await persistence.close()
+    return latencies
+
+
+async def bench_webhook(config: BenchConfig, events: list[dict]) -> list[int]:
+    """POST events one per request to a loopback WebhookIngestor."""
+
+    async def post(session: aiohttp.ClientSession, url: str, event: dict) -> None:
+        async with session.post(
+            f"{url}/event",
+            data=serialization.dumps(event),
+            headers={"Content-Type": serialization.CONTENT_TYPE},
+        ) as response:
+            await response.read()
+
+    return await _through_webhook(config, events, post)
+
+
+async def bench_webhook_bulk(config: BenchConfig, events: list[dict]) -> list[int]:
+    """POST NDJSON batches of `batch` events to the loopback `/events` route."""
+    batches = [
+        events[start : start + config.batch]
+        for start in range(0, len(events), config.batch)
+    ]
+
+    async def post(session: aiohttp.ClientSession, url: str, batch: list) -> None:
+        body = b"\n".join(serialization.dumps(event) for event in batch)
+        async with session.post(f"{url}/events", data=body) as response:
+            await response.read()
+
+    return await _through_webhook(config, batches, post)
+
+
+async def _through_webhook(
+    config: BenchConfig,
+    payloads: list[Any],
+    post: Callable[[aiohttp.ClientSession, str, Any], Awaitable[None]],
+) -> list[int]:
+    """Serve a WebhookIngestor feeding the engine and drive it over HTTP."""
+    queue = EventQueue(maxsize=max(len(payloads) * config.batch, 1))
+    ingestor = WebhookIngestor(queue.offer)
+    ingestor.put_callback = queue.put
+    ingestor.batch_callback = queue.offer_batch
+    engine = DecisionEngine(synthetic_rules(config), [NullAdapter()])
+    consumer = asyncio.create_task(queue.run(engine.handle_event))
+    runner = web.AppRunner(ingestor._app)  # noqa: SLF001
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    url = f"http://{host}:{port}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            latencies = await _timed_calls(
+                payloads,
+                lambda payload: post(session, url, payload),
+                config.concurrency,
+            )
+        await queue.join()
+    finally:
+        consumer.cancel()
+        await runner.cleanup()
+    return latencies
+
+
+async def bench_http_post(config: BenchConfig, events: list[dict]) -> list[int]:
+    """Dispatch every event through HTTPPostAdapter to a loopback sink."""
+
+    async def sink(request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/sink", sink)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    adapter = HTTPPostAdapter()
+    await adapter.startup()
+    rule = {
+        "name": "bench-http",
+        "when": [],
+        "then": [{"target": "http_post", "url": f"http://{host}:{port}/sink"}],
+    }
+    engine = DecisionEngine([rule], [adapter])
+    try:
+        return await _timed_calls(events, engine.handle_event, config.concurrency)
+    finally:
+        await adapter.shutdown()
+        await runner.cleanup()
+
+
+Scenario = Callable[[BenchConfig, list[dict]], Awaitable[list[int]]]
+
+SCENARIOS: dict[str, tuple[str, Scenario]] = {
+    "engine": ("inprocess", bench_engine),
+    "persistence": ("inprocess", bench_persistence),
+    "persistence-write-behind": ("inprocess", bench_persistence_write_behind),
+    "webhook": ("http", bench_webhook),
+    "webhook-bulk": ("http", bench_webhook_bulk),
+    "http_post": ("http", bench_http_post),
+}
+
+
+async def run_scenario(name: str, config: BenchConfig) -> ScenarioResult:
+    """Run one scenario, then a shorter traced pass for its memory peak."""
+    mode, scenario = SCENARIOS[name]
+    events = synthetic_events(config, config.events)
+    started = time.perf_counter()
+    latencies = await scenario(config, events)
+    seconds = time.perf_counter() - started
+
+    sample = events[: max(1, min(config.memory_sample, len(events)))]
+    tracemalloc.start()
+    try:
+        await scenario(config, sample)
+        _, memory_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return ScenarioResult(
+        name=name,
+        mode=mode,
+        events=len(events),
+        seconds=round(seconds, 4),
+        events_per_sec=round(len(events) / seconds, 1) if seconds else 0.0,
+        latency_ms={
+            label: round(percentile(latencies, fraction) / 1e6, 4)
+            for label, fraction in (
+                ("p50", 0.50),
+                ("p95", 0.95),
+                ("p99", 0.99),
+                ("max", 1.0),
+            )
+        },
+        memory_peak_bytes=memory_peak,
+        params={"samples": len(latencies)},
+    )
+
+
+async def run_benchmarks(names: list[str], config: BenchConfig) -> dict[str, Any]:
+    """Run the named scenarios in order and build the report."""
+    results = [await run_scenario(name, config) for name in names]
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": serialization.BACKEND,
+        "config": asdict(config),
+        "scenarios": [asdict(result) for result in results],
+    }
+
+
+def find_regressions(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    max_regression: float,
+) -> list[str]:
+    """List scenarios slower than `baseline` by more than `max_regression`.
+
+    Throughput must not drop, and p99 latency must not grow, by more than the
+    given fraction.
+    """
+    previous = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    problems: list[str] = []
+    for scenario in report["scenarios"]:
+        before = previous.get(scenario["name"])
+        if before is None:
+            continue
+        floor = before["events_per_sec"] * (1 - max_regression)
+        if scenario["events_per_sec"] < floor:
+            problems.append(
+                f"{scenario['name']}: {scenario['events_per_sec']} events/s "
+                f"< {before['events_per_sec']} baseline",
+            )
+        ceiling = before["latency_ms"]["p99"] * (1 + max_regression)
+        if scenario["latency_ms"]["p99"] > ceiling:
+            problems.append(
+                f"{scenario['name']}: p99 {scenario['latency_ms']['p99']} ms "
+                f"> {before['latency_ms']['p99']} ms baseline",
+            )
+    return problems
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    defaults = BenchConfig()
+    parser = argparse.ArgumentParser(
+        prog="motus bench",
+        description="Benchmark the Motus engine, ingestion and adapters",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("inprocess", "http", "all"),
+        default="all",
+        help="Scenario group to run (ignored when --scenario is given)",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeat for several",
+    )
+    for name in ("rules", "depth", "types", "events", "concurrency", "batch"):
+        parser.add_argument(
+            f"--{name}",
+            type=int,
+            default=getattr(defaults, name),
+        )
+    parser.add_argument("--spread", type=float, default=defaults.spread)
+    parser.add_argument(
+        "--memory-sample",
+        type=int,
+        default=defaults.memory_sample,
+        help="Events replayed under tracemalloc to measure peak memory",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON here")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Previous JSON report; exit with status 1 on regressions",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.1,
+        help="Tolerated slowdown against --baseline, as a fraction",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark CLI and return the process exit status."""
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    config = BenchConfig(
+        rules=args.rules,
+        depth=args.depth,
+        spread=args.spread,
+        types=args.types,
+        events=args.events,
+        concurrency=args.concurrency,
+        batch=args.batch,
+        memory_sample=args.memory_sample,
+        seed=args.seed,
+    )
+    names = args.scenario or [
+        name for name, (mode, _) in SCENARIOS.items() if args.mode in {"all", mode}
+    ]
+    # Per-event INFO logs would dominate every measurement.
+    logging.disable(logging.INFO)
+    try:
+        report = asyncio.run(run_benchmarks(names, config))
+    finally:
+        logging.disable(logging.NOTSET)
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(rendered + "\n")
+    sys.stdout.write(rendered + "\n")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        problems = find_regressions(report, baseline, args.max_regression)
+        for problem in problems:
+            sys.stderr.write(f"regression: {problem}\n")
+        return 1 if problems else 0
+    return 0
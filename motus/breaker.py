@@ -0,0 +1,180 @@
+"""Circuit breakers shedding load from failing or slow action targets."""
+
+import collections
+import logging
+import time
+
+from motus import metrics
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+BREAKER_POLICIES = ("fail", "spool")
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class BreakerOpenError(RuntimeError):
+    """Raised in place of an action whose target's breaker is open."""
+
+
+class CircuitBreaker:
+    """Track the recent outcomes of one target and trip when it degrades.
+
+    The last `window` calls are kept in a ring buffer. Once at least
+    `min_calls` of them are known, the breaker opens when the share of
+    failures reaches `failure_rate`, or the share of calls slower than
+    `slow_call` seconds reaches `slow_rate`. After `open_for` seconds it lets
+    `probes` calls through (half-open); it closes if they all succeed and
+    opens again on the first failure.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        *,
+        failure_rate: float = 0.5,
+        slow_call: float | None = None,
+        slow_rate: float = 0.5,
+        min_calls: int = 20,
+        window: int = 100,
+        open_for: float = 30.0,
+        probes: int = 1,
+    ) -> None:
+        """Create a closed breaker for the target `name`."""
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.min_calls = min_calls
+        self.open_for = open_for
+        self.probes = probes
+        self.logger = logging.getLogger("motus.breaker")
+        self.state = CLOSED
+        self._outcomes: collections.deque[tuple[bool, bool]] = collections.deque(
+            maxlen=window,
+        )
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probing = 0
+        self._probed = 0
+        self._gauge = metrics.breaker_state.labels(name)
+        self._gauge.set(_STATE_VALUES[CLOSED])
+
+    def allow(self) -> bool:
+        """Return whether a call may go through now (a probe if half-open)."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < self.open_for:
+            return self.state == HALF_OPEN and self._take_probe()
+        # Open long enough, or half-open with probes that never reported back
+        # (cancelled): start a fresh round of probes.
+        self._opened_at = now
+        self._transition(HALF_OPEN)
+        self._probing = self._probed = 0
+        return self._take_probe()
+
+    def _take_probe(self) -> bool:
+        if self._probing >= self.probes:
+            return False
+        self._probing += 1
+        return True
+
+    def record(self, *, success: bool, duration: float) -> None:
+        """Account for a finished call that `allow` let through."""
+        slow = self.slow_call is not None and duration >= self.slow_call
+        if self.state == HALF_OPEN:
+            self._probing = max(self._probing - 1, 0)
+            if not success or slow:
+                self._open()
+                return
+            self._probed += 1
+            if self._probed >= self.probes:
+                self._reset()
+                self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            return
+        if len(self._outcomes) == self._outcomes.maxlen:
+            old_failure, old_slow = self._outcomes[0]
+            self._failures -= old_failure
+            self._slow -= old_slow
+        self._outcomes.append((not success, slow))
+        self._failures += not success
+        self._slow += slow
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and (
+            self._failures >= self.failure_rate * calls
+            or self._slow >= self.slow_rate * calls
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._reset()
+        self._transition(OPEN)
+
+    def _reset(self) -> None:
+        self._outcomes.clear()
+        self._failures = self._slow = 0
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.logger.warning("Circuit %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        self._gauge.set(_STATE_VALUES[state])
+        metrics.breaker_transitions.labels(self.name, state).inc()
+
+
+class BreakerRegistry:
+    """Hand out one breaker per target, configured alike.
+
+    A target is an adapter, or an adapter and a scope (such as a URL) when
+    the adapter defines `breaker_scope(action)`. While a breaker is open,
+    `policy` decides whether its actions fail fast (`fail`) or go straight
+    to the dead-letter spool (`spool`). At most `max_breakers` targets are
+    tracked; the least recently used one is forgotten beyond that.
+    """
+
+    def __init__(
+        self,
+        policy: str = "spool",
+        max_breakers: int = 1000,
+        **settings: float,
+    ) -> None:
+        """Configure the breakers; `settings` go to each CircuitBreaker."""
+        if policy not in BREAKER_POLICIES:
+            msg = (
+                f"Unknown breaker policy '{policy}', expected one of {BREAKER_POLICIES}"
+            )
+            raise ValueError(msg)
+        self.policy = policy
+        self.max_breakers = max_breakers
+        self.settings = settings
+        self._breakers: collections.OrderedDict[str, CircuitBreaker] = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of tracked targets."""
+        return len(self._breakers)
+
+    def get(self, name: str) -> CircuitBreaker:
+        """Return the breaker of a target, creating it closed if needed."""
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name, **self.settings)
+            if len(self._breakers) > self.max_breakers:
+                self._breakers.popitem(last=False)
+        else:
+            self._breakers.move_to_end(name)
+        return breaker
+
+    def for_action(self, adapter: object, action: dict) -> CircuitBreaker:
+        """Return the breaker guarding `action` on `adapter`."""
+        name = metrics.adapter_label(adapter)
+        scope = getattr(adapter, "breaker_scope", None)
+        target = scope(action) if scope is not None else None
+        return self.get(f"{name} {target}" if target else name)
@@ -0,0 +1,404 @@
+"""Compile YAML rules into prebuilt predicates."""
+
+import json
+import math
+import operator
+import re
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from motus import serialization, windows
+from motus.event import Event
+from motus.windows import MAX_KEYS, LRUDict, SlidingWindow
+
+if TYPE_CHECKING:
+    from motus.directives import RuleGate
+
+Predicate = Callable[[dict[str, Any]], bool]
+
+_NUMERIC_PATTERN = re.compile(r"^(>=|<=|>|<)(.+)$")
+_OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+WINDOW_FUNCTIONS = ("count", "sum", "avg", "max")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CompiledRule:
+    """A rule paired with its compiled `when` predicate.
+
+    `equalities` maps dotted keys to the values an event must hold for the
+    rule to have any chance of matching, and `comparisons` lists the
+    (key, operator, threshold) constraints it always requires; both feed the
+    rule index. `gate` holds the state of the rule's directives (see
+    `motus.directives`), if it uses any.
+    """
+
+    rule: dict
+    name: str
+    predicate: Predicate
+    fingerprint: str
+    equalities: dict[str, frozenset] = field(default_factory=dict)
+    comparisons: tuple[tuple[str, str, float], ...] = ()
+    gate: "RuleGate | None" = None
+
+
+def compile_rule(rule: dict) -> CompiledRule:
+    """Compile a rule's `when` list into a single predicate."""
+    name = rule.get("name", "<unnamed>")
+    when = rule.get("when")
+    if not isinstance(when, list):
+        msg = f"Rule '{name}' must define 'when' as a list"
+        raise TypeError(msg)
+    return CompiledRule(
+        rule=rule,
+        name=name,
+        predicate=_all_of(when),
+        fingerprint=rule_fingerprint(rule),
+        equalities={
+            key: frozenset(values) for key, values in required_equalities(when).items()
+        },
+        comparisons=tuple(required_comparisons(when)),
+    )
+
+
+def rule_fingerprint(rule: dict) -> str:
+    """Return a stable content key used to reuse compiled rules on reload."""
+    return json.dumps(rule, sort_keys=True, default=str)
+
+
+def is_comparison(expected: object) -> bool:
+    """Return True if the value is a numeric comparison such as '>=10'."""
+    return isinstance(expected, str) and bool(_NUMERIC_PATTERN.match(expected))
+
+
+def parse_comparison(expected: object) -> tuple[str, float] | None:
+    """Return (operator, threshold) for a valid comparison such as '>=10'."""
+    if not isinstance(expected, str):
+        return None
+    numeric = _NUMERIC_PATTERN.match(expected)
+    if not numeric:
+        return None
+    op, raw_threshold = numeric.groups()
+    try:
+        return op, float(raw_threshold)
+    except ValueError:
+        return None
+
+
+def required_comparisons(conditions: object) -> list[tuple[str, str, float]]:
+    """Collect the numeric comparisons a condition tree always requires.
+
+    Comparisons under OR branches are optional and therefore skipped, as are
+    those listed after a window, which counts every event reaching it.
+    """
+    if isinstance(conditions, dict):
+        if "and" in conditions:
+            return _comparisons_all(conditions["and"])
+        if "or" in conditions or "window" in conditions:
+            return []
+        found: list[tuple[str, str, float]] = []
+        for key, value in conditions.items():
+            comparison = parse_comparison(value)
+            if comparison is not None and not math.isnan(comparison[1]):
+                found.append((key, *comparison))
+        return found
+
+    if isinstance(conditions, list):
+        return _comparisons_all(conditions)
+
+    return []
+
+
+def _comparisons_all(conditions: object) -> list[tuple[str, str, float]]:
+    if not isinstance(conditions, list):
+        return []
+    found: list[tuple[str, str, float]] = []
+    for cond in conditions:
+        found.extend(required_comparisons(cond))
+        if _has_window(cond):
+            break
+    return found
+
+
+def _has_window(conditions: object) -> bool:
+    """Return True if a condition tree contains a window condition.
+
+    A window counts every event reaching it, so the constraints listed after
+    it must not be used to skip events: the rule index ignores them.
+    """
+    if isinstance(conditions, dict):
+        for combinator in ("and", "or"):
+            if combinator in conditions:
+                branches = conditions[combinator]
+                return isinstance(branches, list) and any(map(_has_window, branches))
+        return "window" in conditions
+    if isinstance(conditions, list):
+        return any(map(_has_window, conditions))
+    return False
+
+
+def required_equalities(conditions: object) -> dict[str, set[Hashable]]:
+    """Collect the equality values a condition tree requires per dotted key.
+
+    AND branches intersect their requirements; OR branches only keep keys
+    constrained by every branch, with the union of the allowed values.
+    Equalities listed after a window are skipped, as for comparisons.
+    """
+    if isinstance(conditions, dict):
+        if "and" in conditions:
+            return _required_all(conditions["and"])
+        if "or" in conditions:
+            return _required_any(conditions["or"])
+        if "window" in conditions:
+            return {}
+        return _merge_required(
+            [
+                {key: {value}}
+                for key, value in conditions.items()
+                if isinstance(value, Hashable) and not is_comparison(value)
+            ],
+        )
+
+    if isinstance(conditions, list):
+        return _required_all(conditions)
+
+    return {}
+
+
+def _required_all(conditions: object) -> dict[str, set[Hashable]]:
+    if not isinstance(conditions, list):
+        return {}
+    requirements: list[dict[str, set[Hashable]]] = []
+    for cond in conditions:
+        requirements.append(required_equalities(cond))
+        if _has_window(cond):
+            break
+    return _merge_required(requirements)
+
+
+def _required_any(branches: object) -> dict[str, set[Hashable]]:
+    if not isinstance(branches, list) or not branches:
+        return {}
+    found = [required_equalities(branch) for branch in branches]
+    shared = set(found[0]).intersection(*found[1:])
+    return {key: set().union(*(branch[key] for branch in found)) for key in shared}
+
+
+def _merge_required(
+    requirements: list[dict[str, set[Hashable]]],
+) -> dict[str, set[Hashable]]:
+    merged: dict[str, set[Hashable]] = {}
+    for requirement in requirements:
+        for key, values in requirement.items():
+            if key in merged:
+                merged[key] = merged[key] & values
+            else:
+                merged[key] = set(values)
+    return merged
+
+
+def compile_conditions(conditions: object) -> Predicate:
+    """Compile a (possibly nested) AND/OR/window condition tree."""
+    if isinstance(conditions, dict):
+        if "and" in conditions:
+            return _all_of(conditions["and"])
+        if "or" in conditions:
+            return _any_of(conditions["or"])
+        if "window" in conditions:
+            return compile_window(conditions["window"])
+        return _combine_all(
+            [compile_condition(key, value) for key, value in conditions.items()],
+        )
+
+    if isinstance(conditions, list):
+        return _all_of(conditions)
+
+    return _never
+
+
+def compile_condition(key: str, expected: object) -> Predicate:
+    """Compile a single key/value condition with a pre-split key path."""
+    path = tuple(key.split("."))
+
+    if is_comparison(expected):
+        comparison = parse_comparison(expected)
+        if comparison is None:
+            return _never
+        op, threshold = comparison
+        return _numeric_predicate(path, _OPERATORS[op], threshold)
+
+    def _equals(event: dict[str, Any]) -> bool:
+        if type(event) is Event:
+            candidate = event.lookup(path)
+        else:
+            candidate = get_path(event, path)
+        return candidate is not None and candidate == expected
+
+    return _equals
+
+
+def get_path(event: object, path: tuple[str, ...]) -> object | None:
+    """Traverse a pre-split key path (e.g., metadata.size) within an event."""
+    if type(event) is Event:
+        return event.lookup(path)
+    current = event
+    for part in path:
+        if not isinstance(current, dict) or part not in current:
+            return None
+        current = current[part]
+    return current
+
+
+def group_key(event: object, paths: tuple[tuple[str, ...], ...]) -> Hashable:
+    """Return the values of `paths` in an event as a hashable key."""
+    values = tuple(get_path(event, path) for path in paths)
+    try:
+        hash(values)
+    except TypeError:
+        return serialization.dumps_text(values)
+    return values
+
+
+def compile_window(
+    spec: object,
+    clock: Callable[[], float] | None = None,
+) -> Predicate:
+    """Compile a stateful condition over the events seen in a time window.
+
+    `spec` holds `function` (count, sum, avg or max, of `field`),
+    `seconds`, `threshold` (a comparison such as '>100'), and optionally
+    `key` (dotted paths grouping events), `buckets` (ring slots, i.e. the
+    resolution of the sliding window) and `max_keys` (groups tracked, least
+    recently seen ones are forgotten). Every event reaching the condition is
+    folded into its group's window in O(1), then the group's aggregate is
+    compared to the threshold. Conditions listed before it therefore select
+    the events that are counted. Time is read from `clock`, by default
+    `windows.clock` looked up on every event like the directives do.
+    """
+    if not isinstance(spec, dict):
+        msg = "'window' condition must be a mapping"
+        raise TypeError(msg)
+    function = spec.get("function", "count")
+    field = spec.get("field")
+    if function not in WINDOW_FUNCTIONS or (
+        function != "count" and not isinstance(field, str)
+    ):
+        msg = f"'window' needs a function in {WINDOW_FUNCTIONS} and its 'field'"
+        raise TypeError(msg)
+    comparison = parse_comparison(spec.get("threshold"))
+    seconds = spec.get("seconds")
+    buckets = spec.get("buckets", 6)
+    max_keys = spec.get("max_keys", MAX_KEYS)
+    if (
+        comparison is None
+        or not isinstance(seconds, int | float)
+        or seconds <= 0
+        or not isinstance(buckets, int)
+        or not isinstance(max_keys, int)
+        or buckets < 1
+        or max_keys < 1
+    ):
+        msg = (
+            "'window' needs a 'threshold' comparison, positive 'seconds' and "
+            "positive integer 'buckets' and 'max_keys'"
+        )
+        raise TypeError(msg)
+    key = spec.get("key", [])
+    keys = [key] if isinstance(key, str) else key
+    if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+        msg = "'window' key must be a dotted path or a list of them"
+        raise TypeError(msg)
+    paths = tuple(tuple(k.split(".")) for k in keys)
+    value_path = tuple(field.split(".")) if isinstance(field, str) else None
+    compare, threshold = _OPERATORS[comparison[0]], comparison[1]
+    groups: LRUDict[SlidingWindow] = LRUDict(max_keys)
+
+    def _window(event: dict[str, Any]) -> bool:
+        value = 1.0 if value_path is None else get_number(event, value_path)
+        if value is None:
+            return False
+        window = groups.setdefault(
+            group_key(event, paths),
+            lambda: SlidingWindow(seconds, buckets),
+        )
+        window.add(value, windows.clock() if clock is None else clock())
+        if function == "count":
+            current = window.count
+        elif function == "sum":
+            current = window.total
+        elif function == "avg":
+            current = window.total / window.count
+        else:
+            current = window.highest
+        return compare(current, threshold)
+
+    return _window
+
+
+def get_number(event: object, path: tuple[str, ...]) -> float | None:
+    """Return the value at a key path as float, or None when not numeric."""
+    if type(event) is Event:
+        return event.number(path)
+    candidate = get_path(event, path)
+    if candidate is None:
+        return None
+    try:
+        return float(candidate)
+    except (TypeError, ValueError):
+        return None
+
+
+def _numeric_predicate(
+    path: tuple[str, ...],
+    compare: Callable[[float, float], bool],
+    threshold: float,
+) -> Predicate:
+    def _compare(event: dict[str, Any]) -> bool:
+        if type(event) is Event:
+            current_val = event.number(path)
+        else:
+            current_val = get_number(event, path)
+        if current_val is None:
+            return False
+        return compare(current_val, threshold)
+
+    return _compare
+
+
+def _all_of(conditions: object) -> Predicate:
+    if not isinstance(conditions, list):
+        return _never
+    return _combine_all([compile_conditions(cond) for cond in conditions])
+
+
+def _any_of(conditions: object) -> Predicate:
+    if not isinstance(conditions, list):
+        return _never
+    predicates = [compile_conditions(cond) for cond in conditions]
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def _any(event: dict[str, Any]) -> bool:
+        return any(predicate(event) for predicate in predicates)
+
+    return _any
+
+
+def _combine_all(predicates: list[Predicate]) -> Predicate:
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def _all(event: dict[str, Any]) -> bool:
+        return all(predicate(event) for predicate in predicates)
+
+    return _all
+
+
+def _never(event: dict[str, Any]) -> bool:
+    _ = event
+    return False
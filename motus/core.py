@@ -1,118 +1,314 @@
 """Motus Decision Engine."""
 
+import asyncio
+import contextlib
+import contextvars
+import itertools
 import logging
-import re
+import time
+import weakref
+from collections.abc import Sequence
 from typing import Any
 
+from motus import metrics, tracing, windows
+from motus.adapter import OutputAdapter
+from motus.batching import ActionBatcher
+from motus.breaker import BreakerOpenError, BreakerRegistry
+from motus.compiler import CompiledRule, compile_rule
+from motus.event import Event
+from motus.index import DEFAULT_INDEX_FIELDS
 from motus.persistence import Persistence
+from motus.retry import RetryPolicy, RetryQueue
+from motus.routing import resolve_target
+from motus.ruleset import RuleSet, build_ruleset
+from motus.spool import DeadLetterSpool
 
 
 class DecisionEngine:
     """Evaluate rules and dispatch matching actions."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         rules: list[dict],
         adapters: list[Any],
         persistence: Persistence | None = None,
+        *,
+        index_fields: Sequence[str] = DEFAULT_INDEX_FIELDS,
+        adapter_concurrency: int | None = None,
+        action_timeout: float | None = None,
+        batch_size: int = 1,
+        batch_linger: float = 0.05,
+        tracer: tracing.Tracer | None = None,
+        retry_policy: RetryPolicy | None = None,
+        dead_letters: DeadLetterSpool | None = None,
+        breakers: BreakerRegistry | None = None,
     ) -> None:
-        """Create an engine with rules, adapters, and optional persistence."""
-        self.rules = rules
-        self.adapters = adapters
-        self.persistence = persistence
+        """Create an engine with rules, adapters, and optional persistence.
+
+        `index_fields` lists the dotted keys whose equality constraints are
+        used to pre-select candidate rules for each event.
+        `adapter_concurrency` caps in-flight actions per adapter (adapters may
+        override it with a `max_concurrency` attribute) and `action_timeout`
+        bounds each action (actions may override it with a `timeout` key).
+        With `batch_size` above 1, actions that set `batch: true` and target
+        a batch-capable adapter are grouped into batches of up to that size,
+        waiting at most `batch_linger` seconds for a batch to fill.
+        With a `tracer`, the stages of sampled events are timed as spans.
+        Failed actions are retried in the background under `retry_policy`
+        (adapters may override it with a `retry_policy` attribute); actions
+        that keep failing are appended to `dead_letters` when given.
+        With `breakers`, actions to a target whose circuit is open are not
+        attempted; they fail fast or are dead-lettered, per the registry.
+        """
         self.logger = logging.getLogger("motus.core")
+        self.persistence = persistence
+        self.index_fields = tuple(index_fields)
+        self.adapter_concurrency = adapter_concurrency
+        self.action_timeout = action_timeout
+        self.batch_size = batch_size
+        self.batch_linger = batch_linger
+        self.tracer = tracer
+        self.retry_policy = retry_policy
+        self.retries = RetryQueue(self._attempt, dead_letters)
+        self.breakers = breakers
+        # Aggregate rules with open windows, flushed by `_aggregation`.
+        self._aggregating: dict[CompiledRule, None] = {}
+        self._aggregation: asyncio.Task | None = None
+        self._limits: weakref.WeakKeyDictionary[OutputAdapter, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._batchers: weakref.WeakKeyDictionary[OutputAdapter, ActionBatcher] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._versions = itertools.count(1)
+        self._reload_lock = asyncio.Lock()
+        self._ruleset = build_ruleset(
+            rules,
+            adapters,
+            version=next(self._versions),
+            index_fields=self.index_fields,
+            logger=self.logger,
+        )
+
+    async def handle_event(self, event: dict[str, Any] | Event) -> None:
+        """Process an incoming event against all rules.
 
-    async def handle_event(self, event: dict[str, Any]) -> None:
-        """Process an incoming event against all rules."""
+        The current rule set is read once, so a concurrent reload never mixes
+        rules, routes or adapters from two versions within one event.
+        """
+        ruleset = self._ruleset
+        if type(event) is not Event:
+            # Share memoized path lookups across every rule checked below.
+            event = Event(event, normalize=False)
+        if self.tracer is None:
+            await self._handle_event(event, ruleset)
+            return
+        with self.tracer.event(event):
+            await self._handle_event(event, ruleset)
+
+    async def _handle_event(self, event: Event, ruleset: RuleSet) -> None:
         self.logger.info("Event received: %s", event)
-        for rule in self.rules:
-            if self.evaluate_rule(rule, event):
-                self.logger.info("Rule matched: %s", rule.get("name"))
-                await self.trigger_actions(rule, event)
-                if self.persistence:
-                    self.persistence.save_decision(event, rule)
+        metrics.events_received.inc()
+        started = time.perf_counter()
+        with tracing.span("evaluate") as evaluating:
+            candidates = ruleset.index.candidates(event)
+            if evaluating is None:
+                matched = [c for c in candidates if c.predicate(event)]
+            else:
+                matched = _evaluate_traced(candidates, event)
+        metrics.rule_evaluation_seconds.observe(time.perf_counter() - started)
+        if not matched:
+            return
+        # Adapters get a plain dict they may serialize or mutate.
+        payload = event.to_dict()
+        decisions: list[tuple[CompiledRule, Any]] = []
+        for compiled in matched:
+            metrics.rule_matches.labels(compiled.name).inc()
+            self.logger.info("Rule matched: %s", compiled.name)
+            if compiled.gate is None:
+                decisions.append((compiled, payload))
+            else:
+                decisions.extend(self._through_gate(compiled, event, payload))
+        await self._decide(decisions, ruleset)
 
-    def evaluate_rule(self, rule: dict, event: dict) -> bool:
-        """Return True if the event satisfies the rule conditions."""
-        when = rule.get("when")
-        if not isinstance(when, list):
-            msg = "Rule '{}' must define 'when' as a list".format(
-                rule.get(
-                    "name",
-                    "<unnamed>",
-                ),
+    def _through_gate(
+        self,
+        compiled: CompiledRule,
+        event: Event,
+        payload: dict[str, Any],
+    ) -> list[tuple[CompiledRule, Any]]:
+        """Apply a rule's directives to a match; return what to act upon.
+
+        Suppressed matches yield nothing; aggregated ones yield the events of
+        the windows they closed.
+        """
+        gate = compiled.gate
+        now = windows.clock()
+        suppressed_by = gate.admit(event, now)
+        if suppressed_by is None and gate.aggregate is None:
+            return [(compiled, payload)]
+        if suppressed_by is not None:
+            metrics.matches_suppressed.labels(compiled.name, suppressed_by).inc()
+            return []
+        metrics.matches_suppressed.labels(compiled.name, "aggregate").inc()
+        closed = gate.aggregate.add(event, now)
+        self._aggregating[compiled] = None
+        if self._aggregation is None or self._aggregation.done():
+            # Flushes belong to no single event: keep them off its trace.
+            self._aggregation = asyncio.create_task(
+                self._flush_aggregates(),
+                context=contextvars.Context(),
             )
-            raise TypeError(msg)
+        return [(compiled, window) for window in closed]
 
-        return all(self._evaluate_conditions(cond, event) for cond in when)
+    async def _flush_aggregates(self) -> None:
+        """Emit the windows of aggregate rules as they close, until idle."""
+        while self._aggregating:
+            now = windows.clock()
+            wake = min(
+                compiled.gate.aggregate.next_flush(now)
+                for compiled in self._aggregating
+            )
+            await asyncio.sleep(max(wake - now, 0))
+            now = windows.clock()
+            decisions: list[tuple[CompiledRule, Any]] = []
+            for compiled in list(self._aggregating):
+                aggregate = compiled.gate.aggregate
+                decisions.extend((compiled, window) for window in aggregate.flush(now))
+                if len(aggregate) == 0:
+                    del self._aggregating[compiled]
+            await self._decide(decisions, self._ruleset)
 
-    def _evaluate_conditions(self, conditions: dict, event: dict) -> bool:
-        """Recursive AND/OR logic with numeric comparison support."""
-        if isinstance(conditions, dict):
-            if "and" in conditions:
-                return all(
-                    self._evaluate_conditions(cond, event) for cond in conditions["and"]
-                )
-            if "or" in conditions:
-                return any(
-                    self._evaluate_conditions(cond, event) for cond in conditions["or"]
+    async def _decide(
+        self,
+        decisions: list[tuple[CompiledRule, Any]],
+        ruleset: RuleSet,
+    ) -> None:
+        """Trigger the actions of each (rule, event) pair and audit it."""
+        if not decisions:
+            return
+        metrics.decisions_made.inc(len(decisions))
+        results = await asyncio.gather(
+            *(
+                self.trigger_actions(compiled.rule, event, ruleset=ruleset)
+                for compiled, event in decisions
+            ),
+            return_exceptions=True,
+        )
+        for (compiled, event), result in zip(decisions, results, strict=True):
+            if isinstance(result, Exception):
+                self.logger.error(
+                    "Dispatch failed for rule '%s': %s",
+                    compiled.name,
+                    result,
                 )
-            return all(
-                self._match_condition(key, value, event)
-                for key, value in conditions.items()
+            if self.persistence:
+                with tracing.span("save_decision", rule=compiled.name):
+                    self.persistence.save_decision(
+                        event,
+                        compiled.rule,
+                        ruleset_version=ruleset.version,
+                    )
+
+    @property
+    def ruleset(self) -> RuleSet:
+        """Return the rule set currently serving events."""
+        return self._ruleset
+
+    @property
+    def rules(self) -> Sequence[dict]:
+        """Return the raw rules currently loaded in the engine."""
+        return self._ruleset.rules
+
+    @rules.setter
+    def rules(self, rules: Sequence[dict]) -> None:
+        """Swap in a new rule set with these rules and the current adapters."""
+        self._ruleset = self.next_ruleset(rules, self._ruleset.adapters)
+
+    @property
+    def adapters(self) -> tuple[Any, ...]:
+        """Return the adapters actions are dispatched to."""
+        return self._ruleset.adapters
+
+    @adapters.setter
+    def adapters(self, adapters: Sequence[Any]) -> None:
+        """Swap in a new rule set with the current rules and these adapters."""
+        self._ruleset = self.next_ruleset(self._ruleset.rules, adapters)
+
+    @property
+    def unresolved_targets(self) -> list[str]:
+        """Return the action targets no adapter serves in the current set."""
+        return list(self._ruleset.unresolved_targets)
+
+    def next_ruleset(
+        self,
+        rules: Sequence[dict],
+        adapters: Sequence[Any],
+    ) -> RuleSet:
+        """Build the next rule set without making it current.
+
+        Compiled rules and the index are derived from the current rule set
+        when there is one, so only changed rules are compiled and re-indexed.
+        """
+        return build_ruleset(
+            rules,
+            adapters,
+            version=next(self._versions),
+            previous=self._ruleset,
+            index_fields=self.index_fields,
+            logger=self.logger,
+        )
+
+    async def reload(
+        self,
+        rules: Sequence[dict] | None = None,
+        adapters: Sequence[Any] | None = None,
+    ) -> RuleSet:
+        """Build a new rule set off the event loop and swap it in atomically.
+
+        Omitted arguments keep their current value. Events keep being handled
+        against the previous rule set until the swap.
+        """
+        async with self._reload_lock:
+            current = self._ruleset
+            ruleset = await asyncio.to_thread(
+                self.next_ruleset,
+                current.rules if rules is None else rules,
+                current.adapters if adapters is None else adapters,
             )
+            self._ruleset = ruleset
+        self.logger.info(
+            "Rule set v%d active: %d rule(s)",
+            ruleset.version,
+            len(ruleset.compiled),
+        )
+        return ruleset
+
+    def evaluate_rule(self, rule: dict, event: dict) -> bool:
+        """Return True if the event satisfies the rule conditions.
+
+        A rule of the current rule set is checked with its compiled form, so
+        its window conditions keep their state; other rules are compiled
+        on the fly.
+        """
+        compiled = self._ruleset.compiled_for(rule)
+        if compiled is None:
+            compiled = compile_rule(rule)
+        return compiled.predicate(event)
+
+    async def trigger_actions(
+        self,
+        rule: dict,
+        event: dict,
+        *,
+        ruleset: RuleSet | None = None,
+    ) -> None:
+        """Dispatch matching actions to the adapters of `ruleset`.
 
-        if isinstance(conditions, list):
-            return all(self._evaluate_conditions(cond, event) for cond in conditions)
-
-        return False
-
-    def _match_condition(self, key: str, expected: object, event: dict) -> bool:
-        """Evaluate a single key/value condition against an event."""
-        candidate = self._get_nested_value(event, key)
-        if candidate is None:
-            return False
-
-        if isinstance(expected, str):
-            numeric = re.match(r"^(>=|<=|>|<)(.+)$", expected)
-            if numeric:
-                op, raw_threshold = numeric.groups()
-                return self._compare_numeric(candidate, raw_threshold, op)
-            return candidate == expected
-
-        return candidate == expected
-
-    @staticmethod
-    def _get_nested_value(event: dict, dotted_key: str) -> object | None:
-        """Traverse dotted keys (e.g., metadata.size) within an event dict."""
-        current: object = event
-        for part in dotted_key.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        return current
-
-    @staticmethod
-    def _compare_numeric(candidate: object, threshold: str, op: str) -> bool:
-        """Compare numeric values using the provided operator."""
-        try:
-            current_val = float(candidate)
-            threshold_val = float(threshold)
-        except (TypeError, ValueError):
-            return False
-
-        if op == ">":
-            return current_val > threshold_val
-        if op == "<":
-            return current_val < threshold_val
-        if op == ">=":
-            return current_val >= threshold_val
-        if op == "<=":
-            return current_val <= threshold_val
-        return False
-
-    async def trigger_actions(self, rule: dict, event: dict) -> None:
-        """Dispatch matching actions to the configured adapters."""
+        Defaults to the current rule set; targets missing from its routing
+        table are resolved against its adapters on the fly.
+        """
+        ruleset = ruleset or self._ruleset
         then = rule.get("then")
         if not isinstance(then, list):
             msg = "Rule '{}' must define 'then' as a list of actions".format(
@@ -126,19 +322,181 @@ class DecisionEngine:
         if not actions:
             self.logger.warning("Rule '%s' has no actions", rule.get("name"))
             return
+        dispatches = []
         for action in actions:
             target = action.get("target")
-            for adapter in self.adapters:
-                plugin_name = getattr(
-                    adapter,
-                    "plugin_name",
-                    adapter.__class__.__name__,
-                ).lower()
-                class_name = adapter.__class__.__name__.lower()
-                # Only trigger the adapter matching the target
-                if target and (
-                    plugin_name == target.lower()
-                    or class_name.startswith(target.lower())
-                ):
-                    await adapter.execute(action, event)
-                    self.logger.info("Action executed: %s", action)
+            if not target:
+                continue
+            routed = ruleset.routes.get(target)
+            if routed is None:
+                routed = resolve_target(target, list(ruleset.adapters), self.logger)
+            dispatches.extend(
+                self._execute_action(adapter, action, event) for adapter in routed
+            )
+        with tracing.span("trigger_actions", rule=rule.get("name")):
+            await asyncio.gather(*dispatches)
+
+    async def _execute_action(
+        self,
+        adapter: OutputAdapter,
+        action: dict,
+        event: dict,
+    ) -> None:
+        """Run one action and hand a failure over to the retry queue.
+
+        Failures never cancel sibling actions nor hold up the event: retries
+        run in the background.
+        """
+        error = await self._attempt(adapter, action, event)
+        if error is None:
+            return
+        if isinstance(error, BreakerOpenError):
+            if self.breakers is not None and self.breakers.policy == "spool":
+                self.retries.dead_letter(adapter, action, event, error)
+            return
+        policy = getattr(adapter, "retry_policy", None) or self.retry_policy
+        if policy is not None:
+            self.retries.schedule(adapter, action, event, error, policy)
+
+    async def _attempt(
+        self,
+        adapter: OutputAdapter,
+        action: dict,
+        event: dict,
+    ) -> Exception | None:
+        """Run one action within its adapter's concurrency limit and timeout.
+
+        Failures are logged, counted and returned instead of raised. Actions
+        whose circuit breaker is open return BreakerOpenError unattempted.
+        """
+        label = metrics.adapter_label(adapter)
+        breaker = None
+        if self.breakers is not None:
+            breaker = self.breakers.for_action(adapter, action)
+        if breaker is not None and not breaker.allow():
+            metrics.adapter_actions.labels(label, "rejected").inc()
+            self.logger.debug("Circuit %s open, action skipped", breaker.name)
+            return BreakerOpenError(f"Circuit {breaker.name} is open")
+        timeout = action.get("timeout", self.action_timeout)
+        batcher = self._batcher_for(adapter) if action.get("batch") else None
+        error: Exception | None = None
+        started = time.perf_counter()
+        with tracing.span("execute", adapter=label):
+            try:
+                if batcher is not None:
+                    async with asyncio.timeout(timeout):
+                        await batcher.submit(action, event)
+                else:
+                    limit = self._limit_for(adapter)
+                    async with (
+                        limit or contextlib.nullcontext(),
+                        asyncio.timeout(timeout),
+                    ):
+                        await adapter.execute(action, event)
+            except TimeoutError as exc:
+                metrics.actions_failed.inc()
+                metrics.adapter_actions.labels(label, "timeout").inc()
+                self.logger.error("Action timed out after %ss: %s", timeout, action)  # noqa: TRY400
+                error = exc
+            except Exception as exc:
+                metrics.actions_failed.inc()
+                metrics.adapter_actions.labels(label, "failure").inc()
+                self.logger.exception("Action failed: %s", action)
+                error = exc
+        duration = time.perf_counter() - started
+        metrics.adapter_execute_seconds.labels(label).observe(duration)
+        if breaker is not None:
+            breaker.record(success=error is None, duration=duration)
+        if error is not None:
+            return error
+        metrics.actions_triggered.inc()
+        metrics.adapter_actions.labels(label, "success").inc()
+        self.logger.info("Action executed: %s", action)
+        return None
+
+    async def replay_dead_letters(self) -> int:
+        """Run the spooled dead letters again; return how many succeeded.
+
+        Records are matched to the current adapters by plugin name; those
+        that fail again, or whose adapter is gone, stay in the spool.
+        """
+        spool = self.retries.dead_letters
+        if spool is None:
+            return 0
+        adapters = {
+            metrics.adapter_label(adapter): adapter
+            for adapter in self._ruleset.adapters
+        }
+
+        async def replay(record: dict[str, Any]) -> bool:
+            adapter = adapters.get(record["adapter"])
+            if adapter is None:
+                return False
+            return (
+                await self._attempt(adapter, record["action"], record["event"]) is None
+            )
+
+        replayed = await spool.replay(replay)
+        self.logger.info("Replayed %d dead-lettered action(s)", replayed)
+        return replayed
+
+    async def close(self) -> None:
+        """Stop aggregating, batching and retrying.
+
+        Open aggregate windows are emitted right away, batched actions still
+        lingering are sent, and pending retries are dead-lettered.
+        """
+        if self._aggregation is not None:
+            self._aggregation.cancel()
+            await asyncio.gather(self._aggregation, return_exceptions=True)
+        decisions = [
+            (compiled, window)
+            for compiled in self._aggregating
+            for window in compiled.gate.aggregate.drain()
+        ]
+        self._aggregating.clear()
+        await self._decide(decisions, self._ruleset)
+        for batcher in list(self._batchers.values()):
+            await batcher.close()
+        await self.retries.close()
+        if self.retries.dead_letters is not None:
+            self.retries.dead_letters.close()
+
+    def _batcher_for(self, adapter: OutputAdapter) -> ActionBatcher | None:
+        """Return the batcher of a batch-capable adapter when batching is on."""
+        if self.batch_size <= 1 or not getattr(adapter, "supports_batching", False):
+            return None
+        batcher = self._batchers.get(adapter)
+        if batcher is None:
+            batcher = ActionBatcher(
+                adapter,
+                self.batch_size,
+                self.batch_linger,
+                self._limit_for(adapter),
+            )
+            self._batchers[adapter] = batcher
+        return batcher
+
+    def _limit_for(self, adapter: OutputAdapter) -> asyncio.Semaphore | None:
+        """Return the semaphore bounding in-flight actions for an adapter."""
+        limit = getattr(adapter, "max_concurrency", None) or self.adapter_concurrency
+        if not limit:
+            return None
+        semaphore = self._limits.get(adapter)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(limit)
+            self._limits[adapter] = semaphore
+        return semaphore
+
+
+def _evaluate_traced(
+    candidates: list[CompiledRule],
+    event: Event,
+) -> list[CompiledRule]:
+    """Return the matching candidates, with one span per rule checked."""
+    matched: list[CompiledRule] = []
+    for compiled in candidates:
+        with tracing.span("evaluate_rule", rule=compiled.name):
+            if compiled.predicate(event):
+                matched.append(compiled)
+    return matched
@@ -0,0 +1,300 @@
+"""Rule directives that thin out matches before they reach any adapter.
+
+A rule may add, next to `when` and `then`:
+
+- `dedupe_by`: `{key, ttl}` drops a match whose key was seen in the last
+  `ttl` seconds (a dotted path, or a list of them, as the key);
+- `rate_limit`: `{limit, per, burst, key}` lets at most `limit` matches per
+  `per` seconds through, per key, as a token bucket;
+- `aggregate`: `{function, field, window, slide, key}` absorbs matches and
+  emits one `motus.aggregate` event per window (tumbling) or per `slide`
+  (sliding) with the `count`, `sum` or `max` of `field`.
+
+Each directive keeps at most `max_keys` keys (default `MAX_KEYS`).
+"""
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from motus.compiler import get_number, get_path, group_key
+from motus.windows import MAX_KEYS, LRUDict, SlidingWindow, TokenBucket, TTLSet
+
+AGGREGATE_EVENT_TYPE = "motus.aggregate"
+AGGREGATE_FUNCTIONS = ("count", "sum", "max")
+
+
+class Deduplicator:
+    """Drop matches whose key was already seen within `ttl` seconds."""
+
+    def __init__(
+        self,
+        paths: Sequence[tuple[str, ...]],
+        ttl: float,
+        max_keys: int,
+    ) -> None:
+        """Remember up to `max_keys` keys for `ttl` seconds each."""
+        self.paths = tuple(paths)
+        self._seen = TTLSet(ttl, max_keys)
+
+    def admit(self, event: object, now: float) -> bool:
+        """Return True for the first occurrence of the event's key."""
+        return self._seen.add(group_key(event, self.paths), now)
+
+
+class RateLimiter:
+    """Let at most `rate` matches per second through per key, with bursts."""
+
+    def __init__(
+        self,
+        paths: Sequence[tuple[str, ...]],
+        rate: float,
+        burst: float,
+        max_keys: int,
+    ) -> None:
+        """Keep one token bucket per key, for at most `max_keys` keys."""
+        self.paths = tuple(paths)
+        self.rate = rate
+        self.burst = burst
+        self._buckets: LRUDict[TokenBucket] = LRUDict(max_keys)
+
+    def admit(self, event: object, now: float) -> bool:
+        """Return True when the event's key still has a token."""
+        bucket = self._buckets.setdefault(
+            group_key(event, self.paths),
+            lambda: TokenBucket(self.burst, now),
+        )
+        return bucket.take(self.rate, self.burst, now)
+
+
+@dataclass(slots=True)
+class _KeyWindow:
+    window: SlidingWindow
+    key: dict[str, Any]
+    emitted: int
+
+
+class Aggregator:
+    """Fold matches into per-key windows and emit one event per window.
+
+    Emission happens lazily, when a later match (or `flush`) finds that a
+    window has closed, so each match costs O(1).
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rule_name: str,
+        *,
+        function: str,
+        field: tuple[str, ...] | None,
+        window: float,
+        slide: float,
+        paths: Sequence[tuple[str, ...]],
+        max_keys: int,
+    ) -> None:
+        """Aggregate `field` with `function` over `window` seconds."""
+        self.rule_name = rule_name
+        self.function = function
+        self.field = field
+        self.window = window
+        self.buckets = max(1, round(window / slide))
+        self.width = window / self.buckets
+        self.paths = tuple(paths)
+        self._windows: LRUDict[_KeyWindow] = LRUDict(max_keys)
+
+    def __len__(self) -> int:
+        """Return the number of keys with an open window."""
+        return len(self._windows)
+
+    def add(self, event: object, now: float) -> list[dict[str, Any]]:
+        """Fold a match in; return the events of windows it closed."""
+        value = 1.0 if self.field is None else get_number(event, self.field)
+        if value is None:
+            return []
+        current = int(now // self.width)
+        state = self._windows.setdefault(
+            group_key(event, self.paths),
+            lambda: _KeyWindow(
+                SlidingWindow(self.window, self.buckets),
+                {".".join(path): get_path(event, path) for path in self.paths},
+                current - 1,
+            ),
+        )
+        emitted = self._emit(state, current - 1) if state.emitted < current - 1 else []
+        state.window.add(value, now)
+        return emitted
+
+    def flush(self, now: float) -> list[dict[str, Any]]:
+        """Return the events of every window closed by `now`."""
+        last = int(now // self.width) - 1
+        emitted: list[dict[str, Any]] = []
+        # Reading entries through `items` keeps their recency untouched.
+        for key, state in self._windows.items():
+            emitted.extend(self._emit(state, last))
+            if state.window.newest + self.buckets <= last + 1:
+                self._windows.pop(key)
+        return emitted
+
+    def drain(self) -> list[dict[str, Any]]:
+        """Return the events of every window still to come, and forget them."""
+        emitted: list[dict[str, Any]] = []
+        for state in self._windows.values():
+            emitted.extend(self._emit(state, state.window.newest + self.buckets - 1))
+        self._windows.clear()
+        return emitted
+
+    def next_flush(self, now: float) -> float:
+        """Return when the window currently open closes."""
+        return (int(now // self.width) + 1) * self.width
+
+    def _emit(self, state: _KeyWindow, last: int) -> list[dict[str, Any]]:
+        newest = state.window.newest
+        first = max(state.emitted + 1, newest - self.buckets + 1)
+        emitted = []
+        for end in range(first, min(last, newest + self.buckets - 1) + 1):
+            count, total, highest = state.window.totals(end)
+            if count:
+                emitted.append(self._event(state.key, end, count, total, highest))
+        state.emitted = max(state.emitted, last)
+        return emitted
+
+    def _event(
+        self,
+        key: dict[str, Any],
+        end: int,
+        count: int,
+        total: float,
+        highest: float,
+    ) -> dict[str, Any]:
+        value = {"count": count, "sum": total, "max": highest}[self.function]
+        return {
+            "type": AGGREGATE_EVENT_TYPE,
+            "source": self.rule_name,
+            "metadata": {
+                "rule": self.rule_name,
+                "function": self.function,
+                "field": ".".join(self.field) if self.field else None,
+                "key": key,
+                "value": value,
+                "count": count,
+                "window_start": (end + 1) * self.width - self.window,
+                "window_end": (end + 1) * self.width,
+            },
+        }
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RuleGate:
+    """The directives of one rule, applied in order to each of its matches."""
+
+    dedupe: Deduplicator | None = None
+    rate_limit: RateLimiter | None = None
+    aggregate: Aggregator | None = None
+
+    def admit(self, event: object, now: float) -> str | None:
+        """Return the directive suppressing the match, or None to keep it."""
+        if self.dedupe is not None and not self.dedupe.admit(event, now):
+            return "dedupe_by"
+        if self.rate_limit is not None and not self.rate_limit.admit(event, now):
+            return "rate_limit"
+        return None
+
+
+def compile_directives(rule: dict) -> RuleGate | None:
+    """Build the gate of a rule, or None when it uses no directive."""
+    name = rule.get("name", "<unnamed>")
+    dedupe = rule.get("dedupe_by")
+    rate_limit = rule.get("rate_limit")
+    aggregate = rule.get("aggregate")
+    if dedupe is None and rate_limit is None and aggregate is None:
+        return None
+    return RuleGate(
+        dedupe=_deduplicator(name, dedupe) if dedupe is not None else None,
+        rate_limit=_rate_limiter(name, rate_limit) if rate_limit is not None else None,
+        aggregate=_aggregator(name, aggregate) if aggregate is not None else None,
+    )
+
+
+def _deduplicator(name: str, spec: object) -> Deduplicator:
+    if not isinstance(spec, dict):
+        spec = {"key": spec}
+    return Deduplicator(
+        _key_paths(name, "dedupe_by", spec.get("key"), required=True),
+        _positive(name, "dedupe_by.ttl", spec.get("ttl", 60)),
+        int(spec.get("max_keys", MAX_KEYS)),
+    )
+
+
+def _rate_limiter(name: str, spec: object) -> RateLimiter:
+    if not isinstance(spec, dict):
+        msg = f"Rule '{name}': 'rate_limit' must be a mapping"
+        raise TypeError(msg)
+    limit = _positive(name, "rate_limit.limit", spec.get("limit"))
+    per = _positive(name, "rate_limit.per", spec.get("per", 1))
+    return RateLimiter(
+        _key_paths(name, "rate_limit", spec.get("key")),
+        limit / per,
+        _positive(name, "rate_limit.burst", spec.get("burst", limit)),
+        int(spec.get("max_keys", MAX_KEYS)),
+    )
+
+
+def _aggregator(name: str, spec: object) -> Aggregator:
+    if not isinstance(spec, dict):
+        msg = f"Rule '{name}': 'aggregate' must be a mapping"
+        raise TypeError(msg)
+    function = spec.get("function", "count")
+    if function not in AGGREGATE_FUNCTIONS:
+        msg = f"Rule '{name}': aggregate function must be one of {AGGREGATE_FUNCTIONS}"
+        raise TypeError(msg)
+    field = spec.get("field")
+    if function != "count" and not isinstance(field, str):
+        msg = f"Rule '{name}': aggregate '{function}' needs a 'field'"
+        raise TypeError(msg)
+    window = _positive(name, "aggregate.window", spec.get("window"))
+    return Aggregator(
+        name,
+        function=function,
+        field=tuple(field.split(".")) if isinstance(field, str) else None,
+        window=window,
+        slide=min(
+            _positive(name, "aggregate.slide", spec.get("slide", window)),
+            window,
+        ),
+        paths=_key_paths(name, "aggregate", spec.get("key")),
+        max_keys=int(spec.get("max_keys", MAX_KEYS)),
+    )
+
+
+def _key_paths(
+    name: str,
+    directive: str,
+    key: object,
+    *,
+    required: bool = False,
+) -> tuple[tuple[str, ...], ...]:
+    if key is None and not required:
+        return ()
+    keys = [key] if isinstance(key, str) else key
+    if (
+        not isinstance(keys, list)
+        or not keys
+        or not all(isinstance(k, str) for k in keys)
+    ):
+        msg = (
+            f"Rule '{name}': '{directive}' key must be a dotted path or a list of them"
+        )
+        raise TypeError(msg)
+    return tuple(tuple(k.split(".")) for k in keys)
+
+
+def _positive(name: str, option: str, value: object) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not number > 0:
+        msg = f"Rule '{name}': '{option}' must be a positive number"
+        raise TypeError(msg)
+    return number
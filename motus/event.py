@@ -0,0 +1,102 @@
+"""Lightweight event wrapper with lazy normalization and memoized lookups."""
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+EVENT_FIELDS: tuple[str, ...] = ("type", "source", "metadata", "timestamp")
+
+
+class Event(Mapping[str, Any]):
+    """Read-only view of an incoming payload, shared by every rule.
+
+    The view stays inside the engine: adapters, retries and persistence get
+    a plain dict from `to_dict`.
+
+    With `normalize` the view exposes only the standard fields
+    (`EVENT_FIELDS`, `metadata` defaulting to `{}`) without copying the raw
+    payload; otherwise it mirrors the raw dict. Dotted-path lookups and their
+    float conversions are computed once per event and memoized, so a field
+    referenced by many rules is resolved a single time.
+    """
+
+    __slots__ = ("_normalize", "_numbers", "_paths", "_raw")
+
+    def __init__(self, raw: dict[str, Any], *, normalize: bool = True) -> None:
+        """Wrap `raw` without copying it."""
+        self._raw = raw
+        self._normalize = normalize
+        self._paths: dict[tuple[str, ...], Any] = {}
+        self._numbers: dict[tuple[str, ...], float | None] = {}
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        """Return a top-level field of the (normalized) event."""
+        if not self._normalize:
+            return self._raw[key]
+        if key not in EVENT_FIELDS:
+            raise KeyError(key)
+        if key == "metadata":
+            return self._raw.get("metadata", {})
+        return self._raw.get(key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the top-level field names."""
+        return iter(EVENT_FIELDS if self._normalize else self._raw)
+
+    def __len__(self) -> int:
+        """Return the number of top-level fields."""
+        return len(EVENT_FIELDS) if self._normalize else len(self._raw)
+
+    def __repr__(self) -> str:
+        """Show the event like the dict it stands for."""
+        return repr(self.to_dict())
+
+    def __reduce__(self) -> tuple:
+        """Pickle the raw payload only; memoized lookups are rebuilt lazily."""
+        return (_rebuild, (self._raw, self._normalize))
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        """Return the wrapped payload as received."""
+        return self._raw
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a plain dict of the (normalized) event."""
+        return dict(self.items())
+
+    def lookup(self, path: tuple[str, ...]) -> Any:  # noqa: ANN401
+        """Resolve a pre-split dotted path, or None when it is missing."""
+        try:
+            return self._paths[path]
+        except KeyError:
+            value = self._paths[path] = self._resolve(path)
+            return value
+
+    def number(self, path: tuple[str, ...]) -> float | None:
+        """Resolve a path and convert it to float once; None if not numeric."""
+        try:
+            return self._numbers[path]
+        except KeyError:
+            pass
+        candidate = self.lookup(path)
+        try:
+            value = None if candidate is None else float(candidate)
+        except (TypeError, ValueError):
+            value = None
+        self._numbers[path] = value
+        return value
+
+    def _resolve(self, path: tuple[str, ...]) -> Any:  # noqa: ANN401
+        first, *rest = path
+        try:
+            current = self[first]
+        except KeyError:
+            return None
+        for part in rest:
+            if not isinstance(current, dict) or part not in current:
+                return None
+            current = current[part]
+        return current
+
+
+def _rebuild(raw: dict[str, Any], normalize: bool) -> Event:  # noqa: FBT001
+    return Event(raw, normalize=normalize)
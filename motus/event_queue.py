@@ -0,0 +1,138 @@
+"""Bounded event queue feeding the decision engine."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from motus import metrics
+
+QUEUE_POLICIES = ("block", "drop_oldest", "reject")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when an event is rejected because the queue is full."""
+
+
+class EventQueue:
+    """Bounded buffer between ingestors and a pool of engine workers.
+
+    When the queue is full, `policy` decides what happens to a new event:
+    `block` makes a producer awaiting `put` wait for room, `drop_oldest`
+    evicts the oldest queued event and `reject` raises QueueFullError.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        policy: str = "block",
+        workers: int = 8,
+    ) -> None:
+        """Create a queue holding at most `maxsize` events."""
+        if policy not in QUEUE_POLICIES:
+            msg = f"Unknown queue policy '{policy}', expected one of {QUEUE_POLICIES}"
+            raise ValueError(msg)
+        if maxsize < 1 or workers < 1:
+            msg = "Queue size and worker count must be positive"
+            raise ValueError(msg)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.workers = workers
+        self.logger = logging.getLogger("motus.queue")
+        self._queue: asyncio.Queue[tuple[float, dict[str, Any]]] = asyncio.Queue(
+            maxsize,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of queued events."""
+        return self._queue.qsize()
+
+    def offer(self, event: dict[str, Any]) -> None:
+        """Enqueue an event without waiting, applying the full-queue policy.
+
+        This is the synchronous ingestor callback. It cannot wait for room,
+        so under the `block` policy a full queue raises QueueFullError just
+        like `reject`; use `put` to wait instead.
+        """
+        if not self._put_nowait((time.monotonic(), event)):
+            self._reject()
+        metrics.queue_depth.set(self._queue.qsize())
+
+    async def put(self, event: dict[str, Any]) -> None:
+        """Enqueue an event, waiting for room under the `block` policy.
+
+        Awaiting it propagates backpressure upstream.
+        """
+        item = (time.monotonic(), event)
+        if not self._put_nowait(item):
+            if self.policy != "block":
+                self._reject()
+            await self._queue.put(item)
+        metrics.queue_depth.set(self._queue.qsize())
+
+    async def offer_batch(self, events: list[dict[str, Any]]) -> list[bool]:
+        """Enqueue several events at once; return whether each was accepted.
+
+        Under the `block` policy this waits for room instead of refusing, and
+        `reject` refuses only the events that do not fit.
+        """
+        enqueued_at = time.monotonic()
+        accepted: list[bool] = []
+        for event in events:
+            item = (enqueued_at, event)
+            if self._put_nowait(item):
+                accepted.append(True)
+            elif self.policy == "block":
+                await self._queue.put(item)
+                accepted.append(True)
+            else:
+                metrics.events_rejected.inc()
+                accepted.append(False)
+        metrics.queue_depth.set(self._queue.qsize())
+        return accepted
+
+    def _put_nowait(self, item: tuple[float, dict[str, Any]]) -> bool:
+        """Queue `item` if there is room or `drop_oldest` makes some."""
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            if self.policy != "drop_oldest":
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+            metrics.events_dropped.inc()
+            self._queue.put_nowait(item)
+        return True
+
+    def _reject(self) -> None:
+        metrics.events_rejected.inc()
+        msg = f"Event queue full ({self.maxsize} events)"
+        raise QueueFullError(msg)
+
+    async def run(
+        self,
+        handler: Callable[[dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """Drain the queue with the configured number of workers forever."""
+        await asyncio.gather(*(self._worker(handler) for _ in range(self.workers)))
+
+    async def join(self) -> None:
+        """Wait until every queued event has been handled."""
+        await self._queue.join()
+
+    async def _worker(
+        self,
+        handler: Callable[[dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        while True:
+            enqueued_at, event = await self._queue.get()
+            metrics.queue_depth.set(self._queue.qsize())
+            metrics.queue_wait_seconds.observe(time.monotonic() - enqueued_at)
+            try:
+                await handler(event)
+            except Exception:
+                self.logger.exception("Event handling failed")
+            finally:
+                metrics.event_latency_seconds.observe(time.monotonic() - enqueued_at)
+                self._queue.task_done()
@@ -0,0 +1,41 @@
+"""HTTP exposition of Motus metrics in the Prometheus text format."""
+
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from motus import metrics, tracing
+
+METRICS_PATH = "/metrics"
+
+
+async def handle_metrics(_request: web.Request) -> web.Response:
+    """Render every registered metric, aggregated across worker processes."""
+    body = generate_latest(metrics.registry())
+    return web.Response(body=body, headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def add_metrics_route(app: web.Application, path: str = METRICS_PATH) -> None:
+    """Serve metrics from an existing aiohttp application."""
+    app.router.add_get(path, handle_metrics)
+
+
+async def start_metrics_server(
+    host: str,
+    port: int,
+    path: str = METRICS_PATH,
+    *,
+    tracer: tracing.Tracer | None = None,
+) -> web.AppRunner:
+    """Serve metrics on a dedicated port; clean up the returned runner.
+
+    With a `tracer` the debug endpoints of `tracing` are served as well.
+    """
+    app = web.Application()
+    add_metrics_route(app, path)
+    if tracer is not None:
+        tracing.add_debug_routes(app, tracer)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
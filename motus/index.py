@@ -0,0 +1,221 @@
+"""Discrimination index narrowing rules down to candidates per event."""
+
+import math
+from bisect import bisect_left, bisect_right
+from collections.abc import Hashable, Sequence
+from typing import Any
+
+from motus.compiler import CompiledRule, get_number, get_path
+
+DEFAULT_INDEX_FIELDS: tuple[str, ...] = ("type", "source")
+
+
+class ThresholdIndex:
+    """Sorted thresholds per comparison operator on a single dotted field.
+
+    The rules satisfied by an event value form a prefix or suffix of each
+    sorted list, so one bisect per operator finds all of them.
+    """
+
+    __slots__ = ("_keys", "_path", "_rules")
+
+    def __init__(self, field: str) -> None:
+        """Create an empty threshold index for the given dotted field."""
+        self._path = tuple(field.split("."))
+        self._keys: dict[str, list[float]] = {op: [] for op in (">", ">=", "<", "<=")}
+        self._rules: dict[str, list[CompiledRule]] = {op: [] for op in self._keys}
+
+    def __bool__(self) -> bool:
+        """Return True while at least one rule is indexed."""
+        return any(self._keys.values())
+
+    def copy(self) -> "ThresholdIndex":
+        """Return an independent copy of the sorted lists."""
+        clone: ThresholdIndex = ThresholdIndex.__new__(ThresholdIndex)
+        clone._path = self._path
+        clone._keys = {op: keys.copy() for op, keys in self._keys.items()}
+        clone._rules = {op: rules.copy() for op, rules in self._rules.items()}
+        return clone
+
+    def add(self, op: str, threshold: float, compiled: CompiledRule) -> None:
+        """Insert a rule under its operator and threshold."""
+        keys = self._keys[op]
+        position = bisect_right(keys, threshold)
+        keys.insert(position, threshold)
+        self._rules[op].insert(position, compiled)
+
+    def remove(self, op: str, threshold: float, compiled: CompiledRule) -> None:
+        """Remove a rule previously added with the same operator/threshold."""
+        keys = self._keys[op]
+        rules = self._rules[op]
+        start = bisect_left(keys, threshold)
+        end = bisect_right(keys, threshold)
+        position = start + rules[start:end].index(compiled)
+        del keys[position]
+        del rules[position]
+
+    def collect(self, event: dict[str, Any], found: list[CompiledRule]) -> None:
+        """Append every rule whose constraint the event value satisfies."""
+        value = get_number(event, self._path)
+        if value is None or math.isnan(value):
+            return
+        keys = self._keys
+        rules = self._rules
+        found.extend(rules[">="][: bisect_right(keys[">="], value)])
+        found.extend(rules[">"][: bisect_left(keys[">"], value)])
+        found.extend(rules["<="][bisect_left(keys["<="], value) :])
+        found.extend(rules["<"][bisect_right(keys["<"], value) :])
+
+
+class _Bucket:
+    """Rules sharing an index entry, split by numeric constraint."""
+
+    __slots__ = ("rules", "thresholds")
+
+    def __init__(self) -> None:
+        self.rules: list[CompiledRule] = []
+        self.thresholds: dict[str, ThresholdIndex] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules or self.thresholds)
+
+    def copy(self) -> "_Bucket":
+        clone = _Bucket()
+        clone.rules = self.rules.copy()
+        clone.thresholds = {
+            field: thresholds.copy() for field, thresholds in self.thresholds.items()
+        }
+        return clone
+
+    def add(self, compiled: CompiledRule) -> None:
+        if not compiled.comparisons:
+            self.rules.append(compiled)
+            return
+        field, op, threshold = compiled.comparisons[0]
+        if field not in self.thresholds:
+            self.thresholds[field] = ThresholdIndex(field)
+        self.thresholds[field].add(op, threshold, compiled)
+
+    def remove(self, compiled: CompiledRule) -> None:
+        if not compiled.comparisons:
+            self.rules.remove(compiled)
+            return
+        field, op, threshold = compiled.comparisons[0]
+        thresholds = self.thresholds[field]
+        thresholds.remove(op, threshold, compiled)
+        if not thresholds:
+            del self.thresholds[field]
+
+    def collect(self, event: dict[str, Any], found: list[CompiledRule]) -> None:
+        found.extend(self.rules)
+        for thresholds in self.thresholds.values():
+            thresholds.collect(event, found)
+
+
+class RuleIndex:
+    """Index compiled rules by the equality constraints they require.
+
+    Each rule is filed under the first configured field it constrains, once
+    per allowed value; rules without such a constraint live in a root bucket.
+    Within every bucket, rules requiring a numeric comparison are kept in a
+    sorted threshold index so tiered thresholds cost a bisect per field.
+    """
+
+    def __init__(self, fields: Sequence[str] = DEFAULT_INDEX_FIELDS) -> None:
+        """Create an empty index keyed by the given dotted fields."""
+        self.fields = tuple(fields)
+        self._paths = {name: tuple(name.split(".")) for name in self.fields}
+        self._buckets: dict[str, dict[Hashable, _Bucket]] = {
+            name: {} for name in self.fields
+        }
+        self._root = _Bucket()
+        self._positions: dict[CompiledRule, int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed rules."""
+        return len(self._positions)
+
+    def copy(self) -> "RuleIndex":
+        """Return an independent copy that can be updated without side effects.
+
+        Used to derive the index of a new rule set while the current one keeps
+        serving events.
+        """
+        clone: RuleIndex = RuleIndex.__new__(RuleIndex)
+        clone.fields = self.fields
+        clone._paths = self._paths
+        clone._buckets = {
+            field: {value: bucket.copy() for value, bucket in buckets.items()}
+            for field, buckets in self._buckets.items()
+        }
+        clone._root = self._root.copy()
+        clone._positions = self._positions.copy()
+        return clone
+
+    def update(self, compiled_rules: Sequence[CompiledRule]) -> None:
+        """Sync the index with a new rule list, touching only changed rules."""
+        wanted = set(compiled_rules)
+        for compiled in [c for c in self._positions if c not in wanted]:
+            self.remove(compiled)
+        for position, compiled in enumerate(compiled_rules):
+            if compiled not in self._positions:
+                self.add(compiled, position)
+            else:
+                self._positions[compiled] = position
+
+    def add(self, compiled: CompiledRule, position: int | None = None) -> None:
+        """Insert a compiled rule into the index."""
+        if position is None:
+            position = len(self._positions)
+        self._positions[compiled] = position
+        field = self._key_field(compiled)
+        if field is None:
+            self._root.add(compiled)
+            return
+        buckets = self._buckets[field]
+        for value in compiled.equalities[field]:
+            if value not in buckets:
+                buckets[value] = _Bucket()
+            buckets[value].add(compiled)
+
+    def remove(self, compiled: CompiledRule) -> None:
+        """Drop a compiled rule from the index."""
+        if self._positions.pop(compiled, None) is None:
+            return
+        field = self._key_field(compiled)
+        if field is None:
+            self._root.remove(compiled)
+            return
+        buckets = self._buckets[field]
+        for value in compiled.equalities[field]:
+            bucket = buckets[value]
+            bucket.remove(compiled)
+            if not bucket:
+                del buckets[value]
+
+    def candidates(self, event: dict[str, Any]) -> list[CompiledRule]:
+        """Return the rules an event may match, in rule order."""
+        found: list[CompiledRule] = []
+        self._root.collect(event, found)
+        for field, path in self._paths.items():
+            buckets = self._buckets[field]
+            if not buckets:
+                continue
+            value = get_path(event, path)
+            if value is None:
+                continue
+            try:
+                bucket = buckets.get(value)
+            except TypeError:
+                continue
+            if bucket:
+                bucket.collect(event, found)
+        if len(found) > 1:
+            found.sort(key=self._positions.__getitem__)
+        return found
+
+    def _key_field(self, compiled: CompiledRule) -> str | None:
+        for field in self.fields:
+            if field in compiled.equalities:
+                return field
+        return None
@@ -1,26 +1,64 @@
 """Base class for Event Ingestor."""
 
 import abc
-from collections.abc import Callable
+import inspect
+from collections.abc import Awaitable, Callable
 from typing import Any
 
+from motus.event import Event
+from motus.event_queue import QueueFullError
+
+EventCallback = Callable[[dict[str, Any]], Awaitable[None] | None]
+PutCallback = Callable[[dict[str, Any]], Awaitable[None]]
+BatchCallback = Callable[[list[dict[str, Any]]], Awaitable[list[bool]]]
+
 
 class EventIngestor(abc.ABC):
-    """Base class for input ingestors."""
+    """Base class for input ingestors.
+
+    `callback` never waits: when the queue is full it applies the queue
+    policy and may raise QueueFullError. `put_callback` and `batch_callback`,
+    when set by the runtime, wait for room instead; `submit` and
+    `submit_batch` use them, so awaiting those applies backpressure.
+    """
+
+    put_callback: PutCallback | None = None
+    batch_callback: BatchCallback | None = None
 
-    def __init__(self, callback: Callable[[dict[str, Any]], None]) -> None:
+    def __init__(self, callback: EventCallback) -> None:
         """Store the callback used to forward normalized events."""
         self.callback = callback
 
+    async def submit(self, event: dict[str, Any]) -> None:
+        """Forward an event, waiting for room in the queue if needed."""
+        if self.put_callback is not None:
+            await self.put_callback(event)
+            return
+        pending = self.callback(event)
+        if inspect.isawaitable(pending):
+            await pending
+
+    async def submit_batch(self, events: list[dict[str, Any]]) -> list[bool]:
+        """Forward several events; return whether each one was accepted."""
+        if self.batch_callback is not None:
+            return await self.batch_callback(events)
+        accepted: list[bool] = []
+        for event in events:
+            try:
+                await self.submit(event)
+            except QueueFullError:
+                accepted.append(False)
+            else:
+                accepted.append(True)
+        return accepted
+
     @abc.abstractmethod
     async def start(self) -> None:
         """Start listening for events."""
 
-    def normalize_event(self, raw_event: dict[str, Any]) -> dict[str, Any]:
-        """Normalize raw payloads into the standard event schema."""
-        return {
-            "type": raw_event.get("type"),
-            "source": raw_event.get("source"),
-            "metadata": raw_event.get("metadata", {}),
-            "timestamp": raw_event.get("timestamp"),
-        }
+    def normalize_event(self, raw_event: dict[str, Any]) -> Event:
+        """Normalize raw payloads into the standard event schema.
+
+        The payload is wrapped, not copied; see `Event`.
+        """
+        return Event(raw_event)
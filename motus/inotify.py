@@ -0,0 +1,116 @@
+"""Minimal Linux inotify binding used by the rules watcher."""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+
+FOLDER_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+_LIBC = _load_libc()
+
+
+def inotify_available() -> bool:
+    """Return True when the platform supports inotify."""
+    return _LIBC is not None
+
+
+class FolderWatch:
+    """Wait for inotify events on a single directory."""
+
+    def __init__(self, folder: str | Path) -> None:
+        """Start watching `folder`; raise OSError if inotify is unavailable."""
+        if _LIBC is None:
+            msg = "inotify is not available on this platform"
+            raise OSError(msg)
+        self._fd = _LIBC.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        watch = _LIBC.inotify_add_watch(
+            self._fd,
+            os.fsencode(str(folder)),
+            FOLDER_MASK,
+        )
+        if watch < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), str(folder))
+        self.closed = False
+        self.folder_gone = False
+
+    async def wait(self) -> set[str]:
+        """Wait until events arrive and return the file names they touched."""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        loop.add_reader(self._fd, ready.set)
+        try:
+            await ready.wait()
+        finally:
+            loop.remove_reader(self._fd)
+        return self.read_names()
+
+    def read_names(self) -> set[str]:
+        """Drain pending events without blocking."""
+        names: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                return names
+            if not data:
+                return names
+            offset = 0
+            while offset + _HEADER.size <= len(data):
+                _, mask, _, length = _HEADER.unpack_from(data, offset)
+                offset += _HEADER.size
+                raw = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    self.folder_gone = True
+                if raw:
+                    names.add(os.fsdecode(raw))
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        if not self.closed:
+            os.close(self._fd)
+            self.closed = True
@@ -1,8 +1,166 @@
-"""Prometheus metrics for Motus."""
+"""Prometheus metrics for Motus.
+
+When `PROMETHEUS_MULTIPROC_DIR` is set before this module is imported (as
+`python -m motus --workers N` does), every process writes its samples there
+and `registry()` aggregates them.
+
+Per-rule and per-adapter series go through `BoundedLabels`, which folds label
+values past `MAX_LABEL_VALUES` into a single `OVERFLOW_LABEL` series so a
+large or generated rule set cannot explode the number of time series.
+"""
+
+import os
+import threading
+from typing import Any
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+)
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+MAX_LABEL_VALUES = 200
+OVERFLOW_LABEL = "_other"
+
+_FAST_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+)
+
+
+class BoundedLabels:
+    """Hand out labelled children of a metric for a bounded set of values.
+
+    Each distinct label tuple gets its own series until `limit` tuples have
+    been seen; later ones share the series whose values are all
+    `OVERFLOW_LABEL`. Children are cached, so hot paths skip the label lookup.
+    """
+
+    def __init__(self, metric: Any, limit: int = MAX_LABEL_VALUES) -> None:  # noqa: ANN401
+        """Wrap a metric declared with label names."""
+        self.metric = metric
+        self.limit = limit
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:  # noqa: ANN401
+        """Return the child for `values`, or the overflow child once full."""
+        child = self._children.get(values)
+        if child is not None:
+            return child
+        with self._lock:
+            if values not in self._children and len(self._children) >= self.limit:
+                values = (OVERFLOW_LABEL,) * len(values)
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self.metric.labels(*values)
+            return child
 
-from prometheus_client import Counter
 
 events_received = Counter("motus_events_received", "Events received")
 decisions_made = Counter("motus_decisions_made", "Decisions taken")
 actions_triggered = Counter("motus_actions_triggered", "Actions triggered")
 actions_failed = Counter("motus_actions_failed", "Actions failed")
+actions_retried = Counter("motus_actions_retried", "Action retries scheduled")
+actions_dead_lettered = Counter(
+    "motus_actions_dead_lettered",
+    "Actions given up on after their last retry",
+)
+events_dropped = Counter("motus_events_dropped", "Events dropped on full queue")
+events_rejected = Counter("motus_events_rejected", "Events rejected on full queue")
+queue_depth = Gauge(
+    "motus_queue_depth",
+    "Events waiting in the engine queue",
+    multiprocess_mode="livesum",
+)
+queue_wait_seconds = Histogram(
+    "motus_queue_wait_seconds",
+    "Time events spend queued before an engine worker picks them up",
+)
+
+event_latency_seconds = Histogram(
+    "motus_event_latency_seconds",
+    "Time from enqueueing an event until all of its decisions are done",
+)
+rule_evaluation_seconds = Histogram(
+    "motus_rule_evaluation_seconds",
+    "Time spent selecting and evaluating the rules for one event",
+    buckets=_FAST_BUCKETS,
+)
+rule_matches = BoundedLabels(
+    Counter("motus_rule_matches", "Events matched, per rule", ["rule"]),
+)
+matches_suppressed = BoundedLabels(
+    Counter(
+        "motus_matches_suppressed",
+        "Rule matches held back by dedupe_by, rate_limit or aggregate",
+        ["rule", "directive"],
+    ),
+)
+adapter_execute_seconds = BoundedLabels(
+    Histogram(
+        "motus_adapter_execute_seconds",
+        "Time to execute one action (including batching waits), per adapter",
+        ["adapter"],
+    ),
+)
+adapter_actions = BoundedLabels(
+    Counter(
+        "motus_adapter_actions",
+        "Actions per adapter and outcome (success, failure, timeout, rejected)",
+        ["adapter", "outcome"],
+    ),
+)
+breaker_state = BoundedLabels(
+    Gauge(
+        "motus_breaker_state",
+        "Circuit breaker state per target (0 closed, 1 half-open, 2 open)",
+        ["breaker"],
+        multiprocess_mode="max",
+    ),
+)
+breaker_transitions = BoundedLabels(
+    Counter(
+        "motus_breaker_transitions",
+        "Circuit breaker state changes per target and new state",
+        ["breaker", "state"],
+    ),
+)
+persistence_flush_seconds = Histogram(
+    "motus_persistence_flush_seconds",
+    "Time to write one batch of audit records",
+    buckets=_FAST_BUCKETS,
+)
+
+
+def adapter_label(adapter: object) -> str:
+    """Return the label identifying an adapter in metrics."""
+    return getattr(adapter, "plugin_name", None) or type(adapter).__name__
+
+
+def registry() -> CollectorRegistry:
+    """Return the registry to expose, aggregated across processes if needed."""
+    if not os.environ.get(MULTIPROC_ENV):
+        return REGISTRY
+    aggregated = CollectorRegistry()
+    multiprocess.MultiProcessCollector(aggregated)
+    return aggregated
+
+
+def mark_process_dead(pid: int | None) -> None:
+    """Drop the live gauge samples of an exited worker process."""
+    if pid is not None and os.environ.get(MULTIPROC_ENV):
+        multiprocess.mark_process_dead(pid)
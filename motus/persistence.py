@@ -1,35 +1,480 @@
 """Persistence layer base (extensible)."""
 
+import ast
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import re
 import sqlite3
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from motus import metrics, serialization
+
+DecisionRow = tuple[str, str, int | None, str]
+RuleRow = tuple[str, str | None, str]
+
+_RULE_HASH_CACHE_SIZE = 4096
+_PARTITION_PATTERN = re.compile(r"^decisions_(\d{8})$")
+_VACUUM_PAGES = 1000
+_AUTO_VACUUM_INCREMENTAL = 2
+_MIGRATE_BATCH = 1000
 
 
 class Persistence:
-    """SQLite-backed persistence helper for decisions."""
+    """SQLite-backed persistence helper for decisions.
+
+    Each rule version is stored once in the `rules` table, keyed by a hash of
+    its content; decision rows reference it, record the engine rule-set
+    version that produced them and keep the event as compact JSON. Decisions
+    are partitioned into one `decisions_YYYYMMDD` table per UTC day, exposed
+    together through the `decisions` view.
+
+    A `decisions` table left by releases before partitioning is moved into
+    the daily partitions when the database is opened.
 
-    def __init__(self, db_path: str = "motus.db") -> None:
+    A background maintenance task drops partitions older than
+    `retention_days` (exporting them to gzipped JSON lines in `archive_dir`
+    first, when set) and runs incremental vacuum, on its own connection and
+    thread so event processing is never blocked.
+
+    With `write_behind` enabled, decisions are buffered in memory and written
+    in batches off the event loop once `batch_size` rows are pending or every
+    `flush_interval` seconds. If the buffer reaches `max_buffer` rows before
+    the background flusher catches up, the caller flushes synchronously so
+    no audit record is ever dropped.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        db_path: str = "motus.db",
+        *,
+        write_behind: bool = False,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_buffer: int = 10000,
+        retention_days: int | None = None,
+        archive_dir: str | None = None,
+        maintenance_interval: float = 3600.0,
+    ) -> None:
         """Initialize the database connection and schema."""
-        self.conn = sqlite3.connect(db_path)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.retention_days = retention_days
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.maintenance_interval = maintenance_interval
+        self.write_behind = write_behind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max(max_buffer, batch_size)
+        self.logger = logging.getLogger("motus.persistence")
+        self._lock = threading.Lock()
+        self._buffer: list[DecisionRow] = []
+        self._pending_rules: dict[str, RuleRow] = {}
+        self._stored_rules: set[str] = set()
+        self._rule_hashes: dict[int, tuple[object, str]] = {}
+        self._wakeup = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self._maintainer: asyncio.Task | None = None
+        self._partitions: set[str] = set()
         self._init_db()
 
     def _init_db(self) -> None:
         cursor = self.conn.cursor()
+        if not cursor.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+            # Only takes effect before the first table is created.
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        if _table_exists(self.conn, "decisions"):
+            # Unpartitioned schema from older releases, migrated below.
+            cursor.execute("ALTER TABLE decisions RENAME TO decisions_legacy")
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS decisions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event TEXT,
-                rule TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            CREATE TABLE IF NOT EXISTS rules (
+                hash TEXT PRIMARY KEY,
+                name TEXT,
+                body TEXT NOT NULL
             )
             """,
         )
         self.conn.commit()
+        with self._lock, self.conn:
+            self._partitions = set(_list_partitions(self.conn))
+            for name in self._partitions:
+                _add_version_column(self.conn, name)
+            _refresh_view(self.conn)
+        if _table_exists(self.conn, "decisions_legacy"):
+            self._migrate_legacy()
+        auto_vacuum = cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if auto_vacuum != _AUTO_VACUUM_INCREMENTAL:
+            # Databases from older releases: switching takes one full VACUUM.
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            cursor.execute("VACUUM")
 
-    def save_decision(self, event: object, rule: object) -> None:
-        """Persist a decision for auditing purposes."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO decisions (event, rule) VALUES (?, ?)",
-            (str(event), str(rule)),
+    def _migrate_legacy(self) -> None:
+        """Move the rows of the unpartitioned table into daily partitions.
+
+        Older releases stored `str()` of the event and the rule; both are
+        parsed back when possible and kept as a JSON string otherwise. The
+        move is one transaction, so an interrupted upgrade starts over.
+        """
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            days = self.conn.execute(
+                "SELECT DISTINCT COALESCE(timestamp, CURRENT_TIMESTAMP) "
+                "FROM decisions_legacy",
+            ).fetchall()
+            for (timestamp,) in days:
+                self._ensure_partition(_partition_for(timestamp))
+            legacy = self.conn.execute(
+                "SELECT COALESCE(timestamp, CURRENT_TIMESTAMP), rule, event "
+                "FROM decisions_legacy ORDER BY id",
+            )
+            while chunk := legacy.fetchmany(_MIGRATE_BATCH):
+                rows: list[DecisionRow] = []
+                rules: dict[str, RuleRow] = {}
+                for timestamp, rule_text, event_text in chunk:
+                    rule = _literal(rule_text)
+                    rule_hash = _content_hash(rule)
+                    name = rule.get("name") if isinstance(rule, dict) else None
+                    rules[rule_hash] = (rule_hash, name, _dumps(rule))
+                    rows.append(
+                        (timestamp, rule_hash, None, _dumps(_literal(event_text))),
+                    )
+                self._insert_rows(rows, list(rules.values()))
+            self.conn.execute("DROP TABLE decisions_legacy")
+        self.logger.info("Migrated legacy decisions into daily partitions")
+
+    def save_decision(
+        self,
+        event: object,
+        rule: object,
+        *,
+        ruleset_version: int | None = None,
+    ) -> None:
+        """Persist a decision for auditing purposes.
+
+        `ruleset_version` identifies the engine rule set that matched.
+        """
+        rule_hash = self._rule_hash(rule)
+        if rule_hash not in self._stored_rules and rule_hash not in self._pending_rules:
+            name = rule.get("name") if isinstance(rule, dict) else None
+            self._pending_rules[rule_hash] = (rule_hash, name, _dumps(rule))
+        self._buffer.append(
+            (_utc_timestamp(), rule_hash, ruleset_version, _dumps(event)),
         )
-        self.conn.commit()
+        if not self.write_behind:
+            self.flush()
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self.logger.warning(
+                "Audit buffer full (%d rows), flushing synchronously",
+                len(self._buffer),
+            )
+            self.flush()
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def recent_decisions(
+        self,
+        limit: int = 100,
+        rule_name: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the latest decisions with their event and rule decoded."""
+        query = (
+            "SELECT d.timestamp, r.name, d.ruleset_version, d.event, r.body "
+            "FROM decisions d "
+            "JOIN rules r ON r.hash = d.rule_hash"
+        )
+        params: tuple = ()
+        if rule_name is not None:
+            query += " WHERE r.name = ?"
+            params = (rule_name,)
+        query += " ORDER BY d.timestamp DESC, d.id DESC LIMIT ?"
+        with self._lock:
+            rows = self.conn.execute(query, (*params, limit)).fetchall()
+        return [
+            {
+                "timestamp": timestamp,
+                "rule_name": name,
+                "ruleset_version": version,
+                "event": serialization.loads(event),
+                "rule": serialization.loads(body),
+            }
+            for timestamp, name, version, event, body in rows
+        ]
+
+    def flush(self) -> None:
+        """Write all buffered decisions on the calling thread.
+
+        On a database error the batch is kept for the next flush and the
+        error is raised.
+        """
+        rows, rules = self._take_batch()
+        if not rows and not rules:
+            return
+        try:
+            self._write_rows(rows, rules)
+        except sqlite3.Error:
+            self._requeue(rows, rules)
+            raise
+
+    def maintain(self, today: datetime | None = None) -> list[str]:
+        """Apply retention and incremental vacuum; return dropped partitions.
+
+        Runs on a dedicated connection so it can be called from a worker
+        thread while the main connection keeps writing.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            dropped = self._apply_retention(conn, today or datetime.now(UTC))
+            conn.execute(f"PRAGMA incremental_vacuum({_VACUUM_PAGES})")
+        finally:
+            conn.close()
+        return dropped
+
+    async def start(self) -> None:
+        """Start the background flusher and maintenance tasks."""
+        if self.write_behind and self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if self._maintainer is None and self.db_path != ":memory:":
+            self._maintainer = asyncio.create_task(self._maintenance_loop())
+
+    async def close(self) -> None:
+        """Stop the flusher, write pending decisions and close the database."""
+        tasks = [t for t in (self._flusher, self._maintainer) if t is not None]
+        for task in tasks:
+            task.cancel()
+        # A task that died with an error must not keep pending rows unwritten.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flusher = None
+        self._maintainer = None
+        rows, rules = self._take_batch()
+        if rows or rules:
+            await asyncio.to_thread(self._write_rows, rows, rules)
+        self.conn.close()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            rows, rules = self._take_batch()
+            if not rows and not rules:
+                continue
+            try:
+                await asyncio.to_thread(self._write_rows, rows, rules)
+            except sqlite3.Error:
+                self.logger.exception(
+                    "Audit flush failed, re-queueing %d rows",
+                    len(rows),
+                )
+                self._requeue(rows, rules)
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            try:
+                dropped = await asyncio.to_thread(self.maintain)
+            except (sqlite3.Error, OSError):
+                # OSError: the archive could not be written.
+                self.logger.exception("Audit maintenance failed")
+            else:
+                if dropped:
+                    self.logger.info("Dropped audit partitions: %s", dropped)
+            await asyncio.sleep(self.maintenance_interval)
+
+    def _apply_retention(self, conn: sqlite3.Connection, today: datetime) -> list[str]:
+        if self.retention_days is None:
+            return []
+        cutoff = _partition_name(today - timedelta(days=self.retention_days))
+        expired = [name for name in _list_partitions(conn) if name < cutoff]
+        for name in expired:
+            if self.archive_dir is not None:
+                _archive_partition(conn, name, self.archive_dir)
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(f"DROP TABLE IF EXISTS {name}")
+                _refresh_view(conn)
+            self._partitions.discard(name)
+        return expired
+
+    def _take_batch(self) -> tuple[list[DecisionRow], list[RuleRow]]:
+        rows, self._buffer = self._buffer, []
+        rules = list(self._pending_rules.values())
+        self._pending_rules = {}
+        return rows, rules
+
+    def _requeue(self, rows: list[DecisionRow], rules: list[RuleRow]) -> None:
+        """Put a batch that failed to write back in front of the buffer."""
+        self._buffer[:0] = rows
+        self._pending_rules.update({row[0]: row for row in rules})
+
+    def _write_rows(self, rows: list[DecisionRow], rules: list[RuleRow]) -> None:
+        started = time.perf_counter()
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._insert_rows(rows, rules)
+        # Only rules known to be committed are skipped by later decisions.
+        self._stored_rules.update(row[0] for row in rules)
+        metrics.persistence_flush_seconds.observe(time.perf_counter() - started)
+
+    def _insert_rows(self, rows: list[DecisionRow], rules: list[RuleRow]) -> None:
+        """Insert rules and decisions (within the current transaction)."""
+        by_partition: dict[str, list[DecisionRow]] = {}
+        for row in rows:
+            by_partition.setdefault(_partition_for(row[0]), []).append(row)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO rules (hash, name, body) VALUES (?, ?, ?)",
+            rules,
+        )
+        for name, partition_rows in by_partition.items():
+            self._ensure_partition(name)
+            self.conn.executemany(
+                f"INSERT INTO {name} "  # noqa: S608
+                "(timestamp, rule_hash, ruleset_version, event) "
+                "VALUES (?, ?, ?, ?)",
+                partition_rows,
+            )
+
+    def _ensure_partition(self, name: str) -> None:
+        """Create a daily partition (within the current transaction)."""
+        if name in self._partitions:
+            return
+        self.conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {name} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                rule_hash TEXT NOT NULL REFERENCES rules (hash),
+                ruleset_version INTEGER,
+                event TEXT NOT NULL
+            )
+            """,
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{name}_timestamp ON {name} (timestamp)",
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{name}_rule "
+            f"ON {name} (rule_hash, timestamp)",
+        )
+        _refresh_view(self.conn)
+        self._partitions.add(name)
+
+    def _rule_hash(self, rule: object) -> str:
+        """Hash a rule's content, memoized by identity for loaded rules."""
+        cached = self._rule_hashes.get(id(rule))
+        if cached is not None and cached[0] is rule:
+            return cached[1]
+        digest = _content_hash(rule)
+        if len(self._rule_hashes) >= _RULE_HASH_CACHE_SIZE:
+            self._rule_hashes.clear()
+        self._rule_hashes[id(rule)] = (rule, digest)
+        return digest
+
+
+def _content_hash(rule: object) -> str:
+    # Always the stdlib encoder: stored hashes must not depend on whether
+    # orjson happens to be installed.
+    return hashlib.sha256(
+        json.dumps(rule, sort_keys=True, default=str).encode(),
+    ).hexdigest()
+
+
+def _literal(text: str | None) -> object:
+    """Parse the `str()` of a dict written by older releases, if possible."""
+    try:
+        return ast.literal_eval(text) if text is not None else None
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return text
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (name,),
+        ).fetchone()
+        is not None
+    )
+
+
+def _partition_name(day: datetime) -> str:
+    return f"decisions_{day:%Y%m%d}"
+
+
+def _partition_for(timestamp: str) -> str:
+    """Map a 'YYYY-MM-DD HH:MM:SS' timestamp to its daily partition."""
+    return f"decisions_{timestamp[:10].replace('-', '')}"
+
+
+def _list_partitions(conn: sqlite3.Connection) -> list[str]:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'table' AND name LIKE 'decisions_%'",
+    )
+    return sorted(name for (name,) in rows if _PARTITION_PATTERN.match(name))
+
+
+def _refresh_view(conn: sqlite3.Connection) -> None:
+    """Recreate the `decisions` view over every daily partition."""
+    partitions = _list_partitions(conn)
+    if partitions:
+        body = " UNION ALL ".join(
+            f"SELECT id, timestamp, rule_hash, ruleset_version, event "  # noqa: S608
+            f"FROM {name}"
+            for name in partitions
+        )
+    else:
+        body = (
+            "SELECT NULL AS id, NULL AS timestamp, NULL AS rule_hash, "
+            "NULL AS ruleset_version, NULL AS event WHERE 0"
+        )
+    conn.execute("DROP VIEW IF EXISTS decisions")
+    conn.execute(f"CREATE VIEW decisions AS {body}")
+
+
+def _add_version_column(conn: sqlite3.Connection, name: str) -> None:
+    """Upgrade a partition created before decisions were versioned."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({name})")}
+    if "ruleset_version" not in columns:
+        conn.execute(f"ALTER TABLE {name} ADD COLUMN ruleset_version INTEGER")
+
+
+def _archive_partition(conn: sqlite3.Connection, name: str, folder: Path) -> None:
+    """Export a partition with its rule bodies to gzipped JSON lines."""
+    folder.mkdir(parents=True, exist_ok=True)
+    rows = conn.execute(
+        f"SELECT d.id, d.timestamp, d.rule_hash, d.ruleset_version, r.name, "  # noqa: S608
+        f"r.body, d.event "
+        f"FROM {name} d LEFT JOIN rules r ON r.hash = d.rule_hash ORDER BY d.id",
+    )
+    with gzip.open(folder / f"{name}.jsonl.gz", "wt", encoding="utf-8") as archive:
+        for row_id, timestamp, rule_hash, version, rule_name, body, event in rows:
+            record = {
+                "id": row_id,
+                "timestamp": timestamp,
+                "rule_hash": rule_hash,
+                "ruleset_version": version,
+                "rule_name": rule_name,
+                "rule": serialization.loads(body) if body else None,
+                "event": serialization.loads(event),
+            }
+            archive.write(_dumps(record) + "\n")
+
+
+def _dumps(value: object) -> str:
+    """Serialize a value to compact JSON."""
+    return serialization.dumps_text(value)
+
+
+def _utc_timestamp() -> str:
+    """Return the current UTC time in SQLite's CURRENT_TIMESTAMP format."""
+    return datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S")
@@ -10,6 +10,8 @@ from motus.registry import register_adapter
 class EmailAdapter(OutputAdapter):
     """Example email adapter (stub)."""
 
+    supports_batching = True
+
     async def execute(
         self,
         action: dict[str, Any],
@@ -22,3 +24,14 @@ class EmailAdapter(OutputAdapter):
             action,
             event,
         )
+
+    async def execute_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]],
+    ) -> None:
+        """Pretend to send one digest email covering the whole batch."""
+        self.logger.info(
+            "EmailAdapter: would send digest email with %d action(s): %s",
+            len(items),
+            [action for action, _ in items],
+        )
@@ -1,16 +1,74 @@
 """HTTP POST output plugin for Motus (template, requires implementation)."""
 
+import asyncio
 from typing import Any
 
 import aiohttp
 
+from motus import serialization
 from motus.adapter import OutputAdapter
 from motus.registry import register_adapter
 
 
 @register_adapter("http_post")
 class HTTPPostAdapter(OutputAdapter):
-    """Send actions via HTTP POST."""
+    """Send actions via HTTP POST over a shared, pooled client session.
+
+    Each action is POSTed as one JSON object. Actions that opt into batching
+    with `batch: true` (and the engine's `--batch-size`) are POSTed together
+    as one JSON array per target URL.
+    """
+
+    supports_batching = True
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        request_timeout: float = 10.0,
+    ) -> None:
+        """Configure the connection pool used by the shared session."""
+        super().__init__()
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._retired = False
+
+    async def startup(self) -> None:
+        """Open the long-lived session and its connection pool."""
+        self._retired = False
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+
+    async def shutdown(self) -> None:
+        """Close the session and release pooled connections.
+
+        Posting fails from then on, rather than opening a session nobody
+        would close, until `startup` is called again.
+        """
+        self._retired = True
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def breaker_scope(self, action: dict[str, Any]) -> str | None:
+        """Give every URL its own circuit breaker."""
+        return action.get("url")
 
     async def execute(
         self,
@@ -22,15 +80,56 @@ class HTTPPostAdapter(OutputAdapter):
         if not url:
             self.logger.warning("HTTPPostAdapter: No URL specified in action")
             return
-        async with (
-            aiohttp.ClientSession() as session,
-            session.post(
-                url,
-                json={"action": action, "event": event},
-            ) as resp,
-        ):
+        await self._post(url, {"action": action, "event": event})
+
+    async def execute_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]],
+    ) -> list[Exception | None]:
+        """POST each URL's share of the batch as a single JSON array."""
+        outcomes: list[Exception | None] = [None] * len(items)
+        by_url: dict[str, list[int]] = {}
+        for position, (action, _) in enumerate(items):
+            url = action.get("url")
+            if not url:
+                self.logger.warning("HTTPPostAdapter: No URL specified in action")
+                continue
+            by_url.setdefault(url, []).append(position)
+        urls = list(by_url)
+        results = await asyncio.gather(
+            *(
+                self._post(
+                    url,
+                    [
+                        {"action": items[i][0], "event": items[i][1]}
+                        for i in by_url[url]
+                    ],
+                )
+                for url in urls
+            ),
+            return_exceptions=True,
+        )
+        for url, result in zip(urls, results, strict=True):
+            if isinstance(result, Exception):
+                for position in by_url[url]:
+                    outcomes[position] = result
+        return outcomes
+
+    async def _post(self, url: str, payload: object) -> None:
+        if self._retired:
+            msg = "HTTPPostAdapter is shut down"
+            raise RuntimeError(msg)
+        if self._session is None or self._session.closed:
+            await self.startup()
+        async with self._session.post(
+            url,
+            data=serialization.dumps(payload),
+            headers={"Content-Type": serialization.CONTENT_TYPE},
+        ) as resp:
             self.logger.info(
                 "HTTPPostAdapter: POST to %s status %s",
                 url,
                 resp.status,
             )
+            # Count 4xx/5xx as failures so breakers and retries see them.
+            resp.raise_for_status()
@@ -10,6 +10,8 @@ from motus.registry import register_adapter
 class LoggerAdapter(OutputAdapter):
     """Write actions to the logger."""
 
+    supports_batching = True
+
     async def execute(
         self,
         action: dict[str, Any],
@@ -18,3 +20,15 @@ class LoggerAdapter(OutputAdapter):
         """Log the provided message from the action payload."""
         _ = event  # not used by this adapter
         self.logger.info("LoggerAdapter: %s", action["message"])
+
+    async def execute_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]],
+    ) -> None:
+        """Log all messages of a batch as a single record."""
+        messages = [action["message"] for action, _ in items]
+        self.logger.info(
+            "LoggerAdapter: %d message(s): %s",
+            len(messages),
+            " | ".join(messages),
+        )
@@ -1,31 +1,72 @@
 """Webhook input plugin for Motus."""
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import AsyncIterator
 from typing import Any
 
-from aiohttp import web
+from aiohttp import StreamReader, web
 
-from motus.ingestor import EventIngestor
+from motus import exporter, serialization
+from motus.event_queue import QueueFullError
+from motus.ingestor import EventCallback, EventIngestor
 from motus.registry import register_ingestor
 
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = b" \t\r\n"
+
+# Marks a record that could not be decoded or is not a JSON object.
+_INVALID = object()
+
+
+def _json_response(body: object, **kwargs: Any) -> web.Response:  # noqa: ANN401
+    return web.json_response(body, dumps=serialization.dumps_text, **kwargs)
+
+
+class MalformedBodyError(ValueError):
+    """Raised when a bulk body cannot be parsed any further."""
+
 
 @register_ingestor("webhook")
 class WebhookIngestor(EventIngestor):
-    """Expose an HTTP endpoint to ingest events."""
+    """Expose HTTP endpoints to ingest events.
+
+    `POST /event` takes one JSON event. `POST /events` takes many, either as
+    newline-delimited JSON, parsed as the body streams in, or as a JSON
+    array, decoded at once; events are forwarded in batches of `batch_size`.
+    With
+    `metrics_path` the same server also exposes Prometheus metrics.
+    """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
-        callback: Callable[[dict[str, Any]], None],
+        callback: EventCallback,
         host: str = "0.0.0.0",  # noqa: S104 - exposed by design for webhook
         port: int = 8080,
+        reject_status: int = 503,
+        *,
+        batch_size: int = 500,
+        max_event_bytes: int = 1024 * 1024,
+        max_array_bytes: int = 32 * 1024 * 1024,
+        metrics_path: str | None = None,
     ) -> None:
-        """Create a webhook ingestor bound to the given host/port."""
+        """Create a webhook ingestor bound to the given host/port.
+
+        `reject_status` is returned (429 or 503) when the engine queue is full.
+        `max_event_bytes` bounds a single line of an NDJSON body and
+        `max_array_bytes` a whole JSON array body.
+        """
         super().__init__(callback)
         self.host = host
         self.port = port
+        self.reject_status = reject_status
+        self.batch_size = batch_size
+        self.max_event_bytes = max_event_bytes
+        self.max_array_bytes = max_array_bytes
         self._app = web.Application()
         self._app.router.add_post("/event", self.handle_event)
+        self._app.router.add_post("/events", self.handle_events)
+        if metrics_path:
+            exporter.add_metrics_route(self._app, metrics_path)
 
     async def start(self) -> None:
         """Start the HTTP server and keep it running."""
@@ -37,8 +78,172 @@ class WebhookIngestor(EventIngestor):
         await stop_event.wait()
 
     async def handle_event(self, request: web.Request) -> web.Response:
-        """Process incoming JSON payloads and forward normalized events."""
-        data = await request.json()
+        """Process incoming JSON payloads and forward normalized events.
+
+        Bodies that are not valid JSON or not a JSON object get a 400.
+        """
+        try:
+            data = serialization.loads(await request.read())
+        except ValueError:
+            return _json_response(
+                {"status": "invalid", "error": "Body is not valid JSON"},
+                status=400,
+            )
+        if not isinstance(data, dict):
+            return _json_response(
+                {"status": "invalid", "error": "Event must be a JSON object"},
+                status=400,
+            )
         event = self.normalize_event(data)
-        self.callback(event)
-        return web.json_response({"status": "received"})
+        try:
+            await self.submit(event)
+        except QueueFullError:
+            return _json_response(
+                {"status": "rejected"},
+                status=self.reject_status,
+                headers={"Retry-After": "1"},
+            )
+        return _json_response({"status": "received"})
+
+    async def handle_events(self, request: web.Request) -> web.Response:
+        """Stream a bulk body and report the outcome of every record.
+
+        Each entry of `results` is `received`, `rejected` (queue full) or
+        `invalid` (not a JSON object), in body order.
+        """
+        results: list[str] = []
+        batch: list[dict[str, Any]] = []
+        slots: list[int] = []
+        error = None
+        try:
+            async for record in _iter_records(
+                request.content,
+                self.max_event_bytes,
+                self.max_array_bytes,
+            ):
+                if not isinstance(record, dict):
+                    results.append("invalid")
+                    continue
+                slots.append(len(results))
+                results.append("received")
+                batch.append(self.normalize_event(record))
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch, slots, results)
+        except MalformedBodyError as exc:
+            error = str(exc)
+        await self._flush(batch, slots, results)
+
+        counts = {
+            status: results.count(status)
+            for status in ("received", "rejected", "invalid")
+        }
+        body = {**counts, "results": results}
+        if error is not None:
+            return _json_response({**body, "error": error}, status=400)
+        if counts["rejected"] and not counts["received"]:
+            return _json_response(
+                body,
+                status=self.reject_status,
+                headers={"Retry-After": "1"},
+            )
+        return _json_response(body)
+
+    async def _flush(
+        self,
+        batch: list[dict[str, Any]],
+        slots: list[int],
+        results: list[str],
+    ) -> None:
+        if not batch:
+            return
+        accepted = await self.submit_batch(batch)
+        for slot, ok in zip(slots, accepted, strict=True):
+            if not ok:
+                results[slot] = "rejected"
+        batch.clear()
+        slots.clear()
+
+
+async def _iter_records(
+    stream: StreamReader,
+    max_size: int,
+    max_body: int,
+) -> AsyncIterator[Any]:
+    """Yield records from an NDJSON body as chunks arrive, or a JSON array."""
+    chunks = stream.iter_chunked(_CHUNK_SIZE)
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        if buffer.lstrip(_WHITESPACE):
+            break
+    buffer = buffer.lstrip(_WHITESPACE)
+    if buffer.startswith(b"["):
+        records = _iter_array(chunks, buffer, max_body)
+    else:
+        records = _iter_lines(chunks, buffer, max_size)
+    async for record in records:
+        yield record
+
+
+async def _iter_lines(
+    chunks: AsyncIterator[bytes],
+    buffer: bytes,
+    max_size: int,
+) -> AsyncIterator[Any]:
+    """Yield one record per non-blank line."""
+    while True:
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip(_WHITESPACE):
+                yield _decode_line(line, max_size)
+        _check_size(len(buffer), max_size)
+        chunk = await anext(chunks, None)
+        if chunk is None:
+            break
+        buffer += chunk
+    if buffer.strip(_WHITESPACE):
+        yield _decode_line(buffer, max_size)
+
+
+def _decode_line(line: bytes, max_size: int) -> Any:  # noqa: ANN401
+    _check_size(len(line), max_size)
+    try:
+        return serialization.loads(line)
+    except ValueError:
+        return _INVALID
+
+
+def _check_size(size: int, max_size: int) -> None:
+    if size > max_size:
+        msg = f"Record larger than {max_size} bytes"
+        raise MalformedBodyError(msg)
+
+
+async def _iter_array(
+    chunks: AsyncIterator[bytes],
+    buffer: bytes,
+    max_body: int,
+) -> AsyncIterator[Any]:
+    """Read a JSON array body whole and yield its elements.
+
+    The body is decoded by a single `serialization.loads` call, so it is
+    bounded by `max_body` bytes rather than streamed.
+    """
+    body = bytearray(buffer)
+    _check_body(len(body), max_body)
+    async for chunk in chunks:
+        body += chunk
+        _check_body(len(body), max_body)
+    try:
+        records = serialization.loads(body)
+    except ValueError:
+        msg = "Malformed JSON array"
+        raise MalformedBodyError(msg) from None
+    for record in records:
+        yield record
+
+
+def _check_body(size: int, max_body: int) -> None:
+    if size > max_body:
+        msg = f"JSON array body larger than {max_body} bytes"
+        raise MalformedBodyError(msg)
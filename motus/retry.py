@@ -0,0 +1,204 @@
+"""Background retries with exponential backoff for failed actions."""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from motus import metrics
+from motus.spool import DeadLetterSpool
+
+# Runs one attempt; returns the error, or None when the action succeeded.
+Attempt = Callable[[Any, dict[str, Any], Any], Awaitable[BaseException | None]]
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How often, and how far apart, a failed action is attempted.
+
+    The n-th retry waits `base_delay * multiplier ** (n - 1)` seconds, capped
+    at `max_delay` and shortened by up to `jitter` (a fraction) at random so
+    retries of a burst do not hit the downstream in lockstep.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+
+    def delay(self, retry: int, rng: random.Random | None = None) -> float:
+        """Return the wait before the given retry (1 for the first)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return delay * (1 - self.jitter * (rng or random).random())
+
+
+@dataclass(slots=True)
+class _Retry:
+    adapter: Any
+    action: dict[str, Any]
+    event: Any
+    policy: RetryPolicy
+    error: str
+    attempts: int = 1
+    first_failed: float = field(default_factory=time.time)
+
+
+class RetryQueue:
+    """Retry failed actions off the hot path; dead-letter the hopeless ones.
+
+    `schedule` only records the failure, so the event that triggered it is
+    not held up. A single background task wakes when the earliest retry is
+    due and runs it through `attempt`. Actions that exhaust their policy, or
+    that arrive while `max_pending` retries are already waiting, go to the
+    `dead_letters` spool.
+    """
+
+    def __init__(
+        self,
+        attempt: Attempt,
+        dead_letters: DeadLetterSpool | None = None,
+        max_pending: int = 10000,
+    ) -> None:
+        """Create a queue retrying through `attempt`."""
+        self.attempt = attempt
+        self.dead_letters = dead_letters
+        self.max_pending = max_pending
+        self.logger = logging.getLogger("motus.retry")
+        self._heap: list[tuple[float, int, _Retry]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+        self._inflight: dict[asyncio.Task, _Retry] = {}
+        self._rng = random.Random()  # noqa: S311 - jitter, not security
+
+    def __len__(self) -> int:
+        """Return the number of retries waiting or running."""
+        return len(self._heap) + len(self._inflight)
+
+    def schedule(
+        self,
+        adapter: Any,  # noqa: ANN401
+        action: dict[str, Any],
+        event: Any,  # noqa: ANN401
+        error: BaseException,
+        policy: RetryPolicy,
+    ) -> None:
+        """Record a failed first attempt and plan its retry."""
+        entry = _Retry(adapter, action, event, policy, _describe(error))
+        if len(self) >= self.max_pending:
+            self.logger.warning("Retry queue full, dead-lettering action")
+            self._dead_letter(entry)
+            return
+        self._push(entry)
+
+    def dead_letter(
+        self,
+        adapter: Any,  # noqa: ANN401
+        action: dict[str, Any],
+        event: Any,  # noqa: ANN401
+        error: BaseException,
+    ) -> None:
+        """Spool an action that was not attempted at all, skipping retries."""
+        self._dead_letter(
+            _Retry(adapter, action, event, RetryPolicy(), _describe(error), 0),
+        )
+
+    async def close(self) -> None:
+        """Stop retrying and dead-letter whatever has not succeeded yet."""
+        inflight = dict(self._inflight)
+        tasks = [*inflight, *([self._runner] if self._runner else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for task, entry in inflight.items():
+            if task.cancelled():
+                self._dead_letter(entry)
+        self._inflight.clear()
+        while self._heap:
+            self._dead_letter(heapq.heappop(self._heap)[2])
+
+    def _push(self, entry: _Retry) -> None:
+        if entry.attempts >= entry.policy.max_attempts:
+            self._dead_letter(entry)
+            return
+        metrics.actions_retried.inc()
+        due = time.monotonic() + entry.policy.delay(entry.attempts, self._rng)
+        heapq.heappush(self._heap, (due, next(self._sequence), entry))
+        self._wakeup.set()
+        if self._runner is None or self._runner.done():
+            # Run outside the context of the event that failed first, so
+            # retries are not traced as part of that event.
+            self._runner = asyncio.get_running_loop().create_task(
+                self._run(),
+                context=contextvars.Context(),
+            )
+
+    async def _run(self) -> None:
+        while self._heap:
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(delay):
+                        await self._wakeup.wait()
+                continue
+            entry = heapq.heappop(self._heap)[2]
+            task = asyncio.create_task(self._retry(entry))
+            self._inflight[task] = entry
+            task.add_done_callback(self._settled)
+
+    async def _retry(self, entry: _Retry) -> None:
+        error = await self.attempt(entry.adapter, entry.action, entry.event)
+        entry.attempts += 1
+        if error is None:
+            self.logger.info(
+                "Action succeeded on attempt %d: %s",
+                entry.attempts,
+                entry.action,
+            )
+            return
+        entry.error = _describe(error)
+        self._push(entry)
+
+    def _settled(self, task: asyncio.Task) -> None:
+        self._inflight.pop(task, None)
+
+    def _dead_letter(self, entry: _Retry) -> None:
+        metrics.actions_dead_lettered.inc()
+        if self.dead_letters is None:
+            self.logger.error(
+                "Action dropped after %d attempt(s) (%s): %s",
+                entry.attempts,
+                entry.error,
+                entry.action,
+            )
+            return
+        self.dead_letters.append(
+            {
+                "adapter": metrics.adapter_label(entry.adapter),
+                "action": entry.action,
+                "event": entry.event,
+                "attempts": entry.attempts,
+                "error": entry.error,
+                "first_failed": entry.first_failed,
+                "dead_lettered": time.time(),
+            },
+        )
+        self.logger.warning(
+            "Action dead-lettered after %d attempt(s) (%s): %s",
+            entry.attempts,
+            entry.error,
+            entry.action,
+        )
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
@@ -0,0 +1,73 @@
+"""Resolve action targets to adapter instances ahead of dispatch."""
+
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+
+def rule_targets(rules: Iterable[dict]) -> list[str]:
+    """Return the distinct action targets referenced by rules, in order."""
+    targets: dict[str, None] = {}
+    for rule in rules:
+        then = rule.get("then")
+        if not isinstance(then, list):
+            continue
+        for action in then:
+            target = action.get("target") if isinstance(action, dict) else None
+            if target:
+                targets.setdefault(target, None)
+    return list(targets)
+
+
+def resolve_target(
+    target: str,
+    adapters: list[Any],
+    logger: logging.Logger | None = None,
+) -> tuple[Any, ...]:
+    """Return the adapters serving a target.
+
+    Registered plugin names and class names match exactly (ignoring case);
+    otherwise a class-name prefix is accepted (e.g. `dummy` for
+    `DummyAdapter`). An ambiguous prefix resolves to the first adapter.
+    """
+    wanted = target.lower()
+    exact = tuple(
+        adapter
+        for adapter in adapters
+        if wanted
+        in {
+            getattr(adapter, "plugin_name", "").lower(),
+            adapter.__class__.__name__.lower(),
+        }
+    )
+    if exact:
+        return exact
+    prefixed = [
+        adapter
+        for adapter in adapters
+        if adapter.__class__.__name__.lower().startswith(wanted)
+    ]
+    if len(prefixed) > 1 and logger is not None:
+        logger.warning(
+            "Target '%s' matches several adapters %s; routing to %s",
+            target,
+            [adapter.__class__.__name__ for adapter in prefixed],
+            prefixed[0].__class__.__name__,
+        )
+    return tuple(prefixed[:1])
+
+
+def build_routes(
+    targets: Iterable[str],
+    adapters: list[Any],
+    logger: logging.Logger | None = None,
+) -> tuple[dict[str, tuple[Any, ...]], list[str]]:
+    """Build the target -> adapters table and list unresolved targets."""
+    routes: dict[str, tuple[Any, ...]] = {}
+    unresolved: list[str] = []
+    for target in targets:
+        resolved = resolve_target(target, adapters, logger)
+        routes[target] = resolved
+        if not resolved:
+            unresolved.append(target)
+    return routes, unresolved
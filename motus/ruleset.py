@@ -0,0 +1,121 @@
+"""Immutable, versioned snapshots of the rules the engine evaluates."""
+
+import collections
+import dataclasses
+import logging
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from motus.compiler import CompiledRule, compile_rule, rule_fingerprint
+from motus.directives import compile_directives
+from motus.index import DEFAULT_INDEX_FIELDS, RuleIndex
+from motus.routing import build_routes, rule_targets
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RuleSet:
+    """Rules, compiled predicates, index and routes that belong together.
+
+    A rule set is never modified after it is built: reloads build a new one
+    and the engine swaps it in with a single reference assignment, so an
+    event always runs against one consistent snapshot. `by_rule` maps the
+    id of each compiled rule object to its compiled form.
+    """
+
+    version: int
+    rules: Sequence[dict]
+    adapters: tuple[Any, ...]
+    compiled: tuple[CompiledRule, ...]
+    index: RuleIndex
+    routes: Mapping[str, tuple[Any, ...]]
+    unresolved_targets: tuple[str, ...]
+    by_rule: Mapping[int, CompiledRule]
+
+    def compiled_for(self, rule: dict) -> CompiledRule | None:
+        """Return the compiled form of a rule object of this set, if any."""
+        compiled = self.by_rule.get(id(rule))
+        return compiled if compiled is not None and compiled.rule is rule else None
+
+
+def build_ruleset(  # noqa: PLR0913
+    rules: Sequence[dict],
+    adapters: Sequence[Any],
+    *,
+    version: int,
+    previous: RuleSet | None = None,
+    index_fields: Sequence[str] = DEFAULT_INDEX_FIELDS,
+    logger: logging.Logger | None = None,
+) -> RuleSet:
+    """Build a rule set, reusing compiled rules and the index of `previous`.
+
+    Rules are reused by identity first, then by content fingerprint; only new
+    or edited rules are compiled, so unchanged rules keep their directive
+    state (dedupe, rate limit and aggregate windows). Invalid rules are
+    logged and skipped.
+    """
+    log = logger or logging.getLogger("motus.ruleset")
+    old_compiled = previous.compiled if previous is not None else ()
+    same_object = {id(compiled.rule): compiled for compiled in old_compiled}
+    reusable: dict[str, collections.deque[CompiledRule]] = {}
+    for compiled in old_compiled:
+        reusable.setdefault(compiled.fingerprint, collections.deque()).append(compiled)
+    # Each compiled rule is handed out once, even if a rule object or its
+    # content is listed twice; extra copies are compiled afresh.
+    taken: set[int] = set()
+
+    compiled_rules: list[CompiledRule] = []
+    for rule in rules:
+        unchanged = same_object.pop(id(rule), None)
+        if (
+            unchanged is not None
+            and unchanged.rule is rule
+            and id(unchanged) not in taken
+        ):
+            compiled_rules.append(unchanged)
+            taken.add(id(unchanged))
+            continue
+        candidates = reusable.get(rule_fingerprint(rule), ())
+        while candidates and id(candidates[0]) in taken:
+            candidates.popleft()
+        if candidates:
+            reused = candidates.popleft()
+            compiled_rules.append(reused)
+            taken.add(id(reused))
+            continue
+        try:
+            compiled_rules.append(_compile(rule))
+        except TypeError:
+            log.exception("Skipping invalid rule")
+
+    if previous is not None and previous.index.fields == tuple(index_fields):
+        index = previous.index.copy()
+    else:
+        index = RuleIndex(index_fields)
+    index.update(compiled_rules)
+
+    routes, unresolved = build_routes(rule_targets(rules), list(adapters), log)
+    if unresolved:
+        log.warning(
+            "No adapter found for action target(s): %s",
+            ", ".join(unresolved),
+        )
+    return RuleSet(
+        version=version,
+        rules=rules,
+        adapters=tuple(adapters),
+        compiled=tuple(compiled_rules),
+        index=index,
+        routes=MappingProxyType(routes),
+        unresolved_targets=tuple(unresolved),
+        by_rule=MappingProxyType(
+            {id(compiled.rule): compiled for compiled in compiled_rules},
+        ),
+    )
+
+
+def _compile(rule: dict) -> CompiledRule:
+    compiled = compile_rule(rule)
+    gate = compile_directives(rule)
+    return compiled if gate is None else dataclasses.replace(compiled, gate=gate)
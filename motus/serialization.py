@@ -0,0 +1,59 @@
+"""JSON encoding and decoding, backed by orjson when it is installed.
+
+Everything that moves events as JSON (ingestors, adapters, persistence) goes
+through `dumps`/`loads` so the fast path is used consistently. Output is
+compact, mappings encode as objects and other unknown types with `str`,
+whichever backend runs.
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+CONTENT_TYPE = "application/json"
+
+
+def dumps(value: object) -> bytes:
+    """Encode a value to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                value,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stdlib handles those.
+            pass
+    return _stdlib_dumps(value).encode()
+
+
+def dumps_text(value: object) -> str:
+    """Encode a value to a compact JSON string."""
+    if orjson is not None:
+        return dumps(value).decode()
+    return _stdlib_dumps(value)
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:  # noqa: ANN401
+    """Decode JSON from bytes or text; raise ValueError when malformed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _default(value: object) -> object:
+    """Encode mappings such as `Event` as objects and anything else as str."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def _stdlib_dumps(value: object) -> str:
+    return json.dumps(value, separators=(",", ":"), default=_default)
@@ -0,0 +1,205 @@
+"""Distribute events across engine worker processes by a partition key."""
+
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing
+import queue
+import zlib
+from collections.abc import Sequence
+from typing import Any
+
+from motus import metrics
+from motus.compiler import get_path
+from motus.event_queue import QUEUE_POLICIES, QueueFullError
+
+# Seconds a worker blocks on its inbox before checking for shutdown.
+INBOX_POLL_SECONDS = 0.5
+_SUPERVISE_INTERVAL = 1.0
+
+
+def shard_for(event: dict[str, Any], path: tuple[str, ...], shards: int) -> int:
+    """Return the shard owning an event, stable across processes and runs.
+
+    Events lacking the key all land on the same shard.
+    """
+    value = get_path(event, path)
+    key = json.dumps(value, sort_keys=True, default=str).encode()
+    return zlib.crc32(key) % shards
+
+
+class ShardRouter:
+    """Route events to per-shard inter-process queues.
+
+    Events with the same value at `key` always go to the same queue, in
+    arrival order. `policy` applies when a shard queue is full, with the same
+    meaning as for EventQueue.
+    """
+
+    def __init__(
+        self,
+        queues: Sequence[Any],
+        key: str = "source",
+        policy: str = "block",
+    ) -> None:
+        """Route to `queues` (multiprocessing queues) by the dotted `key`."""
+        if policy not in QUEUE_POLICIES:
+            msg = f"Unknown queue policy '{policy}', expected one of {QUEUE_POLICIES}"
+            raise ValueError(msg)
+        self.queues = list(queues)
+        self.key = key
+        self.policy = policy
+        self._path = tuple(key.split("."))
+        self._blocked = [0] * len(self.queues)
+        self._locks = [asyncio.Lock() for _ in self.queues]
+
+    def offer(self, event: dict[str, Any]) -> None:
+        """Hand an event to its shard without waiting.
+
+        This is the synchronous ingestor callback. Under the `block` policy a
+        full shard queue raises QueueFullError, as does one with producers
+        already waiting in `put`, so per-key order is kept.
+        """
+        shard = shard_for(event, self._path, len(self.queues))
+        if self._blocked[shard] or not self._put_nowait(shard, event):
+            self._reject(shard)
+
+    async def put(self, event: dict[str, Any]) -> None:
+        """Hand an event to its shard, waiting for room under `block`."""
+        shard = shard_for(event, self._path, len(self.queues))
+        if self._blocked[shard]:
+            # Keep per-key order behind events already waiting for room.
+            await self._put_blocking(shard, event)
+        elif not self._put_nowait(shard, event):
+            if self.policy != "block":
+                self._reject(shard)
+            await self._put_blocking(shard, event)
+
+    async def offer_batch(self, events: list[dict[str, Any]]) -> list[bool]:
+        """Hand several events to their shards; return whether each was taken."""
+        accepted: list[bool] = []
+        for event in events:
+            try:
+                await self.put(event)
+            except QueueFullError:
+                accepted.append(False)
+                continue
+            accepted.append(True)
+        return accepted
+
+    def _put_nowait(self, shard: int, event: dict[str, Any]) -> bool:
+        """Queue `event` if there is room or `drop_oldest` makes some."""
+        target = self.queues[shard]
+        try:
+            target.put_nowait(event)
+        except queue.Full:
+            if self.policy != "drop_oldest":
+                return False
+            self._drop_oldest(target, event)
+        return True
+
+    @staticmethod
+    def _reject(shard: int) -> None:
+        metrics.events_rejected.inc()
+        msg = f"Shard {shard} queue full"
+        raise QueueFullError(msg)
+
+    async def _put_blocking(self, shard: int, event: dict[str, Any]) -> None:
+        self._blocked[shard] += 1
+        try:
+            async with self._locks[shard]:
+                await asyncio.to_thread(self.queues[shard].put, event)
+        finally:
+            self._blocked[shard] -= 1
+
+    @staticmethod
+    def _drop_oldest(target: Any, event: dict[str, Any]) -> None:  # noqa: ANN401
+        while True:
+            try:
+                target.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                metrics.events_dropped.inc()
+            try:
+                target.put_nowait(event)
+            except queue.Full:
+                continue
+            return
+
+
+def _run_target(target: str, *args: object) -> None:
+    """Import `module:function` in the child process and call it."""
+    module, _, name = target.partition(":")
+    getattr(importlib.import_module(module), name)(*args)
+
+
+class WorkerPool:
+    """Spawn one engine process per shard and restart those that die."""
+
+    def __init__(
+        self,
+        target: str,
+        shards: int,
+        queue_size: int,
+        args: tuple = (),
+    ) -> None:
+        """Prepare `shards` inboxes for workers running `target`.
+
+        `target` names a `module:function` called as
+        `function(shard, inbox, *args)`; it is imported by name in the child
+        so it may live in a module run with `python -m`.
+        """
+        self.context = multiprocessing.get_context("spawn")
+        self.target = target
+        self.args = args
+        self.queues = [self.context.Queue(queue_size) for _ in range(shards)]
+        self.processes: list[multiprocessing.process.BaseProcess | None] = [
+            None for _ in range(shards)
+        ]
+        self.logger = logging.getLogger("motus.workers")
+
+    def start(self) -> None:
+        """Start every worker process."""
+        for shard in range(len(self.queues)):
+            self._spawn(shard)
+
+    async def supervise(self) -> None:
+        """Restart worker processes that exited unexpectedly."""
+        while True:
+            await asyncio.sleep(_SUPERVISE_INTERVAL)
+            for shard, process in enumerate(self.processes):
+                if process is not None and not process.is_alive():
+                    self.logger.error(
+                        "Engine worker %d (pid %s) exited with code %s, restarting",
+                        shard,
+                        process.pid,
+                        process.exitcode,
+                    )
+                    metrics.mark_process_dead(process.pid)
+                    self._spawn(shard)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask workers to finish their queued events, then terminate them."""
+        for inbox in self.queues:
+            inbox.put(None)
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            metrics.mark_process_dead(process.pid)
+
+    def _spawn(self, shard: int) -> None:
+        process = self.context.Process(
+            target=_run_target,
+            args=(self.target, shard, self.queues[shard], *self.args),
+            name=f"motus-engine-{shard}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[shard] = process
+        self.logger.info("Engine worker %d started (pid %s)", shard, process.pid)
@@ -0,0 +1,130 @@
+"""Durable, append-only dead-letter spool for actions that kept failing."""
+
+import logging
+import os
+import threading
+from collections.abc import Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from motus import serialization
+
+_PREFIX = "dead-letter-"
+_SUFFIX = ".jsonl"
+
+
+class DeadLetterSpool:
+    """Store failed actions as JSON lines in numbered segment files.
+
+    Records are only ever appended to the newest segment; a new segment is
+    started once it exceeds `segment_bytes`. `replay` consumes whole
+    segments, so nothing is rewritten in place. With `fsync` every record is
+    forced to disk before `append` returns.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        segment_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = False,
+    ) -> None:
+        """Open (or create) the spool in `directory`."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.logger = logging.getLogger("motus.spool")
+        self._lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        segments = self.segments()
+        self._next = _segment_number(segments[-1]) + 1 if segments else 1
+
+    def segments(self) -> list[Path]:
+        """Return the segment files, oldest first."""
+        return sorted(
+            self.directory.glob(f"{_PREFIX}*{_SUFFIX}"),
+            key=_segment_number,
+        )
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Append one record to the active segment."""
+        line = serialization.dumps(record) + b"\n"
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.segment_bytes:
+                self._roll()
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Yield every spooled record, oldest first."""
+        for segment in self.segments():
+            yield from _read_segment(segment)
+
+    def __len__(self) -> int:
+        """Return the number of spooled records."""
+        return sum(1 for _ in self)
+
+    async def replay(
+        self,
+        handler: Callable[[dict[str, Any]], Awaitable[bool]],
+    ) -> int:
+        """Feed every spooled record to `handler`; return how many succeeded.
+
+        Records the handler rejects (returns False or raises) are appended
+        to a fresh segment, so a replay never loses anything.
+        """
+        with self._lock:
+            self._close_file()
+            pending = self.segments()
+        replayed = 0
+        for segment in pending:
+            for record in _read_segment(segment):
+                try:
+                    done = await handler(record)
+                except Exception:
+                    self.logger.exception("Replay failed for %s", record)
+                    done = False
+                if done:
+                    replayed += 1
+                else:
+                    self.append(record)
+            segment.unlink()
+        return replayed
+
+    def close(self) -> None:
+        """Close the active segment."""
+        with self._lock:
+            self._close_file()
+
+    def _roll(self) -> None:
+        self._close_file()
+        path = self.directory / f"{_PREFIX}{self._next:06d}{_SUFFIX}"
+        self._next += 1
+        self._file = path.open("ab")
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.name.removeprefix(_PREFIX).removesuffix(_SUFFIX))
+
+
+def _read_segment(path: Path) -> Iterator[dict[str, Any]]:
+    with path.open("rb") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                yield serialization.loads(line)
+            except ValueError:
+                # Only a crash mid-append leaves a torn record behind.
+                logging.getLogger("motus.spool").warning(
+                    "Skipping torn record in %s",
+                    path.name,
+                )
@@ -0,0 +1,304 @@
+"""Opt-in per-event span tracing, slow-event reports and loop profiling.
+
+A `Tracer` given to the DecisionEngine opens a root span per sampled event;
+the engine stages (`evaluate` with one `evaluate_rule` per candidate rule,
+`trigger_actions`, `execute`, `save_decision`) nest under it through a
+context variable, so spans opened in concurrent action tasks land under the
+right parent. Outside a traced event `span()` returns a shared no-op and
+costs a single context variable lookup.
+"""
+
+import asyncio
+import collections
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from aiohttp import web
+
+from motus import serialization
+
+_CURRENT: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "motus_span",
+    default=None,
+)
+
+
+class Span:
+    """A timed stage of event handling with nested child stages."""
+
+    __slots__ = ("attrs", "children", "end", "name", "start")
+
+    def __init__(self, name: str, attrs: dict[str, Any]) -> None:
+        """Start timing a stage now."""
+        self.name = name
+        self.attrs = attrs
+        self.children: list[Span] = []
+        self.start = time.perf_counter()
+        self.end: float | None = None
+
+    @property
+    def duration(self) -> float:
+        """Return the elapsed seconds, up to now while the span is open."""
+        return (self.end or time.perf_counter()) - self.start
+
+    def walk(self) -> "collections.abc.Iterator[Span]":
+        """Yield this span and all of its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span tree with durations in milliseconds."""
+        return {
+            "name": self.name,
+            **self.attrs,
+            "ms": round(self.duration * 1000, 3),
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _SpanScope:
+    """Context manager opening a child span of the current one."""
+
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, span: Span) -> None:
+        self._span = span
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> Span:
+        self._token = _CURRENT.set(self._span)
+        return self._span
+
+    def __exit__(self, *_exc: object) -> None:
+        self._span.end = time.perf_counter()
+        _CURRENT.reset(self._token)
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopScope()
+
+
+def span(name: str, **attrs: Any) -> _SpanScope | _NoopScope:  # noqa: ANN401
+    """Open a child span of the current trace; a no-op when none is active."""
+    parent = _CURRENT.get()
+    if parent is None:
+        return _NOOP
+    child = Span(name, attrs)
+    parent.children.append(child)
+    return _SpanScope(child)
+
+
+class Tracer:
+    """Trace sampled events, log slow ones and keep recent traces.
+
+    Events taking at least `slow_threshold` seconds are logged with the
+    rule and the adapter that took the most time. The last `keep` traces
+    are retained so `slowest()` can report the slowest recent events.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.5,
+        sample_rate: float = 1.0,
+        keep: int = 1000,
+    ) -> None:
+        """Configure the slow-event threshold and the share of events traced."""
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger("motus.tracing")
+        self._recent: collections.deque[dict[str, Any]] = collections.deque(
+            maxlen=keep,
+        )
+        self._sequence = itertools.count()
+        self._rng = random.Random()  # noqa: S311 - sampling, not security
+
+    def event(self, event: Mapping[str, Any]) -> "_EventScope | _NoopScope":
+        """Open the root span for an event, if it is sampled."""
+        if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+            return _NOOP
+        root = Span("handle_event", {"type": event.get("type")})
+        return _EventScope(self, root, event)
+
+    def finish(self, root: Span, event: Mapping[str, Any]) -> None:
+        """Record a completed trace and report it when it is slow."""
+        duration = root.duration
+        rule, rule_time = _dominant(root, "trigger_actions", "rule")
+        adapter, adapter_time = _dominant(root, "execute", "adapter")
+        record = {
+            "id": next(self._sequence),
+            "at": time.time(),
+            "ms": round(duration * 1000, 3),
+            "rule": rule,
+            "adapter": adapter,
+            "event": event,
+            "trace": root.to_dict(),
+        }
+        self._recent.append(record)
+        if duration >= self.slow_threshold:
+            self.logger.warning(
+                "Slow event (%.1f ms): rule '%s' took %.1f ms, adapter '%s' "
+                "took %.1f ms",
+                duration * 1000,
+                rule,
+                rule_time * 1000,
+                adapter,
+                adapter_time * 1000,
+            )
+
+    def slowest(self, limit: int = 10) -> list[dict[str, Any]]:
+        """Return the `limit` slowest of the retained traces, slowest first."""
+        return heapq.nlargest(limit, list(self._recent), key=lambda rec: rec["ms"])
+
+
+class _EventScope:
+    """Root span of one traced event; hands the trace to the tracer on exit."""
+
+    __slots__ = ("_event", "_root", "_token", "_tracer")
+
+    def __init__(self, tracer: Tracer, root: Span, event: Mapping[str, Any]) -> None:
+        self._tracer = tracer
+        self._root = root
+        self._event = event
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> Span:
+        self._token = _CURRENT.set(self._root)
+        return self._root
+
+    def __exit__(self, *_exc: object) -> None:
+        self._root.end = time.perf_counter()
+        _CURRENT.reset(self._token)
+        self._tracer.finish(self._root, self._event)
+
+
+def _dominant(root: Span, name: str, key: str) -> tuple[str | None, float]:
+    """Return the `key` attribute whose `name` spans took longest in total."""
+    totals: dict[str, float] = {}
+    for node in root.walk():
+        if node.name == name:
+            label = str(node.attrs.get(key))
+            totals[label] = totals.get(label, 0.0) + node.duration
+    if not totals:
+        return None, 0.0
+    label = max(totals, key=totals.__getitem__)
+    return label, totals[label]
+
+
+def sample_stacks(
+    thread_id: int,
+    seconds: float = 2.0,
+    interval: float = 0.005,
+) -> collections.Counter[str]:
+    """Sample the stack of a thread; return counts of collapsed stacks.
+
+    Meant to run on another thread than the one sampled. Stacks are folded
+    root first as `file:function:line` frames joined with `;`, the format
+    flame graph tools consume.
+    """
+    counts: collections.Counter[str] = collections.Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)  # noqa: SLF001
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        if frames:
+            counts[";".join(reversed(frames))] += 1
+        time.sleep(interval)
+    return counts
+
+
+async def profile_loop(
+    seconds: float = 2.0,
+    interval: float = 0.005,
+) -> collections.Counter[str]:
+    """Sample the running event loop's thread from a helper thread."""
+    return await asyncio.to_thread(
+        sample_stacks,
+        threading.get_ident(),
+        seconds,
+        interval,
+    )
+
+
+def add_debug_routes(app: web.Application, tracer: Tracer) -> None:
+    """Serve `/debug/slow` and `/debug/profile` from an aiohttp application.
+
+    `/debug/slow?limit=N` returns the slowest recent traces as JSON.
+    `/debug/profile?seconds=S&interval=I` samples the event loop and returns
+    collapsed stacks, heaviest first (`format=collapsed` for plain text).
+    Parameters that are not positive numbers are answered with 400.
+    """
+
+    async def slow(request: web.Request) -> web.Response:
+        limit = int(_query_number(request, "limit", 10, integer=True))
+        return web.json_response(
+            tracer.slowest(limit),
+            dumps=serialization.dumps_text,
+        )
+
+    async def profile(request: web.Request) -> web.Response:
+        seconds = min(_query_number(request, "seconds", 2.0), 60.0)
+        interval = max(_query_number(request, "interval", 0.005), 0.001)
+        counts = await profile_loop(seconds, interval)
+        if request.query.get("format") == "collapsed":
+            text = "".join(
+                f"{stack} {count}\n" for stack, count in counts.most_common()
+            )
+            return web.Response(text=text)
+        return web.json_response(
+            {
+                "samples": counts.total(),
+                "stacks": [
+                    {"stack": stack.split(";"), "count": count}
+                    for stack, count in counts.most_common(50)
+                ],
+            },
+            dumps=serialization.dumps_text,
+        )
+
+    app.router.add_get("/debug/slow", slow)
+    app.router.add_get("/debug/profile", profile)
+
+
+def _query_number(
+    request: web.Request,
+    name: str,
+    default: float,
+    *,
+    integer: bool = False,
+) -> float:
+    """Read a positive number from the query string, or answer 400."""
+    raw = request.query.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw) if integer else float(raw)
+    except ValueError:
+        value = math.nan
+    if not (value > 0 and math.isfinite(value)):
+        kind = "integer" if integer else "number"
+        msg = f"'{name}' must be a positive {kind}"
+        raise web.HTTPBadRequest(text=msg)
+    return value
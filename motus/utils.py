@@ -4,22 +4,105 @@ import asyncio
 import hashlib
 import logging
 import os
+import tempfile
 from collections.abc import Awaitable, Callable
 from pathlib import Path
 
 import yaml
 
+from motus import serialization
 from motus.core import DecisionEngine
+from motus.inotify import FolderWatch, inotify_available
 
+RULE_SUFFIXES = frozenset({".yaml", ".yml"})
 
-def load_rules_from_yaml(path: str | Path) -> list[dict]:
+# Delay after the first inotify event so editors finish writing the file.
+_DEBOUNCE_SECONDS = 0.05
+
+# libyaml's C loader is several times faster; fall back to pure Python.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class RuleCache:
+    """On-disk cache of parsed rule files keyed by path and content hash.
+
+    Files whose documents do not survive a JSON round trip unchanged (dates,
+    non-string keys) are simply not cached.
+    """
+
+    def __init__(self, cache_dir: str | Path) -> None:
+        """Store cache entries under `cache_dir`, creating it if needed."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger("motus.rules_cache")
+
+    def load(self, path: Path, content: bytes) -> list[dict]:
+        """Return the documents of `path`, parsing only on a cache miss."""
+        digest = hashlib.sha256(content).hexdigest()
+        entry = self._entry_path(path)
+        try:
+            cached = serialization.loads(entry.read_bytes())
+        except (OSError, ValueError):
+            cached = None
+        if isinstance(cached, dict) and cached.get("digest") == digest:
+            return cached["rules"]
+
+        documents = _parse_yaml(content)
+        self._store(entry, path, digest, documents)
+        return documents
+
+    def _store(
+        self,
+        entry: Path,
+        path: Path,
+        digest: str,
+        documents: list[dict],
+    ) -> None:
+        try:
+            payload = serialization.dumps(
+                {"path": str(path), "digest": digest, "rules": documents},
+            )
+        except (TypeError, ValueError):
+            return
+        if serialization.loads(payload)["rules"] != documents:
+            return
+        try:
+            with tempfile.NamedTemporaryFile(
+                "wb",
+                dir=self.cache_dir,
+                suffix=".tmp",
+                delete=False,
+            ) as tmp:
+                tmp.write(payload)
+            Path(tmp.name).replace(entry)
+        except OSError:
+            self.logger.warning("Could not write rule cache entry for %s", path)
+
+    def _entry_path(self, path: Path) -> Path:
+        key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+
+def _parse_yaml(content: bytes) -> list[dict]:
+    return list(yaml.load_all(content, Loader=_YAML_LOADER))
+
+
+def load_rules_from_yaml(
+    path: str | Path,
+    cache: RuleCache | None = None,
+) -> list[dict]:
     """Load a YAML file and return all documents as a list of dicts."""
     path_obj = Path(path)
-    with path_obj.open() as file:
-        return list(yaml.safe_load_all(file))
+    content = path_obj.read_bytes()
+    if cache is not None:
+        return cache.load(path_obj, content)
+    return _parse_yaml(content)
 
 
-def load_rules_from_folder(folder: str | Path) -> list:
+def load_rules_from_folder(
+    folder: str | Path,
+    cache: RuleCache | None = None,
+) -> list:
     """Load all rules from all YAML files in a folder."""
     folder_path = Path(folder).resolve()
     if not folder_path.is_dir():
@@ -28,34 +111,110 @@ def load_rules_from_folder(folder: str | Path) -> list:
 
     rules: list[dict] = []
     for rule_file in folder_path.iterdir():
-        if rule_file.suffix in {".yaml", ".yml"}:
-            rules.extend(load_rules_from_yaml(rule_file))
+        if rule_file.suffix in RULE_SUFFIXES:
+            rules.extend(load_rules_from_yaml(rule_file, cache))
     return rules
 
 
-def _rules_snapshot(folder: Path) -> list[tuple[str, str]]:
-    """Return a stable snapshot (name, md5 checksum) for YAML files in a folder."""
-    snapshot: list[tuple[str, str]] = []
-    for rule_file in folder.iterdir():
-        if rule_file.suffix in {".yaml", ".yml"}:
-            try:
-                data = rule_file.read_bytes()
-            except FileNotFoundError:
-                continue
-            checksum = hashlib.md5(data, usedforsecurity=False).hexdigest()
-            snapshot.append((rule_file.name, checksum))
-    snapshot.sort()
-    return snapshot
+class RulesFolder:
+    """Track rule files by (mtime, size) and re-parse only changed ones.
+
+    A file that fails to parse is logged and keeps its last good rules (none
+    if it never parsed) until it changes again.
+    """
+
+    def __init__(self, folder: str | Path, cache: RuleCache | None = None) -> None:
+        """Record the current state of the folder without parsing it."""
+        self.folder = Path(folder)
+        self.cache = cache
+        self.logger = logging.getLogger("motus.rules_watcher")
+        self._stats = self._scan()
+        self._rules: dict[str, list[dict]] = {}
+
+    @property
+    def rules(self) -> list[dict]:
+        """Return all rules, ordered by file name, parsing unseen files."""
+        for name in self._stats:
+            if name not in self._rules:
+                self._rules[name] = self._parse(name)
+        return [rule for name in sorted(self._stats) for rule in self._rules[name]]
+
+    def refresh(self) -> set[str]:
+        """Re-stat the folder, re-parse changed files; return changed names."""
+        stats = self._scan()
+        changed = {
+            name
+            for name in stats.keys() | self._stats.keys()
+            if stats.get(name) != self._stats.get(name)
+        }
+        self._stats = stats
+        for name in changed:
+            previous = self._rules.pop(name, [])
+            if name in stats:
+                self._rules[name] = self._parse(name, previous)
+        return changed
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        stats: dict[str, tuple[int, int]] = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if Path(entry.name).suffix not in RULE_SUFFIXES:
+                    continue
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                stats[entry.name] = (info.st_mtime_ns, info.st_size)
+        return stats
+
+    def _parse(self, name: str, previous: list[dict] | None = None) -> list[dict]:
+        try:
+            return load_rules_from_yaml(self.folder / name, self.cache)
+        except FileNotFoundError:
+            return []
+        except (OSError, yaml.YAMLError):
+            self.logger.exception("Keeping the last good rules of %s", name)
+            return previous or []
 
 
-async def watch_rules_folder(
+def _open_folder_watch(folder: Path, log: logging.Logger) -> FolderWatch | None:
+    if not inotify_available():
+        return None
+    try:
+        return FolderWatch(folder)
+    except OSError:
+        log.warning("inotify unavailable for %s, falling back to polling", folder)
+        return None
+
+
+async def _apply_rules(
+    rules: list[dict],
+    engine: DecisionEngine | None,
+    on_change: Callable[[list[dict]], Awaitable[None]] | None,
+) -> None:
+    if on_change:
+        await on_change(rules)
+    elif engine is not None:
+        await engine.reload(rules)
+
+
+async def watch_rules_folder(  # noqa: PLR0913
     folder: str | Path,
-    engine: DecisionEngine,
+    engine: DecisionEngine | None,
     interval: float = 2.0,
     logger: logging.Logger | None = None,
     on_change: Callable[[list[dict]], Awaitable[None]] | None = None,
+    *,
+    cache: RuleCache | None = None,
 ) -> None:
-    """Periodically watch a rules folder and reload rules on changes."""
+    """Watch a rules folder and reload rules when files change.
+
+    Uses inotify when available and falls back to polling file stats every
+    `interval` seconds. Only files whose mtime or size changed are parsed.
+    The new rules are handed to `on_change` when given (which is then
+    responsible for swapping them into the engine), otherwise they are
+    reloaded into `engine` directly.
+    """
     log = logger or logging.getLogger("motus.rules_watcher")
     if not folder:
         log.warning("Rules watcher disabled: no folder specified")
@@ -67,20 +226,35 @@ async def watch_rules_folder(
         log.error("Rules folder not found: %s", folder_path)
         return
 
-    last_snapshot = _rules_snapshot(folder_path)
-    log.info("Rules watcher active on %s", folder_path)
+    state = await asyncio.to_thread(RulesFolder, folder_path, cache)
+    # Parse every file once now, so a change only re-parses the changed file.
+    await asyncio.to_thread(lambda: state.rules)
+    watch = _open_folder_watch(folder_path, log)
+    mode = "inotify" if watch else f"polling every {interval}s"
+    log.info("Rules watcher active on %s (%s)", folder_path, mode)
 
-    while True:
-        await asyncio.sleep(interval)
-        snapshot = _rules_snapshot(folder_path)
-        if snapshot != last_snapshot:
+    try:
+        while True:
+            if watch is not None:
+                await watch.wait()
+                await asyncio.sleep(_DEBOUNCE_SECONDS)
+                watch.read_names()
+                if watch.folder_gone:
+                    watch.close()
+                    watch = None
+                    log.warning("Rules folder moved or deleted, polling instead")
+            else:
+                await asyncio.sleep(interval)
             try:
-                rules = load_rules_from_folder(folder_path)
+                # Stats and YAML parsing stay off the event loop.
+                changed = await asyncio.to_thread(state.refresh)
             except FileNotFoundError:
                 log.exception("Rules folder missing during watch: %s", folder_path)
-                last_snapshot = []
                 continue
-            engine.rules = rules
-            if on_change:
-                await on_change(rules)
-            last_snapshot = snapshot
+            if not changed:
+                continue
+            log.info("Rule files changed: %s", ", ".join(sorted(changed)))
+            await _apply_rules(state.rules, engine, on_change)
+    finally:
+        if watch is not None:
+            watch.close()
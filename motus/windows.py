@@ -0,0 +1,217 @@
+"""Bounded, time-based state for rules that look beyond a single event.
+
+Per-key state is capped by a key limit, evicting the least recently used
+(or oldest) keys, so the memory a rule uses does not grow with the
+cardinality of the stream. Times are plain floats in seconds from `clock`;
+callers pass `now` explicitly.
+"""
+
+import collections
+import math
+import time
+from collections.abc import Callable, Hashable, Iterator
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+# Default cap on the keys (groups) a single rule tracks.
+MAX_KEYS = 10000
+
+
+def clock() -> float:
+    """Return the current time as seen by every windowed rule state.
+
+    Wall-clock seconds, so aggregate windows line up with event timestamps.
+    """
+    return time.time()
+
+
+class LRUDict(Generic[V]):
+    """Mapping of at most `max_size` keys, evicting the least recently used."""
+
+    __slots__ = ("_data", "max_size")
+
+    def __init__(self, max_size: int) -> None:
+        """Create an empty mapping holding up to `max_size` keys."""
+        if max_size < 1:
+            msg = "max_size must be positive"
+            raise ValueError(msg)
+        self.max_size = max_size
+        self._data: collections.OrderedDict[Hashable, V] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of keys held."""
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over the keys, least recently used first."""
+        return iter(list(self._data))
+
+    def items(self) -> list[tuple[Hashable, V]]:
+        """Return the entries, least recently used first, without using them."""
+        return list(self._data.items())
+
+    def values(self) -> list[V]:
+        """Return the values, least recently used first, without using them."""
+        return list(self._data.values())
+
+    def clear(self) -> None:
+        """Remove every key."""
+        self._data.clear()
+
+    def get(self, key: Hashable) -> V | None:
+        """Return the value of `key` and mark it as recently used."""
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def setdefault(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """Return the value of `key`, creating it with `factory` if missing."""
+        value = self.get(key)
+        if value is None:
+            value = self._data[key] = factory()
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+        return value
+
+    def pop(self, key: Hashable) -> V | None:
+        """Remove `key` and return its value, if any."""
+        return self._data.pop(key, None)
+
+
+class TTLSet:
+    """Remember keys for `ttl` seconds; at most `max_size` of them."""
+
+    __slots__ = ("_expiries", "max_size", "ttl")
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        """Create an empty set whose members expire after `ttl` seconds."""
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expiries: collections.OrderedDict[Hashable, float] = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of remembered keys, expired ones included."""
+        return len(self._expiries)
+
+    def add(self, key: Hashable, now: float) -> bool:
+        """Remember `key`; return False if it is already remembered."""
+        # Keys are inserted in expiry order, so expired ones come first.
+        while self._expiries and next(iter(self._expiries.values())) <= now:
+            self._expiries.popitem(last=False)
+        if key in self._expiries:
+            return False
+        self._expiries[key] = now + self.ttl
+        if len(self._expiries) > self.max_size:
+            self._expiries.popitem(last=False)
+        return True
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding `burst`."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float) -> None:
+        """Start full."""
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, rate: float, burst: float, now: float) -> bool:
+        """Take one token if available."""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class SlidingWindow:
+    """Count, sum and max of values over time, in `buckets` ring slots.
+
+    Time is cut into buckets of `span / buckets` seconds. `add` touches a
+    single slot and keeps running `count` and `total` of the window ending
+    with the latest bucket, so both are O(1) to read; `totals` combines the
+    slots of the `buckets` most recent bucket periods ending at a given one.
+    With one bucket this is a tumbling window.
+    """
+
+    __slots__ = (
+        "_counts",
+        "_epochs",
+        "_latest",
+        "_maxes",
+        "_sums",
+        "buckets",
+        "count",
+        "total",
+        "width",
+    )
+
+    def __init__(self, span: float, buckets: int = 1) -> None:
+        """Create an empty window covering `span` seconds."""
+        self.buckets = buckets
+        self.width = span / buckets
+        self.count = 0
+        self.total = 0.0
+        self._latest = -1
+        self._epochs = [-1] * buckets
+        self._counts = [0] * buckets
+        self._sums = [0.0] * buckets
+        self._maxes = [-math.inf] * buckets
+
+    def epoch(self, now: float) -> int:
+        """Return the number of the bucket period containing `now`."""
+        return int(now // self.width)
+
+    @property
+    def newest(self) -> int:
+        """Return the latest bucket period values were added in (-1 if none)."""
+        return self._latest
+
+    @property
+    def highest(self) -> float:
+        """Return the max of the window ending with the latest bucket."""
+        return self.totals(self._latest)[2]
+
+    def advance(self, now: float) -> None:
+        """Slide the window forward to `now`, expiring the buckets it leaves."""
+        epoch = self.epoch(now)
+        # At most `buckets` slots expire, however long the window sat idle.
+        for stale in range(max(self._latest + 1, epoch - self.buckets + 1), epoch + 1):
+            slot = stale % self.buckets
+            self.count -= self._counts[slot]
+            self.total -= self._sums[slot]
+            self._epochs[slot] = stale
+            self._counts[slot] = 0
+            self._sums[slot] = 0.0
+            self._maxes[slot] = -math.inf
+        self._latest = max(self._latest, epoch)
+
+    def add(self, value: float, now: float) -> None:
+        """Add a value observed at `now`; values older than the window are lost."""
+        self.advance(now)
+        epoch = self.epoch(now)
+        slot = epoch % self.buckets
+        if self._epochs[slot] != epoch:
+            return
+        self._counts[slot] += 1
+        self._sums[slot] += value
+        self._maxes[slot] = max(self._maxes[slot], value)
+        self.count += 1
+        self.total += value
+
+    def totals(self, last_epoch: int) -> tuple[int, float, float]:
+        """Return (count, sum, max) of the window ending with `last_epoch`."""
+        count, total, highest = 0, 0.0, -math.inf
+        first_epoch = last_epoch - self.buckets
+        for slot, epoch in enumerate(self._epochs):
+            if first_epoch < epoch <= last_epoch:
+                count += self._counts[slot]
+                total += self._sums[slot]
+                highest = max(highest, self._maxes[slot])
+        return count, total, highest
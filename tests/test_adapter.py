@@ -4,8 +4,11 @@
 from typing import Any
 
 import pytest
+from aiohttp import ClientResponseError, web
+from aiohttp.test_utils import TestServer
 
 from motus.adapter import OutputAdapter
+from motus.plugins.adapters.http_post import HTTPPostAdapter
 
 
 class DummyAdapter(OutputAdapter):
@@ -23,3 +26,50 @@ async def test_adapter_execute() -> None:
     adapter = DummyAdapter()
     await adapter.execute({}, {})
     assert hasattr(adapter, "executed")
+
+
+@pytest.mark.asyncio
+async def test_http_post_adapter_reuses_session_until_shutdown() -> None:
+    """The HTTP adapter keeps one pooled session across actions."""
+    received: list[dict] = []
+
+    async def collect(request: web.Request) -> web.Response:
+        received.append(await request.json())
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post("/hook", collect)
+    async with TestServer(app) as server:
+        adapter = HTTPPostAdapter(limit_per_host=2)
+        await adapter.startup()
+        session = adapter._session  # noqa: SLF001
+        url = str(server.make_url("/hook"))
+        for value in range(3):
+            await adapter.execute({"url": url}, {"value": value})
+        assert adapter._session is session  # noqa: SLF001
+        await adapter.shutdown()
+        with pytest.raises(RuntimeError, match="shut down"):
+            await adapter.execute({"url": url}, {"value": 3})
+        assert adapter._session is None  # noqa: SLF001
+    assert session.closed
+    assert [body["event"]["value"] for body in received] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_http_post_adapter_raises_on_error_status() -> None:
+    """Non-2xx responses fail the action, so it can be retried."""
+
+    async def unavailable(request: web.Request) -> web.Response:
+        _ = request
+        return web.Response(status=503)
+
+    app = web.Application()
+    app.router.add_post("/hook", unavailable)
+    async with TestServer(app) as server:
+        adapter = HTTPPostAdapter()
+        url = str(server.make_url("/hook"))
+        with pytest.raises(ClientResponseError):
+            await adapter.execute({"url": url}, {})
+        [outcome] = await adapter.execute_batch([({"url": url}, {})])
+        assert isinstance(outcome, ClientResponseError)
+        await adapter.shutdown()
@@ -0,0 +1,142 @@
+# ruff: noqa: S101
+"""Tests for action micro-batching."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from motus.adapter import OutputAdapter
+from motus.batching import ActionBatcher
+from motus.core import DecisionEngine
+
+
+class BatchAdapter(OutputAdapter):
+    """Record the batches it receives, failing actions flagged as bad."""
+
+    supports_batching = True
+
+    def __init__(self) -> None:
+        """Initialize the batch log."""
+        super().__init__()
+        self.batches: list[list[Any]] = []
+
+    async def execute(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Record a single action as a batch of one."""
+        await self.execute_batch([(action, event)])
+
+    async def execute_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]],
+    ) -> list[Exception | None]:
+        """Record the batch and fail items marked bad."""
+        self.batches.append([event["value"] for _, event in items])
+        return [ValueError("bad") if action.get("bad") else None for action, _ in items]
+
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_on_size_and_linger() -> None:
+    """Full batches go out immediately, partial ones after the linger time."""
+    adapter = BatchAdapter()
+    batcher = ActionBatcher(adapter, max_size=2, max_linger=0.01)
+    await asyncio.gather(
+        *(batcher.submit({}, {"value": value}) for value in range(3)),
+    )
+    assert adapter.batches == [[0, 1], [2]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_reports_per_item_failures() -> None:
+    """Only the failing item's caller sees the exception."""
+    adapter = BatchAdapter()
+    batcher = ActionBatcher(adapter, max_size=2, max_linger=1)
+    results = await asyncio.gather(
+        batcher.submit({}, {"value": 1}),
+        batcher.submit({"bad": True}, {"value": 2}),
+        return_exceptions=True,
+    )
+    assert results[0] is None
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_engine_batches_actions_across_events() -> None:
+    """Concurrent events share batches for batch-capable adapters."""
+    adapter = BatchAdapter()
+    rule = {
+        "name": "r",
+        "when": [{"type": "t"}],
+        "then": [{"target": "batch", "batch": True}, {"target": "batch"}],
+    }
+    engine = DecisionEngine([rule], [adapter], batch_size=4, batch_linger=0.01)
+    await asyncio.gather(
+        *(engine.handle_event({"type": "t", "value": value}) for value in range(4)),
+    )
+    # Actions without `batch: true` still go out one by one.
+    assert sorted(adapter.batches, key=len) == [[0], [1], [2], [3], [0, 1, 2, 3]]
+
+
+class BrokenBatchAdapter(BatchAdapter):
+    """Report one outcome too few for every batch."""
+
+    async def execute_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]],
+    ) -> list[Exception | None]:
+        """Drop the last outcome."""
+        return (await super().execute_batch(items))[:-1]
+
+
+@pytest.mark.asyncio
+async def test_batcher_fails_every_caller_of_a_broken_batch() -> None:
+    """No caller is left waiting when a batch cannot report its outcomes."""
+    batcher = ActionBatcher(BrokenBatchAdapter(), max_size=2, max_linger=1)
+    async with asyncio.timeout(1):
+        results = await asyncio.gather(
+            *(batcher.submit({}, {"value": value}) for value in range(2)),
+            return_exceptions=True,
+        )
+    assert [type(result) for result in results] == [type(None), ValueError]
+
+
+@pytest.mark.asyncio
+async def test_batcher_fails_callers_when_cancelled() -> None:
+    """Cancelling a batch in flight completes its callers with an error."""
+    started = asyncio.Event()
+
+    class SlowAdapter(BatchAdapter):
+        async def execute_batch(
+            self,
+            items: list[tuple[dict[str, Any], dict[str, Any]]],
+        ) -> list[Exception | None]:
+            started.set()
+            await asyncio.sleep(10)
+            return await super().execute_batch(items)
+
+    batcher = ActionBatcher(SlowAdapter(), max_size=1, max_linger=1)
+    caller = asyncio.create_task(batcher.submit({}, {"value": 1}))
+    await started.wait()
+    for task in batcher._inflight:  # noqa: SLF001
+        task.cancel()
+    with pytest.raises(RuntimeError, match="cancelled"):
+        await asyncio.wait_for(caller, 1)
+
+
+@pytest.mark.asyncio
+async def test_engine_close_sends_lingering_batches() -> None:
+    """Batched actions still waiting for their batch are sent on close."""
+    adapter = BatchAdapter()
+    rule = {
+        "name": "r",
+        "when": [{"type": "t"}],
+        "then": [{"target": "batch", "batch": True}],
+    }
+    engine = DecisionEngine([rule], [adapter], batch_size=4, batch_linger=60)
+    handling = asyncio.create_task(engine.handle_event({"type": "t", "value": 1}))
+    for _ in range(100):
+        if engine._batchers:  # noqa: SLF001
+            break
+        await asyncio.sleep(0)
+    await engine.close()
+    await asyncio.wait_for(handling, 1)
+    assert adapter.batches == [[1]]
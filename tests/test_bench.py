@@ -0,0 +1,52 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for the built-in benchmark suite."""
+
+import pytest
+
+from motus.bench import (
+    BenchConfig,
+    find_regressions,
+    percentile,
+    run_scenario,
+    synthetic_rules,
+)
+
+TINY = BenchConfig(rules=10, depth=3, events=40, batch=8, memory_sample=5)
+
+
+def test_synthetic_rules_are_reproducible() -> None:
+    """The same seed yields the same nested rules."""
+    assert synthetic_rules(TINY) == synthetic_rules(TINY)
+    condition = synthetic_rules(TINY)[0]["when"][1]
+    assert set(condition) == {"and"}
+
+
+def test_percentile_and_regressions() -> None:
+    """Nearest-rank percentiles feed the baseline comparison."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0
+
+    def report(rate: float, p99: float) -> dict:
+        scenario = {
+            "name": "engine",
+            "events_per_sec": rate,
+            "latency_ms": {"p99": p99},
+        }
+        return {"scenarios": [scenario]}
+
+    assert find_regressions(report(95, 1.0), report(100, 1.0), 0.1) == []
+    problems = find_regressions(report(50, 2.0), report(100, 1.0), 0.1)
+    assert len(problems) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["engine", "webhook-bulk"])
+async def test_scenarios_report_throughput(name: str) -> None:
+    """Scenarios measure every event in-process and over loopback HTTP."""
+    result = await run_scenario(name, TINY)
+    assert result.events == 40
+    assert result.events_per_sec > 0
+    assert result.latency_ms["p50"] <= result.latency_ms["p99"]
+    assert result.memory_peak_bytes > 0
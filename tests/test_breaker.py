@@ -0,0 +1,102 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for per-target circuit breakers."""
+
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from prometheus_client import REGISTRY
+
+from motus import __main__
+from motus.adapter import OutputAdapter
+from motus.breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, CircuitBreaker
+from motus.core import DecisionEngine
+from motus.spool import DeadLetterSpool
+
+
+class UrlAdapter(OutputAdapter):
+    """Adapter whose 'down' URL always fails."""
+
+    plugin_name = "urls"
+
+    def __init__(self) -> None:
+        """Count calls per URL."""
+        super().__init__()
+        self.calls: dict[str, int] = {}
+
+    def breaker_scope(self, action: dict[str, Any]) -> str | None:
+        """Use one breaker per URL."""
+        return action.get("url")
+
+    async def execute(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Fail for the 'down' URL."""
+        _ = event
+        url = action["url"]
+        self.calls[url] = self.calls.get(url, 0) + 1
+        if url == "down":
+            msg = "connection refused"
+            raise ConnectionError(msg)
+
+
+def test_breaker_opens_probes_and_closes() -> None:
+    """Failures open the breaker; a successful probe closes it again."""
+    breaker = CircuitBreaker("t", min_calls=4, window=4, open_for=0)
+    for success in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(success=success, duration=0.01)
+    assert breaker.state == OPEN
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    breaker.record(success=False, duration=0.01)
+    assert breaker.state == OPEN
+
+    assert breaker.allow()
+    breaker.record(success=True, duration=0.01)
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_open_the_breaker() -> None:
+    """Calls over the latency threshold count against the target."""
+    breaker = CircuitBreaker("slow", slow_call=0.1, min_calls=2, open_for=60)
+    breaker.record(success=True, duration=0.2)
+    breaker.record(success=True, duration=0.3)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_open_url_is_shed_without_affecting_others(tmp_path: Path) -> None:
+    """Only the failing URL is short-circuited; its actions are spooled."""
+    rule = {
+        "name": "fanout",
+        "when": [{"type": "t"}],
+        "then": [{"target": "urls", "url": "down"}, {"target": "urls", "url": "up"}],
+    }
+    adapter = UrlAdapter()
+    spool = DeadLetterSpool(tmp_path)
+    engine = DecisionEngine(
+        [rule],
+        [adapter],
+        dead_letters=spool,
+        breakers=BreakerRegistry("spool", min_calls=3, open_for=60),
+    )
+    for _ in range(10):
+        await engine.handle_event({"type": "t"})
+
+    assert adapter.calls == {"down": 3, "up": 10}
+    assert len(spool) == 7
+    assert next(iter(spool))["attempts"] == 0
+    state = REGISTRY.get_sample_value("motus_breaker_state", {"breaker": "urls down"})
+    assert state == 2
+
+
+def test_cli_requires_spool_dir_for_spool_policy(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Breakers are off by default; spooling without a spool is refused."""
+    assert __main__._build_parser().parse_args([]).breaker_policy == "off"  # noqa: SLF001
+    monkeypatch.setattr(sys, "argv", ["motus", "--breaker-policy", "spool"])
+    with pytest.raises(SystemExit):
+        __main__.main()
@@ -0,0 +1,120 @@
+# ruff: noqa: S101
+"""Tests for rule compilation."""
+
+import pytest
+
+from motus import windows
+from motus.compiler import compile_rule, compile_window
+from motus.core import DecisionEngine
+
+
+def test_compile_rule_builds_predicate() -> None:
+    """Compiled predicates honor nested AND/OR and numeric thresholds."""
+    compiled = compile_rule(
+        {
+            "name": "tiers",
+            "when": [
+                {
+                    "or": [
+                        {"and": [{"type": "a"}, {"metadata.size": ">=10"}]},
+                        {"metadata.level": "pro"},
+                    ],
+                },
+            ],
+        },
+    )
+    assert compiled.name == "tiers"
+    assert compiled.predicate({"type": "a", "metadata": {"size": "12"}})
+    assert compiled.predicate({"type": "b", "metadata": {"level": "pro"}})
+    assert not compiled.predicate({"type": "a", "metadata": {"size": 3}})
+    assert not compiled.predicate({"type": "a", "metadata": {"size": "big"}})
+
+
+def test_compile_rule_invalid_threshold_never_matches() -> None:
+    """A comparison with a non-numeric threshold never matches."""
+    compiled = compile_rule({"name": "bad", "when": [{"value": ">abc"}]})
+    assert not compiled.predicate({"value": 1})
+
+
+def test_compile_rule_requires_when_list() -> None:
+    """Rules without a `when` list are rejected at compile time."""
+    with pytest.raises(TypeError):
+        compile_rule({"name": "broken", "when": {"type": "x"}})
+
+
+def test_engine_recompiles_on_rules_assignment() -> None:
+    """Assigning rules on the engine swaps the compiled predicates."""
+    engine = DecisionEngine([{"name": "a", "when": [{"type": "a"}]}], [])
+    assert engine.evaluate_rule(engine.rules[0], {"type": "a"})
+    engine.rules = [{"name": "b", "when": [{"type": "b"}]}]
+    assert [compiled.name for compiled in engine.ruleset.compiled] == ["b"]
+
+
+def test_evaluate_rule_uses_the_compiled_rule_set() -> None:
+    """Rules of the engine keep their window state across evaluate_rule calls."""
+    rule = {"name": "w", "when": [{"window": {"seconds": 60, "threshold": ">1"}}]}
+    engine = DecisionEngine([rule], [])
+    assert not engine.evaluate_rule(engine.rules[0], {})
+    assert engine.evaluate_rule(engine.rules[0], {})
+    assert not engine.evaluate_rule(dict(rule), {})
+
+
+def test_window_conditions_track_groups_over_time() -> None:
+    """Counts and averages slide with time, per group, within the key limit."""
+    clock = [0.0]
+    burst = compile_window(
+        {"seconds": 60, "key": "source", "threshold": ">2", "max_keys": 2},
+        clock=lambda: clock[0],
+    )
+    results = [burst({"source": "a"}) for _ in range(3)]
+    assert results == [False, False, True]
+    assert not burst({"source": "b"})
+    clock[0] = 61.0
+    assert not burst({"source": "a"})
+
+    slow = compile_window(
+        {
+            "function": "avg",
+            "field": "metadata.latency_ms",
+            "seconds": 300,
+            "threshold": ">500",
+        },
+        clock=lambda: clock[0],
+    )
+    clock[0] = 0.0
+    assert slow({"metadata": {"latency_ms": 900}})
+    assert not slow({"metadata": {"latency_ms": 0}})
+    assert not slow({"metadata": {}})
+    clock[0] = 301.0
+    assert not slow({"metadata": {"latency_ms": 400}})
+
+
+def test_window_reads_the_shared_clock_by_default(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without an explicit clock, windows.clock is looked up on every event."""
+    burst = compile_window({"seconds": 60, "threshold": ">1"})
+    monkeypatch.setattr(windows, "clock", lambda: 0.0)
+    assert not burst({})
+    assert burst({})
+    monkeypatch.setattr(windows, "clock", lambda: 120.0)
+    assert not burst({})
+
+
+def test_window_counts_only_events_passing_earlier_conditions() -> None:
+    """A window listed after other conditions only sees their matches."""
+    predicate = compile_rule(
+        {
+            "name": "errors",
+            "when": [{"type": "error"}, {"window": {"seconds": 60, "threshold": ">1"}}],
+        },
+    ).predicate
+    assert not predicate({"type": "error"})
+    assert not predicate({"type": "info"})
+    assert predicate({"type": "error"})
+
+
+def test_window_condition_requires_threshold() -> None:
+    """Malformed window conditions make the rule invalid."""
+    with pytest.raises(TypeError):
+        compile_rule({"name": "bad", "when": [{"window": {"seconds": 60}}]})
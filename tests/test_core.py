@@ -1,9 +1,14 @@
-# ruff: noqa: S101
+# ruff: noqa: S101, PLR2004
 """Decision engine tests."""
 
+import asyncio
+import json
+
 import pytest
 
+from motus import metrics
 from motus.core import DecisionEngine
+from motus.event import Event
 
 
 class DummyAdapter:
@@ -111,3 +116,146 @@ async def test_decision_engine_ignores_malformed_when() -> None:
     adapter.called = False
     await engine.handle_event({"type": "anything"})
     assert adapter.called is False
+
+
+class SlowAdapter:
+    """Sleep before recording the action, optionally failing."""
+
+    fail = False
+
+    def __init__(self, delay: float) -> None:
+        """Configure the execution delay."""
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.done: list[dict] = []
+
+    async def execute(self, action: dict, event: dict) -> None:
+        """Track concurrency, then sleep and record or fail."""
+        _ = event
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                msg = "boom"
+                raise RuntimeError(msg)
+            self.done.append(action)
+        finally:
+            self.in_flight -= 1
+
+
+class FailingAdapter(SlowAdapter):
+    """Raise on every execution."""
+
+    fail = True
+
+
+@pytest.mark.asyncio
+async def test_decision_engine_dispatches_concurrently_and_isolates_failures() -> None:
+    """Actions run concurrently; failures and timeouts do not cancel others."""
+    slow = SlowAdapter(0.05)
+    failing = FailingAdapter(0.0)
+    rules = [
+        {
+            "name": f"r{i}",
+            "when": [{"type": "t"}],
+            "then": [
+                {"target": "slow", "n": i},
+                {"target": "failing"},
+                {"target": "slow", "n": -i, "timeout": 0.01},
+            ],
+        }
+        for i in range(3)
+    ]
+    engine = DecisionEngine(rules, [slow, failing], adapter_concurrency=10)
+    failed_before = metrics.actions_failed._value.get()  # noqa: SLF001
+    started = asyncio.get_running_loop().time()
+    await engine.handle_event({"type": "t"})
+    elapsed = asyncio.get_running_loop().time() - started
+    assert sorted(action["n"] for action in slow.done) == [0, 1, 2]
+    assert slow.peak == 6
+    assert elapsed < 0.15
+    assert metrics.actions_failed._value.get() - failed_before == 6  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_decision_engine_limits_in_flight_actions_per_adapter() -> None:
+    """The per-adapter concurrency limit caps in-flight executions."""
+    slow = SlowAdapter(0.01)
+    rule = {
+        "name": "fanout",
+        "when": [{"type": "t"}],
+        "then": [{"target": "slow"} for _ in range(5)],
+    }
+    engine = DecisionEngine([rule], [slow], adapter_concurrency=2)
+    await engine.handle_event({"type": "t"})
+    assert len(slow.done) == 5
+    assert slow.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_rules_and_adapters_together() -> None:
+    """In-flight events finish on their rule set; decisions carry its version."""
+    saved: list[int | None] = []
+
+    class RecordingPersistence:
+        def save_decision(
+            self,
+            event: dict,
+            rule: dict,
+            *,
+            ruleset_version: int | None = None,
+        ) -> None:
+            _ = (event, rule)
+            saved.append(ruleset_version)
+
+    old_adapter = SlowAdapter(0.05)
+    new_adapter = SlowAdapter(0)
+    rule = {"name": "r", "when": [{"type": "a"}], "then": [{"target": "slow"}]}
+    engine = DecisionEngine([rule], [old_adapter], RecordingPersistence())
+    first = engine.ruleset
+    in_flight = asyncio.create_task(engine.handle_event({"type": "a"}))
+    await asyncio.sleep(0.01)
+    second = await engine.reload(
+        [{**rule, "name": "r2"}],
+        [new_adapter],
+    )
+    await in_flight
+    await engine.handle_event({"type": "a"})
+    assert second.version == first.version + 1
+    assert len(old_adapter.done) == 1
+    assert len(new_adapter.done) == 1
+    assert saved == [first.version, second.version]
+    assert first.adapters == (old_adapter,)
+
+
+@pytest.mark.asyncio
+async def test_adapters_receive_plain_dicts() -> None:
+    """Adapters get a mutable, JSON-serializable dict, not the engine's view."""
+    received: list[object] = []
+
+    class RecordingAdapter(DummyAdapter):
+        plugin_name = "recorder"
+
+        async def execute(self, action: dict, event: dict) -> None:
+            _ = action
+            event["seen"] = True
+            received.append(json.loads(json.dumps(event)))
+
+    rule = {
+        "name": "test",
+        "when": [{"type": "test"}],
+        "then": [{"target": "recorder"}],
+    }
+    engine = DecisionEngine([rule], [RecordingAdapter()])
+    await engine.handle_event(Event({"type": "test"}))
+    assert received == [
+        {
+            "type": "test",
+            "source": None,
+            "metadata": {},
+            "timestamp": None,
+            "seen": True,
+        },
+    ]
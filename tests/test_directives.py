@@ -0,0 +1,122 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for the dedupe_by, rate_limit and aggregate rule directives."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from motus.core import DecisionEngine
+from motus.directives import AGGREGATE_EVENT_TYPE, compile_directives
+from motus.ruleset import build_ruleset
+
+
+class DummyAdapter:
+    """Collect the events actions were executed for."""
+
+    def __init__(self) -> None:
+        """Start with no calls."""
+        self.events: list[Any] = []
+
+    async def execute(self, action: dict, event: Any) -> None:  # noqa: ANN401
+        """Record the event."""
+        _ = action
+        self.events.append(event)
+
+
+def _rule(**directives: object) -> dict:
+    return {
+        "name": "errors",
+        "when": [{"type": "error"}],
+        "then": [{"target": "dummy"}],
+        **directives,
+    }
+
+
+def test_dedupe_and_rate_limit_per_key() -> None:
+    """Repeated keys are dropped within the TTL; buckets refill over time."""
+    gate = compile_directives(
+        _rule(
+            dedupe_by={"key": "metadata.id", "ttl": 10},
+            rate_limit={"limit": 2, "per": 1, "key": "source"},
+        ),
+    )
+    event = {"type": "error", "source": "a", "metadata": {"id": 1}}
+    assert gate.admit(event, 0.0) is None
+    assert gate.admit(event, 5.0) == "dedupe_by"
+    assert gate.admit(event, 10.0) is None
+    other = {"source": "a", "metadata": {"id": 2}}
+    assert gate.admit(other, 10.0) is None
+    assert gate.admit({"source": "a", "metadata": {"id": 3}}, 10.0) == "rate_limit"
+    assert gate.admit({"source": "b", "metadata": {"id": 4}}, 10.0) is None
+
+
+def test_aggregate_emits_closed_windows() -> None:
+    """Tumbling and sliding windows emit one event per key and period."""
+    tumbling = compile_directives(
+        _rule(aggregate={"function": "sum", "field": "value", "window": 10}),
+    ).aggregate
+    assert tumbling.add({"value": 2}, 1.0) == []
+    assert tumbling.add({"value": 3}, 9.0) == []
+    [emitted] = tumbling.add({"value": 5}, 12.0)
+    assert emitted["type"] == AGGREGATE_EVENT_TYPE
+    assert emitted["metadata"]["value"] == 5.0
+    assert emitted["metadata"]["window_end"] == 10.0
+    [emitted] = tumbling.flush(25.0)
+    assert emitted["metadata"]["count"] == 1
+    assert len(tumbling) == 0
+
+    sliding = compile_directives(
+        _rule(aggregate={"window": 10, "slide": 5, "key": "source"}),
+    ).aggregate
+    sliding.add({"source": "a"}, 1.0)
+    sliding.add({"source": "b"}, 6.0)
+    counts = [event["metadata"]["value"] for event in sliding.flush(10.0)]
+    # Windows ending at 5 and 10 for "a", at 10 for "b".
+    assert counts == [1, 1, 1]
+    counts = [event["metadata"]["value"] for event in sliding.flush(15.0)]
+    assert counts == [1]
+
+
+def test_invalid_directive_skips_rule() -> None:
+    """A malformed directive makes the rule invalid, like a bad `when`."""
+    ruleset = build_ruleset(
+        [_rule(rate_limit={"limit": 0}), _rule(aggregate={"function": "avg"})],
+        [],
+        version=1,
+    )
+    assert ruleset.compiled == ()
+
+
+@pytest.mark.asyncio
+async def test_engine_applies_directives() -> None:
+    """Deduplicated matches are dropped; aggregates fire once windows close."""
+    adapter = DummyAdapter()
+    engine = DecisionEngine(
+        [
+            _rule(dedupe_by="metadata.id"),
+            {**_rule(aggregate={"window": 0.05}), "name": "error-count"},
+        ],
+        [adapter],
+    )
+    for _ in range(3):
+        await engine.handle_event({"type": "error", "metadata": {"id": 7}})
+    assert len(adapter.events) == 1
+    await asyncio.sleep(0.15)
+    await engine.close()
+    [aggregate] = adapter.events[1:]
+    assert aggregate["metadata"]["rule"] == "error-count"
+    assert aggregate["metadata"]["value"] == 3
+
+
+@pytest.mark.asyncio
+async def test_engine_emits_open_windows_on_close() -> None:
+    """Closing the engine emits aggregates whose window is still open."""
+    adapter = DummyAdapter()
+    engine = DecisionEngine([_rule(aggregate={"window": 3600})], [adapter])
+    for _ in range(2):
+        await engine.handle_event({"type": "error"})
+    assert adapter.events == []
+    await engine.close()
+    [aggregate] = adapter.events
+    assert aggregate["metadata"]["value"] == 2
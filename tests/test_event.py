@@ -0,0 +1,49 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for the event wrapper."""
+
+import pickle
+
+from motus import serialization
+from motus.compiler import compile_rule
+from motus.event import Event
+
+
+def test_normalized_view_does_not_copy() -> None:
+    """Only standard fields are exposed and nested values are shared."""
+    raw = {"type": "a", "extra": 1, "metadata": {"size_gb": "12"}}
+    event = Event(raw)
+    assert dict(event) == {
+        "type": "a",
+        "source": None,
+        "metadata": {"size_gb": "12"},
+        "timestamp": None,
+    }
+    assert event["metadata"] is raw["metadata"]
+    assert "extra" not in event
+    assert Event({"type": "a"})["metadata"] == {}
+    assert Event(raw, normalize=False)["extra"] == 1
+
+
+def test_lookups_are_memoized_per_event() -> None:
+    """A dotted path is resolved and converted once, however many rules use it."""
+    raw = {"type": "a", "metadata": {"size_gb": "12"}}
+    event = Event(raw)
+    rules = [
+        compile_rule({"name": str(n), "when": [{"metadata.size_gb": f">{n}"}]})
+        for n in range(20)
+    ]
+    assert sum(rule.predicate(event) for rule in rules) == 12
+    raw["metadata"]["size_gb"] = "0"
+    assert event.number(("metadata", "size_gb")) == 12.0
+    assert event.lookup(("metadata", "missing")) is None
+
+
+def test_event_pickles_and_serializes_like_a_dict() -> None:
+    """Events cross process boundaries and encode as JSON objects."""
+    event = Event({"type": "a", "source": "s", "metadata": {"x": 1}})
+    event.lookup(("metadata", "x"))
+    clone = pickle.loads(pickle.dumps(event))  # noqa: S301
+    assert clone == event
+    assert serialization.loads(serialization.dumps({"event": event})) == {
+        "event": event.to_dict(),
+    }
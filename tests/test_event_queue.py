@@ -0,0 +1,74 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for the bounded event queue."""
+
+import asyncio
+
+import pytest
+
+from motus.event_queue import EventQueue, QueueFullError
+
+
+@pytest.mark.asyncio
+async def test_queue_drop_oldest_keeps_newest_events() -> None:
+    """Dropping the oldest event keeps memory bounded."""
+    queue = EventQueue(maxsize=2, policy="drop_oldest", workers=1)
+    for value in range(4):
+        queue.offer({"value": value})
+    assert len(queue) == 2
+
+    seen: list[int] = []
+
+    async def handler(event: dict) -> None:
+        seen.append(event["value"])
+
+    worker = asyncio.create_task(queue.run(handler))
+    await queue.join()
+    worker.cancel()
+    assert seen == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_queue_reject_raises_when_full() -> None:
+    """The reject policy surfaces a QueueFullError to the producer."""
+    queue = EventQueue(maxsize=1, policy="reject")
+    queue.offer({"value": 1})
+    with pytest.raises(QueueFullError):
+        queue.offer({"value": 2})
+    with pytest.raises(QueueFullError):
+        await queue.put({"value": 3})
+
+
+@pytest.mark.asyncio
+async def test_queue_block_applies_backpressure() -> None:
+    """Under the block policy, put waits until there is room."""
+    queue = EventQueue(maxsize=1, policy="block", workers=1)
+    queue.offer({"value": 1})
+    pending = asyncio.create_task(queue.put({"value": 2}))
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    seen: list[int] = []
+
+    async def handler(event: dict) -> None:
+        seen.append(event["value"])
+
+    worker = asyncio.create_task(queue.run(handler))
+    await pending
+    await queue.join()
+    worker.cancel()
+    assert seen == [1, 2]
+
+
+def test_queue_offer_cannot_block() -> None:
+    """The synchronous offer refuses a full blocking queue instead of waiting."""
+    queue = EventQueue(maxsize=1, policy="block")
+    queue.offer({"value": 1})
+    with pytest.raises(QueueFullError):
+        queue.offer({"value": 2})
+    assert len(queue) == 1
+
+
+def test_queue_rejects_unknown_policy() -> None:
+    """Unknown policies are refused at construction time."""
+    with pytest.raises(ValueError, match="Unknown queue policy"):
+        EventQueue(policy="spill")
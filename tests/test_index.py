@@ -0,0 +1,112 @@
+# ruff: noqa: S101
+"""Tests for the rule discrimination index."""
+
+from motus.compiler import compile_rule
+from motus.index import RuleIndex
+
+
+def _names(index: RuleIndex, event: dict) -> list[str]:
+    return [compiled.name for compiled in index.candidates(event)]
+
+
+def test_index_selects_rules_by_equality_and_order() -> None:
+    """Only rules whose required equalities hold are returned, in order."""
+    rules = [
+        compile_rule({"name": "a", "when": [{"type": "alpha"}]}),
+        compile_rule({"name": "any", "when": [{"metadata.x": "y"}]}),
+        compile_rule({"name": "b", "when": [{"type": "beta", "source": "s"}]}),
+        compile_rule({"name": "src", "when": [{"source": "s"}]}),
+    ]
+    index = RuleIndex()
+    index.update(rules)
+    assert _names(index, {"type": "alpha"}) == ["a", "any"]
+    assert _names(index, {"type": "beta", "source": "s"}) == ["any", "b", "src"]
+    assert _names(index, {"type": ["unhashable"]}) == ["any"]
+
+
+def test_index_handles_or_branches() -> None:
+    """OR branches index the union of values shared by every branch."""
+    compiled = compile_rule(
+        {
+            "name": "either",
+            "when": [
+                {
+                    "or": [
+                        {"and": [{"type": "a"}, {"metadata.level": "x"}]},
+                        {"type": "b"},
+                    ],
+                },
+            ],
+        },
+    )
+    assert compiled.equalities == {"type": frozenset({"a", "b"})}
+    mixed = compile_rule(
+        {"name": "mixed", "when": [{"or": [{"type": "a"}, {"source": "s"}]}]},
+    )
+    assert mixed.equalities == {}
+
+
+def test_index_update_is_incremental() -> None:
+    """Updating keeps unchanged rules and drops removed ones."""
+    first = compile_rule({"name": "a", "when": [{"type": "alpha"}]})
+    second = compile_rule({"name": "b", "when": [{"type": "alpha"}]})
+    index = RuleIndex()
+    index.update([first, second])
+    index.update([second])
+    assert len(index) == 1
+    assert _names(index, {"type": "alpha"}) == ["b"]
+
+
+def test_threshold_index_selects_satisfied_tiers() -> None:
+    """Numeric tiers are narrowed with bisects within equality buckets."""
+    tiers = [
+        compile_rule(
+            {
+                "name": f"ge{tier}",
+                "when": [{"type": "data"}, {"metadata.size": f">={tier}"}],
+            },
+        )
+        for tier in (10, 20, 30)
+    ]
+    below = compile_rule({"name": "lt15", "when": [{"metadata.size": "<15"}]})
+    strict = compile_rule({"name": "gt20", "when": [{"metadata.size": ">20"}]})
+    capped = compile_rule({"name": "le20", "when": [{"metadata.size": "<=20"}]})
+    index = RuleIndex()
+    index.update([*tiers, below, strict, capped])
+    assert _names(index, {"type": "data", "metadata": {"size": 20}}) == [
+        "ge10",
+        "ge20",
+        "le20",
+    ]
+    assert _names(index, {"type": "data", "metadata": {"size": "5"}}) == [
+        "lt15",
+        "le20",
+    ]
+    assert _names(index, {"type": "other", "metadata": {"size": 25}}) == ["gt20"]
+    assert _names(index, {"type": "data", "metadata": {"size": "n/a"}}) == []
+    index.update([tiers[0], strict])
+    assert _names(index, {"type": "data", "metadata": {"size": 40}}) == [
+        "ge10",
+        "gt20",
+    ]
+
+
+def test_index_ignores_constraints_after_a_window() -> None:
+    """A window counts every event reaching it; later constraints only match."""
+    window = {"window": {"seconds": 60, "threshold": ">1"}}
+    before = compile_rule({"name": "before", "when": [{"type": "error"}, window]})
+    after = compile_rule(
+        {"name": "after", "when": [window, {"type": "error", "value": ">5"}]},
+    )
+    assert before.equalities == {"type": frozenset({"error"})}
+    assert after.equalities == {}
+    assert after.comparisons == ()
+
+    index = RuleIndex()
+    index.update([before, after])
+    matched = [
+        [c.name for c in index.candidates(event) if c.predicate(event)]
+        for event in ({"type": "info"}, {"type": "error", "value": 9})
+    ]
+    # The info event is counted by "after", so the error crosses ">1" there.
+    assert matched == [[], ["after"]]
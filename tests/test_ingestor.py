@@ -1,7 +1,16 @@
-# ruff: noqa: S101
+# ruff: noqa: S101, PLR2004
 """Tests for ingestors."""
 
-from motus.ingestor import EventIngestor
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from motus.event_queue import EventQueue, QueueFullError
+from motus.ingestor import EventCallback, EventIngestor
+from motus.plugins.ingestors.webhook import WebhookIngestor
 
 
 class DummyIngestor(EventIngestor):
@@ -12,6 +21,20 @@ class DummyIngestor(EventIngestor):
         return
 
 
+class SyncIngestor(EventIngestor):
+    """Ingestor that calls its callback synchronously, as older plugins do."""
+
+    def __init__(self, callback: EventCallback, events: list[dict]) -> None:
+        """Replay `events` on start."""
+        super().__init__(callback)
+        self.events = events
+
+    async def start(self) -> None:
+        """Forward every event without awaiting the callback."""
+        for event in self.events:
+            self.callback(self.normalize_event(event))
+
+
 def test_normalize_event() -> None:
     """Ensure normalization preserves expected fields."""
     ing = DummyIngestor(lambda e: e)
@@ -26,3 +49,184 @@ def test_normalize_event() -> None:
     assert norm["source"] == "bar"
     assert norm["metadata"]["x"] == 1
     assert norm["timestamp"] == "2024-01-01T00:00:00Z"
+
+
+@pytest.mark.asyncio
+async def test_sync_callback_enqueues_events() -> None:
+    """Calling the callback without awaiting it still queues every event."""
+    queue = EventQueue(maxsize=2, policy="block")
+    events = [{"type": "a"}, {"type": "b"}]
+    await SyncIngestor(queue.offer, events).start()
+    assert len(queue) == 2
+    with pytest.raises(QueueFullError):
+        await SyncIngestor(queue.offer, [{"type": "c"}]).start()
+    assert len(queue) == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_for_room() -> None:
+    """Under the block policy, submit waits instead of refusing the event."""
+    queue = EventQueue(maxsize=1, policy="block", workers=1)
+    ingestor = DummyIngestor(queue.offer)
+    ingestor.put_callback = queue.put
+    await ingestor.submit({"type": "a"})
+    pending = asyncio.create_task(ingestor.submit({"type": "b"}))
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    seen: list[str] = []
+
+    async def handler(event: dict) -> None:
+        seen.append(event["type"])
+
+    worker = asyncio.create_task(queue.run(handler))
+    await pending
+    await queue.join()
+    worker.cancel()
+    assert seen == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_when_queue_full() -> None:
+    """A full queue with the reject policy answers with the configured status."""
+    queue = EventQueue(maxsize=1, policy="reject")
+    ingestor = WebhookIngestor(queue.offer, reject_status=429)
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        first = await client.post("/event", json={"type": "a"})
+        second = await client.post("/event", json={"type": "b"})
+    assert first.status == 200
+    assert second.status == 429
+    assert len(queue) == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_refuses_invalid_json() -> None:
+    """A body that is not JSON is a client error, not a server error."""
+    queue = EventQueue(maxsize=1)
+    ingestor = WebhookIngestor(queue.offer)
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        resp = await client.post("/event", data=b'{"type": ')
+        body = await resp.json()
+    assert resp.status == 400
+    assert body["status"] == "invalid"
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_webhook_refuses_non_object_json() -> None:
+    """Only JSON objects are events; arrays and scalars are refused."""
+    queue = EventQueue(maxsize=3)
+    ingestor = WebhookIngestor(queue.offer)
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        statuses = [
+            (await client.post("/event", json=body)).status
+            for body in ([{"type": "a"}], "a", 7)
+        ]
+    assert statuses == [400, 400, 400]
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_parses_streamed_array() -> None:
+    """A JSON array split at awkward chunk boundaries is parsed incrementally."""
+    queue = EventQueue(maxsize=2, policy="reject")
+    ingestor = WebhookIngestor(queue.offer)
+    ingestor.batch_callback = queue.offer_batch
+    body = '[{"type": "é", "metadata": {"n": 12}}, 7, {"type": "b"}, {"type": "c"}]'
+    raw = body.encode()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(raw), 3):
+            yield raw[start : start + 3]
+
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.post("/events", data=chunks())
+        payload = await response.json()
+    assert response.status == 200
+    assert payload["results"] == ["received", "invalid", "received", "rejected"]
+    assert (payload["received"], payload["rejected"], payload["invalid"]) == (2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_bulk_array_splits_around_strings() -> None:
+    """Brackets, commas and escaped quotes inside strings do not split records."""
+    received: list[dict] = []
+    ingestor = WebhookIngestor(received.append)
+    events = [{"type": 'a],[{"\\', "metadata": {"list": [1, {"x": "}"}]}}, {}]
+    raw = json.dumps(events).encode()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(len(raw)):
+            yield raw[start : start + 1]
+
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.post("/events", data=chunks())
+        payload = await response.json()
+    assert payload["results"] == ["received", "received"]
+    assert [dict(event) for event in received] == [
+        {**events[0], "source": None, "timestamp": None},
+        {"type": None, "source": None, "metadata": {}, "timestamp": None},
+    ]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        '{"type": "a"}\n{"type": "' + "x" * 100 + '"}',
+        '{"type": "a"}\n{"type": "' + "x" * 100 + '"}\n',
+    ],
+)
+@pytest.mark.asyncio
+async def test_bulk_endpoint_bounds_record_size(body: str) -> None:
+    """Records over max_event_bytes stop parsing, wherever they end."""
+    received: list[dict] = []
+    ingestor = WebhookIngestor(received.append, max_event_bytes=64)
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.post("/events", data=body)
+        payload = await response.json()
+    assert response.status == 400
+    assert payload["error"] == "Record larger than 64 bytes"
+    assert payload["results"] == ["received"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_bounds_array_bodies() -> None:
+    """JSON arrays are decoded at once, so their whole body is bounded."""
+    received: list[dict] = []
+    ingestor = WebhookIngestor(received.append, max_array_bytes=64)
+    body = json.dumps([{"type": "a"}] * 10)
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.post("/events", data=body)
+        payload = await response.json()
+    assert response.status == 400
+    assert payload["error"] == "JSON array body larger than 64 bytes"
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_accepts_ndjson() -> None:
+    """NDJSON bodies report undecodable lines without dropping the rest."""
+    received: list[dict] = []
+    ingestor = WebhookIngestor(received.append, batch_size=2)
+    body = '{"type": "a"}\n\nnot json\n{"type": "b"}\n{"type": "c"}'
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.post("/events", data=body)
+        payload = await response.json()
+    assert payload["results"] == ["received", "invalid", "received", "received"]
+    assert [event["type"] for event in received] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_reports_malformed_array() -> None:
+    """A broken array is refused as a whole with 400."""
+    received: list[dict] = []
+    ingestor = WebhookIngestor(received.append)
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.post(
+            "/events",
+            data='[{"type": "a"}, {"type": "b"} {"type": "c"}]',
+        )
+        payload = await response.json()
+    assert response.status == 400
+    assert payload["results"] == []
+    assert received == []
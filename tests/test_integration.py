@@ -1,10 +1,21 @@
 # ruff: noqa: S101
 """Integration-level tests for adapter execution."""
 
+import asyncio
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import textwrap
+from pathlib import Path
+
+import aiohttp
 import pytest
 
 from motus.core import DecisionEngine
 from motus.plugins.adapters.dummy import DummyAdapter
+from motus.spool import DeadLetterSpool
 
 
 @pytest.mark.asyncio
@@ -27,3 +38,103 @@ async def test_integration_event_to_action(
         "DummyAdapter: triggered for event type 'integration'" in message
         for message in messages
     )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _post_when_up(url: str, event: dict) -> None:
+    """POST `event` once the server listening at `url` accepts connections."""
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.post(url, json=event) as resp:
+                    resp.raise_for_status()
+                    return
+            except aiohttp.ClientConnectorError:
+                await asyncio.sleep(0.1)
+
+
+@pytest.mark.asyncio
+async def test_sigterm_flushes_pending_work(tmp_path: Path) -> None:
+    """SIGTERM flushes audit rows, open aggregates and pending retries."""
+    port, unreachable = _free_port(), _free_port()
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "rules.yaml").write_text(
+        textwrap.dedent(
+            f"""\
+            name: audit
+            input:
+              type: webhook
+              params:
+                host: 127.0.0.1
+                port: {port}
+            when:
+              - type: ping
+            then:
+              - target: logger
+                message: ping
+            ---
+            name: burst
+            when:
+              - type: burst
+            aggregate:
+              function: count
+              window: 600
+            then:
+              - target: logger
+                message: burst
+            ---
+            name: notify
+            when:
+              - type: notify
+            then:
+              - target: http_post
+                url: http://127.0.0.1:{unreachable}/
+            """,
+        ),
+    )
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "motus",
+        "--rules-folder",
+        str(rules),
+        "--audit-write-behind",
+        "--audit-flush-interval",
+        "600",
+        "--retry-base-delay",
+        "600",
+        "--dead-letter-dir",
+        "spool",
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parents[1])},
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/event"
+        async with asyncio.timeout(20):
+            for kind in ("ping", "burst", "burst", "notify"):
+                await _post_when_up(url, {"type": kind})
+        await asyncio.sleep(1.0)
+        process.send_signal(signal.SIGTERM)
+        assert await asyncio.wait_for(process.wait(), 30) == 0
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    with sqlite3.connect(tmp_path / "motus.db") as conn:
+        names = sorted(
+            name
+            for (name,) in conn.execute(
+                "SELECT r.name FROM decisions d JOIN rules r ON r.hash = d.rule_hash",
+            )
+        )
+    assert names == ["audit", "burst", "notify"]
+    assert len(DeadLetterSpool(tmp_path / "spool")) == 1
@@ -0,0 +1,92 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for engine metrics and the /metrics endpoint."""
+
+from typing import Any
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from prometheus_client import REGISTRY, Counter
+
+from motus import metrics
+from motus.adapter import OutputAdapter
+from motus.core import DecisionEngine
+from motus.plugins.ingestors.webhook import WebhookIngestor
+
+
+class FlakyAdapter(OutputAdapter):
+    """Adapter failing the actions that ask for it."""
+
+    plugin_name = "flaky"
+
+    async def execute(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Raise when the action is marked to fail."""
+        _ = event
+        if action.get("fail"):
+            msg = "boom"
+            raise RuntimeError(msg)
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_bounded_labels_fold_overflow() -> None:
+    """Label values past the limit share one overflow series."""
+    counter = Counter("motus_test_bounded", "Test counter", ["rule"], registry=None)
+    bounded = metrics.BoundedLabels(counter, limit=2)
+    assert bounded.labels("a") is bounded.labels("a")
+    bounded.labels("b").inc()
+    assert bounded.labels("c") is bounded.labels(metrics.OVERFLOW_LABEL)
+    assert bounded.labels("a") is not bounded.labels("c")
+
+
+@pytest.mark.asyncio
+async def test_engine_counts_rules_and_adapter_outcomes() -> None:
+    """Matches are counted per rule and actions per adapter and outcome."""
+    rules = [
+        {"name": "metrics-ok", "when": [{"type": "m"}], "then": [{"target": "flaky"}]},
+        {
+            "name": "metrics-fail",
+            "when": [{"type": "m"}],
+            "then": [{"target": "flaky", "fail": True}],
+        },
+    ]
+    engine = DecisionEngine(rules, [FlakyAdapter()])
+    before = {
+        "ok": _sample("motus_rule_matches_total", rule="metrics-ok"),
+        "success": _sample(
+            "motus_adapter_actions_total",
+            adapter="flaky",
+            outcome="success",
+        ),
+        "failure": _sample(
+            "motus_adapter_actions_total",
+            adapter="flaky",
+            outcome="failure",
+        ),
+        "evaluations": _sample("motus_rule_evaluation_seconds_count"),
+    }
+    await engine.handle_event({"type": "m"})
+    await engine.handle_event({"type": "other"})
+    assert _sample("motus_rule_matches_total", rule="metrics-ok") == before["ok"] + 1
+    assert (
+        _sample("motus_adapter_actions_total", adapter="flaky", outcome="success")
+        == before["success"] + 1
+    )
+    assert (
+        _sample("motus_adapter_actions_total", adapter="flaky", outcome="failure")
+        == before["failure"] + 1
+    )
+    assert _sample("motus_rule_evaluation_seconds_count") == before["evaluations"] + 2
+
+
+@pytest.mark.asyncio
+async def test_webhook_serves_metrics() -> None:
+    """The webhook app can expose /metrics alongside its ingestion routes."""
+    ingestor = WebhookIngestor(lambda _: None, metrics_path="/metrics")
+    async with TestClient(TestServer(ingestor._app)) as client:  # noqa: SLF001
+        response = await client.get("/metrics")
+        body = await response.text()
+    assert response.status == 200
+    assert "motus_event_latency_seconds" in body
+    assert "motus_rule_matches_total" in body
@@ -0,0 +1,239 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for decision persistence."""
+
+import asyncio
+import gzip
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from motus.persistence import Persistence
+
+
+def _count(db_path: Path) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+
+def test_save_decision_writes_immediately(tmp_path: Path) -> None:
+    """Synchronous mode writes each decision right away."""
+    db_path = tmp_path / "audit.db"
+    persistence = Persistence(str(db_path))
+    persistence.save_decision({"type": "a"}, {"name": "r"})
+    assert _count(db_path) == 1
+
+
+@pytest.mark.asyncio
+async def test_write_behind_batches_and_flushes_on_close(tmp_path: Path) -> None:
+    """Write-behind mode flushes by batch size and drains on close."""
+    db_path = tmp_path / "audit.db"
+    persistence = Persistence(
+        str(db_path),
+        write_behind=True,
+        batch_size=3,
+        flush_interval=60,
+    )
+    await persistence.start()
+    for value in range(3):
+        persistence.save_decision({"value": value}, {"name": "r"})
+    for _ in range(50):
+        if _count(db_path) == 3:
+            break
+        await asyncio.sleep(0.01)
+    assert _count(db_path) == 3
+    persistence.save_decision({"value": 3}, {"name": "r"})
+    await persistence.close()
+    assert _count(db_path) == 4
+
+
+def test_write_behind_flushes_synchronously_when_buffer_full(tmp_path: Path) -> None:
+    """Reaching the max buffer size writes inline instead of dropping rows."""
+    db_path = tmp_path / "audit.db"
+    persistence = Persistence(
+        str(db_path),
+        write_behind=True,
+        batch_size=2,
+        max_buffer=2,
+    )
+    persistence.save_decision({"value": 1}, {"name": "r"})
+    assert _count(db_path) == 0
+    persistence.save_decision({"value": 2}, {"name": "r"})
+    assert _count(db_path) == 2
+
+
+def test_failed_flush_keeps_decisions_and_rules(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A failed synchronous write is retried with its rule on the next save."""
+    persistence = Persistence(str(tmp_path / "audit.db"))
+    rule = {"name": "r", "when": [{"type": "a"}]}
+
+    def locked(name: str) -> None:
+        _ = name
+        msg = "database is locked"
+        raise sqlite3.OperationalError(msg)
+
+    monkeypatch.setattr(persistence, "_ensure_partition", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        persistence.save_decision({"n": 1}, rule)
+    monkeypatch.undo()
+    persistence.save_decision({"n": 2}, rule)
+    decisions = persistence.recent_decisions(rule_name="r")
+    assert sorted(d["event"]["n"] for d in decisions) == [1, 2]
+
+
+def test_rules_are_stored_once_and_decisions_decode(tmp_path: Path) -> None:
+    """Decisions reference a single stored rule version and decode as JSON."""
+    db_path = tmp_path / "audit.db"
+    persistence = Persistence(str(db_path))
+    rule = {"name": "r", "when": [{"type": "a"}], "then": [{"target": "dummy"}]}
+    persistence.save_decision({"type": "a", "metadata": {"n": 1}}, rule)
+    persistence.save_decision({"type": "a", "metadata": {"n": 2}}, dict(rule))
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM rules").fetchone()[0] == 1
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    decisions = persistence.recent_decisions(rule_name="r")
+    assert [d["event"]["metadata"]["n"] for d in decisions] == [2, 1]
+    assert decisions[0]["rule"] == rule
+
+
+def test_baseline_database_is_upgraded(tmp_path: Path) -> None:
+    """A database of the unpartitioned release is migrated and vacuumable."""
+    db_path = tmp_path / "audit.db"
+    rule = {"name": "r", "when": [{"type": "a"}]}
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS decisions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event TEXT,
+                rule TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        )
+        conn.executemany(
+            "INSERT INTO decisions (event, rule, timestamp) VALUES (?, ?, ?)",
+            [
+                (str({"type": "a"}), str(rule), "2020-01-01 10:00:00"),
+                ("not a dict", str(rule), "2020-01-02 10:00:00"),
+            ],
+        )
+    conn.close()
+
+    persistence = Persistence(str(db_path), retention_days=7)
+    decisions = persistence.recent_decisions()
+    assert [d["event"] for d in decisions] == ["not a dict", {"type": "a"}]
+    assert all(d["rule"] == rule and d["rule_name"] == "r" for d in decisions)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        tables = {
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'",
+            )
+        }
+    conn.close()
+    assert "decisions_legacy" not in tables
+    assert persistence.maintain() == ["decisions_20200101", "decisions_20200102"]
+    assert _count(db_path) == 0
+
+
+def test_decisions_partitioned_by_day_with_retention(tmp_path: Path) -> None:
+    """Old daily partitions are archived and dropped by maintenance."""
+    db_path = tmp_path / "audit.db"
+    archive = tmp_path / "archive"
+    persistence = Persistence(
+        str(db_path),
+        retention_days=7,
+        archive_dir=str(archive),
+    )
+    rule = {"name": "r", "when": [{"type": "a"}]}
+    persistence.save_decision({"type": "a"}, rule)
+    rule_hash = next(iter(persistence._stored_rules))  # noqa: SLF001
+    persistence._write_rows(  # noqa: SLF001
+        [("2020-01-01 10:00:00", rule_hash, 3, '{"type":"old"}')],
+        [],
+    )
+    assert _count(db_path) == 2
+    with sqlite3.connect(db_path) as conn:
+        tables = {
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'",
+            )
+        }
+    assert "decisions_20200101" in tables
+
+    dropped = persistence.maintain()
+    assert dropped == ["decisions_20200101"]
+    assert _count(db_path) == 1
+    with gzip.open(archive / "decisions_20200101.jsonl.gz", "rt") as handle:
+        records = [json.loads(line) for line in handle]
+    assert records[0]["event"] == {"type": "old"}
+    assert records[0]["rule"] == rule
+    assert records[0]["ruleset_version"] == 3
+
+
+def test_decisions_record_ruleset_version(tmp_path: Path) -> None:
+    """Decisions keep the rule-set version, also on pre-existing partitions."""
+    db_path = tmp_path / "audit.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE decisions_20200101 (id INTEGER PRIMARY KEY, "
+            "timestamp TEXT NOT NULL, rule_hash TEXT NOT NULL, event TEXT NOT NULL)",
+        )
+    persistence = Persistence(str(db_path))
+    persistence.save_decision({"type": "a"}, {"name": "r"}, ruleset_version=7)
+    persistence.save_decision({"type": "b"}, {"name": "r"})
+    versions = [row["ruleset_version"] for row in persistence.recent_decisions()]
+    assert versions == [None, 7]
+
+
+@pytest.mark.asyncio
+async def test_maintenance_survives_archive_errors(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """An archive that cannot be written is logged, not fatal."""
+    blocker = tmp_path / "archive"
+    blocker.write_text("not a folder")
+    persistence = Persistence(
+        str(tmp_path / "audit.db"),
+        retention_days=7,
+        archive_dir=str(blocker),
+    )
+    persistence.save_decision({"type": "a"}, {"name": "r"})
+    rule_hash = next(iter(persistence._stored_rules))  # noqa: SLF001
+    persistence._write_rows(  # noqa: SLF001
+        [("2020-01-01 10:00:00", rule_hash, None, '{"type":"old"}')],
+        [],
+    )
+    await persistence.start()
+    for _ in range(100):
+        if "Audit maintenance failed" in caplog.text:
+            break
+        await asyncio.sleep(0.01)
+    assert "Audit maintenance failed" in caplog.text
+    assert not persistence._maintainer.done()  # noqa: SLF001
+    await persistence.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_after_a_failed_task(tmp_path: Path) -> None:
+    """Buffered rows are written even if a background task had crashed."""
+    db_path = tmp_path / "audit.db"
+    persistence = Persistence(str(db_path), write_behind=True)
+
+    async def crash() -> None:
+        raise RuntimeError
+
+    persistence._flusher = asyncio.create_task(crash())  # noqa: SLF001
+    await asyncio.sleep(0)
+    persistence.save_decision({"type": "a"}, {"name": "r"})
+    await persistence.close()
+    assert _count(db_path) == 1
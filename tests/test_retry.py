@@ -0,0 +1,102 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for background retries of failed actions."""
+
+import asyncio
+import random
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from motus.adapter import OutputAdapter
+from motus.core import DecisionEngine
+from motus.event import Event
+from motus.retry import RetryPolicy
+from motus.spool import DeadLetterSpool
+from motus.tracing import Tracer
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+RULE = {"name": "r", "when": [{"type": "t"}], "then": [{"target": "failing"}]}
+
+
+class FailingAdapter(OutputAdapter):
+    """Adapter failing its first `failures` calls."""
+
+    plugin_name = "failing"
+
+    def __init__(self, failures: int) -> None:
+        """Fail that many times before succeeding."""
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    async def execute(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Raise until the configured failures are used up."""
+        _ = (action, event)
+        self.calls += 1
+        if self.calls <= self.failures:
+            msg = "downstream unavailable"
+            raise ConnectionError(msg)
+
+
+async def _settle(engine: DecisionEngine) -> None:
+    while len(engine.retries):  # noqa: ASYNC110 - polls a plain counter
+        await asyncio.sleep(0.005)
+
+
+def test_backoff_grows_with_jitter_and_cap() -> None:
+    """Delays double per retry, stay under the cap and only shrink by jitter."""
+    policy = RetryPolicy(base_delay=1, max_delay=3, jitter=0.5)
+    rng = random.Random(0)  # noqa: S311
+    assert 0.5 <= policy.delay(1, rng) <= 1
+    assert 1 <= policy.delay(2, rng) <= 2
+    assert 1.5 <= policy.delay(5, rng) <= 3
+
+
+@pytest.mark.asyncio
+async def test_failed_action_is_retried_in_background() -> None:
+    """The event completes at once while the action succeeds on a retry."""
+    adapter = FailingAdapter(failures=2)
+    engine = DecisionEngine([RULE], [adapter], retry_policy=FAST)
+    await engine.handle_event({"type": "t"})
+    assert adapter.calls == 1
+    await asyncio.wait_for(_settle(engine), 2)
+    assert adapter.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_are_not_traced_under_the_failed_event() -> None:
+    """Retry spans do not pile up on the trace of the first failed event."""
+    tracer = Tracer(slow_threshold=60)
+    adapter = FailingAdapter(failures=2)
+    engine = DecisionEngine([RULE], [adapter], retry_policy=FAST, tracer=tracer)
+    with tracer.event({"type": "t"}) as root:
+        await engine._handle_event(Event({"type": "t"}), engine.ruleset)  # noqa: SLF001
+    await asyncio.wait_for(_settle(engine), 2)
+    assert adapter.calls == 3
+    assert sum(span.name == "execute" for span in root.walk()) == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_action_is_dead_lettered_and_replayed(tmp_path: Path) -> None:
+    """Hopeless actions are spooled and succeed on a later replay."""
+    adapter = FailingAdapter(failures=3)
+    spool = DeadLetterSpool(tmp_path)
+    engine = DecisionEngine(
+        [RULE],
+        [adapter],
+        retry_policy=FAST,
+        dead_letters=spool,
+    )
+    await engine.handle_event({"type": "t", "source": "s"})
+    await asyncio.wait_for(_settle(engine), 2)
+    (record,) = list(spool)
+    assert record["adapter"] == "failing"
+    assert record["attempts"] == 3
+    assert record["event"] == {"type": "t", "source": "s"}
+    assert "downstream unavailable" in record["error"]
+
+    assert await engine.replay_dead_letters() == 1
+    assert adapter.calls == 4
+    assert len(spool) == 0
+    await engine.close()
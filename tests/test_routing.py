@@ -0,0 +1,55 @@
+# ruff: noqa: S101
+"""Tests for target routing."""
+
+import logging
+
+import pytest
+
+from motus.core import DecisionEngine
+from motus.routing import build_routes, resolve_target, rule_targets
+
+
+class DummyAdapter:
+    """Adapter matched by class-name prefix."""
+
+
+class DummyAdapterTwo:
+    """Second adapter sharing the `dummy` prefix."""
+
+
+class Named:
+    """Adapter matched by its registered plugin name."""
+
+    plugin_name = "named"
+
+
+def test_resolve_target_prefers_exact_matches() -> None:
+    """Exact plugin names win; ambiguous prefixes resolve to one adapter."""
+    first, second, named = DummyAdapter(), DummyAdapterTwo(), Named()
+    adapters = [first, second, named]
+    assert resolve_target("Named", adapters) == (named,)
+    assert resolve_target("dummyadaptertwo", adapters) == (second,)
+    assert resolve_target("dummy", adapters) == (first,)
+    assert resolve_target("missing", adapters) == ()
+
+
+def test_build_routes_reports_unresolved_targets() -> None:
+    """Targets without adapters are listed when routes are built."""
+    rules = [
+        {"then": [{"target": "named"}, {"target": "ghost"}]},
+        {"then": "not-a-list"},
+    ]
+    routes, unresolved = build_routes(rule_targets(rules), [Named()])
+    assert list(routes) == ["named", "ghost"]
+    assert unresolved == ["ghost"]
+
+
+def test_engine_reports_unresolved_targets_at_load(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """The engine warns about unresolved targets when rules are loaded."""
+    rule = {"name": "r", "when": [{"type": "t"}], "then": [{"target": "ghost"}]}
+    with caplog.at_level(logging.WARNING, logger="motus.core"):
+        engine = DecisionEngine([rule], [Named()])
+    assert engine.unresolved_targets == ["ghost"]
+    assert any("ghost" in record.message for record in caplog.records)
@@ -0,0 +1,18 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for rule set snapshots."""
+
+from motus.ruleset import build_ruleset
+
+RULE = {"name": "r", "when": [{"type": "t"}], "then": []}
+
+
+def test_duplicate_rules_are_reused_or_compiled_once_each() -> None:
+    """A rule listed twice loads on first build and on every rebuild."""
+    first = build_ruleset([RULE, RULE], [], version=1)
+    assert len(first.compiled) == 2
+    assert first.compiled[0] is not first.compiled[1]
+
+    second = build_ruleset([RULE, dict(RULE), RULE], [], version=2, previous=first)
+    assert len({id(compiled) for compiled in second.compiled}) == 3
+    assert set(first.compiled) < set(second.compiled)
+    assert len(second.index.candidates({"type": "t"})) == 3
@@ -0,0 +1,46 @@
+# ruff: noqa: S101
+"""Tests for the JSON serialization layer."""
+
+from datetime import date
+
+import pytest
+
+from motus import serialization
+
+
+@pytest.fixture(params=["default", "stdlib"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run each test with the detected backend and with the stdlib fallback."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+@pytest.mark.usefixtures("backend")
+def test_round_trip_is_compact() -> None:
+    """Encoded output is compact and decodes from bytes or text."""
+    value = {"type": "a", "metadata": {"n": [1, 2.5, None, True]}}
+    encoded = serialization.dumps(value)
+    assert isinstance(encoded, bytes)
+    assert b" " not in encoded
+    assert serialization.loads(encoded) == value
+    assert serialization.loads(serialization.dumps_text(value)) == value
+    assert serialization.loads(memoryview(encoded)) == value
+
+
+@pytest.mark.usefixtures("backend")
+def test_unknown_types_and_keys_match_stdlib() -> None:
+    """Dates fall back to str and non-string keys become strings."""
+    value = {"when": date(2024, 1, 2), 1: "x", "big": 2**70}
+    assert serialization.loads(serialization.dumps(value)) == {
+        "when": "2024-01-02",
+        "1": "x",
+        "big": 2**70,
+    }
+
+
+@pytest.mark.usefixtures("backend")
+def test_malformed_input_raises_value_error() -> None:
+    """Both backends report malformed input as ValueError."""
+    with pytest.raises(ValueError, match=r"."):
+        serialization.loads(b"{nope")
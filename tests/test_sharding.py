@@ -0,0 +1,78 @@
+# ruff: noqa: S101
+"""Tests for sharding events across engine processes."""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from motus import __main__, metrics
+from motus.event_queue import QueueFullError
+from motus.sharding import ShardRouter, shard_for
+
+
+def test_shard_for_is_stable_per_key() -> None:
+    """Events sharing the partition key always map to the same shard."""
+    path = ("metadata", "tenant")
+    first = shard_for({"metadata": {"tenant": "acme"}, "type": "a"}, path, 8)
+    second = shard_for({"metadata": {"tenant": "acme"}, "type": "b"}, path, 8)
+    assert first == second
+    spread = {shard_for({"metadata": {"tenant": n}}, path, 8) for n in range(64)}
+    assert len(spread) > 1
+
+
+@pytest.mark.asyncio
+async def test_router_rejects_when_shard_full() -> None:
+    """The reject policy raises once the shard queue is full."""
+    inbox = multiprocessing.get_context("spawn").Queue(1)
+    router = ShardRouter([inbox], policy="reject")
+    router.offer({"source": "a"})
+    with pytest.raises(QueueFullError):
+        router.offer({"source": "a"})
+
+
+@pytest.mark.asyncio
+async def test_router_blocks_and_keeps_order() -> None:
+    """Blocked producers enqueue in arrival order once room frees up."""
+    inbox = multiprocessing.get_context("spawn").Queue(1)
+    router = ShardRouter([inbox], policy="block")
+    router.offer({"source": "a", "n": 0})
+    pending = [asyncio.create_task(router.put({"source": "a", "n": n})) for n in (1, 2)]
+    await asyncio.sleep(0)
+    assert not any(task.done() for task in pending)
+    with pytest.raises(QueueFullError):
+        router.offer({"source": "a", "n": 3})
+    received = [(await asyncio.to_thread(inbox.get, timeout=2))["n"] for _ in range(3)]
+    await asyncio.gather(*pending)
+    assert received == [0, 1, 2]
+
+
+def test_workers_audit_to_their_own_database() -> None:
+    """Each worker gets its own SQLite file and archive folder."""
+    audit = {"write_behind": True, "archive_dir": "archive"}
+    settings = __main__._shard_audit(audit, 2)  # noqa: SLF001
+    assert settings["db_path"] == "motus-shard-2.db"
+    assert settings["archive_dir"] == str(Path("archive") / "shard-2")
+    assert settings["write_behind"] is True
+    assert __main__._shard_audit({}, 0)["archive_dir"] is None  # noqa: SLF001
+
+
+def test_multiprocess_metrics_reexecute_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The process re-executes its original command line with the variable set."""
+    calls: list[tuple[str, list[str]]] = []
+    monkeypatch.setattr(__main__.os, "execv", lambda *args: calls.append(args))
+    monkeypatch.setattr(sys, "orig_argv", ["python", "-X", "dev", "-m", "motus"])
+    monkeypatch.setenv(metrics.MULTIPROC_ENV, "")
+    try:
+        __main__._enable_multiprocess_metrics()  # noqa: SLF001
+        assert calls == [(sys.executable, ["python", "-X", "dev", "-m", "motus"])]
+        folder = Path(os.environ[metrics.MULTIPROC_ENV])
+        assert folder.is_dir()
+        __main__._enable_multiprocess_metrics()  # noqa: SLF001
+        assert len(calls) == 1
+    finally:
+        __main__._cleanup_multiprocess_metrics()  # noqa: SLF001
+    assert not folder.exists()
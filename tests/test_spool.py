@@ -0,0 +1,46 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for the dead-letter spool."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from motus.spool import DeadLetterSpool
+
+
+def test_segments_roll_and_survive_reopen(tmp_path: Path) -> None:
+    """Records are appended across segments and read back after a restart."""
+    spool = DeadLetterSpool(tmp_path, segment_bytes=20)
+    for number in range(4):
+        spool.append({"n": number, "pad": "x" * 10})
+    spool.close()
+    assert len(spool.segments()) == 4
+    with spool.segments()[-1].open("ab") as segment:
+        segment.write(b'{"n": 99')  # torn by a crash mid-append
+
+    reopened = DeadLetterSpool(tmp_path, segment_bytes=20)
+    reopened.append({"n": 4})
+    assert [record["n"] for record in reopened] == [0, 1, 2, 3, 4]
+    assert len(reopened.segments()) == 5
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_rejected_records(tmp_path: Path) -> None:
+    """Records the handler refuses are kept for the next replay."""
+    spool = DeadLetterSpool(tmp_path)
+    for number in range(3):
+        spool.append({"n": number})
+    seen: list[int] = []
+
+    async def handler(record: dict[str, Any]) -> bool:
+        seen.append(record["n"])
+        if record["n"] == 2:
+            msg = "still down"
+            raise RuntimeError(msg)
+        return record["n"] == 0
+
+    assert await spool.replay(handler) == 1
+    assert seen == [0, 1, 2]
+    assert [record["n"] for record in spool] == [1, 2]
+    assert len(spool.segments()) == 1
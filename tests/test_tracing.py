@@ -0,0 +1,92 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for per-event tracing and the debug endpoints."""
+
+import asyncio
+import logging
+from typing import Any
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from motus import tracing
+from motus.adapter import OutputAdapter
+from motus.core import DecisionEngine
+
+
+class SleepyAdapter(OutputAdapter):
+    """Adapter taking a fixed time per action."""
+
+    plugin_name = "sleepy"
+
+    async def execute(self, action: dict[str, Any], event: dict[str, Any]) -> None:
+        """Sleep for the delay requested by the action."""
+        _ = event
+        await asyncio.sleep(action.get("delay", 0))
+
+
+def _rule(name: str, delay: float) -> dict[str, Any]:
+    return {
+        "name": name,
+        "when": [{"type": "t"}],
+        "then": [{"target": "sleepy", "delay": delay}],
+    }
+
+
+def test_span_is_noop_outside_a_trace() -> None:
+    """Stages outside a traced event record nothing."""
+    with tracing.span("evaluate") as opened:
+        assert opened is None
+
+
+@pytest.mark.asyncio
+async def test_slow_event_names_dominant_rule_and_adapter(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Slow events are logged and kept with their span tree."""
+    tracer = tracing.Tracer(slow_threshold=0.02)
+    engine = DecisionEngine(
+        [_rule("quick", 0), _rule("slow", 0.05)],
+        [SleepyAdapter()],
+        tracer=tracer,
+    )
+    with caplog.at_level(logging.WARNING, logger="motus.tracing"):
+        await engine.handle_event({"type": "t"})
+        await engine.handle_event({"type": "none"})
+
+    assert "rule 'slow'" in caplog.text
+    assert "adapter 'sleepy'" in caplog.text
+    slowest, fastest = tracer.slowest(2)
+    assert slowest["rule"] == "slow"
+    assert slowest["ms"] >= 50
+    assert fastest["rule"] is None
+    stages = [child["name"] for child in slowest["trace"]["children"]]
+    assert stages == ["evaluate", "trigger_actions", "trigger_actions"]
+    evaluated = slowest["trace"]["children"][0]["children"]
+    assert [(span["name"], span["rule"]) for span in evaluated] == [
+        ("evaluate_rule", "quick"),
+        ("evaluate_rule", "slow"),
+    ]
+    assert slowest["trace"]["children"][2]["children"][0]["adapter"] == "sleepy"
+
+
+@pytest.mark.asyncio
+async def test_debug_endpoints() -> None:
+    """Slow traces and loop profiles are served as JSON."""
+    tracer = tracing.Tracer(slow_threshold=10)
+    engine = DecisionEngine([_rule("r", 0)], [SleepyAdapter()], tracer=tracer)
+    await engine.handle_event({"type": "t"})
+    app = web.Application()
+    tracing.add_debug_routes(app, tracer)
+    async with TestClient(TestServer(app)) as client:
+        slow = await (await client.get("/debug/slow?limit=5")).json()
+        profile = await client.get("/debug/profile?seconds=0.05&interval=0.001")
+        body = await profile.json()
+        for query in ("limit=abc", "limit=-1", "limit=0"):
+            assert (await client.get(f"/debug/slow?{query}")).status == 400
+        for query in ("seconds=x", "interval=inf", "interval=-1"):
+            assert (await client.get(f"/debug/profile?{query}")).status == 400
+    assert slow[0]["rule"] == "r"
+    assert slow[0]["event"] == {"type": "t"}
+    assert body["samples"] > 0
+    assert body["stacks"]
@@ -1,12 +1,21 @@
 # ruff: noqa: S101
 """Tests for rule loading and stack building utilities."""
 
+import asyncio
+import threading
 from pathlib import Path
 
 import pytest
 
 from motus import __main__
-from motus.utils import load_rules_from_folder
+from motus.core import DecisionEngine
+from motus.utils import (
+    RuleCache,
+    RulesFolder,
+    load_rules_from_folder,
+    load_rules_from_yaml,
+    watch_rules_folder,
+)
 
 
 def test_load_rules_from_folder_raises_on_missing(tmp_path: Path) -> None:
@@ -73,3 +82,128 @@ def test_build_stack_from_rules_missing_adapter_raises() -> None:
     ]
     with pytest.raises(RuntimeError):
         __main__.build_stack_from_rules(rules)
+
+
+def test_rules_folder_reparses_only_changed_files(tmp_path: Path) -> None:
+    """Refreshing re-parses changed files and keeps others untouched."""
+    (tmp_path / "a.yaml").write_text("name: a\nwhen: []\nthen: []\n")
+    (tmp_path / "b.yaml").write_text("name: b\nwhen: []\nthen: []\n")
+    state = RulesFolder(tmp_path)
+    first = state.rules
+    assert [rule["name"] for rule in first] == ["a", "b"]
+
+    (tmp_path / "b.yaml").write_text("name: b2\nwhen: []\nthen: []\n")
+    (tmp_path / "c.yml").write_text("name: c\nwhen: []\nthen: []\n")
+    (tmp_path / "a.yaml").unlink()
+    assert state.refresh() == {"a.yaml", "b.yaml", "c.yml"}
+    assert [rule["name"] for rule in state.rules] == ["b2", "c"]
+
+    (tmp_path / "c.yml").touch()
+    unchanged = state.rules[0]
+    state.refresh()
+    assert state.rules[0] is unchanged
+
+
+def test_rules_folder_keeps_last_good_rules_on_yaml_error(tmp_path: Path) -> None:
+    """A broken edit keeps the file's previous rules instead of raising."""
+    (tmp_path / "a.yaml").write_text("name: a\nwhen: []\nthen: []\n")
+    (tmp_path / "b.yaml").write_text("name: b: [\n")
+    state = RulesFolder(tmp_path)
+    assert [rule["name"] for rule in state.rules] == ["a"]
+
+    (tmp_path / "a.yaml").write_text("name: [a\n")
+    assert state.refresh() == {"a.yaml"}
+    assert [rule["name"] for rule in state.rules] == ["a"]
+
+    (tmp_path / "a.yaml").write_text("name: a2\nwhen: []\nthen: []\n")
+    state.refresh()
+    assert [rule["name"] for rule in state.rules] == ["a2"]
+
+
+def test_rule_cache_skips_parsing_unchanged_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Cached files are served without parsing until their content changes."""
+    rules_file = tmp_path / "a.yaml"
+    rules_file.write_text("name: a\nwhen: []\nthen: []\n")
+    cache = RuleCache(tmp_path / "cache")
+    assert load_rules_from_yaml(rules_file, cache)[0]["name"] == "a"
+
+    def fail(_content: bytes) -> list[dict]:
+        raise AssertionError
+
+    monkeypatch.setattr("motus.utils._parse_yaml", fail)
+    assert load_rules_from_yaml(rules_file, RuleCache(tmp_path / "cache")) == [
+        {"name": "a", "when": [], "then": []},
+    ]
+
+    monkeypatch.undo()
+    rules_file.write_text("name: b\nwhen: []\nthen: []\n")
+    assert load_rules_from_yaml(rules_file, cache)[0]["name"] == "b"
+
+
+def test_rule_cache_ignores_non_json_documents(tmp_path: Path) -> None:
+    """Documents that do not round-trip through JSON are not cached."""
+    rules_file = tmp_path / "a.yaml"
+    rules_file.write_text("name: a\nsince: 2024-01-01\nwhen: []\nthen: []\n")
+    cache = RuleCache(tmp_path / "cache")
+    rules = load_rules_from_yaml(rules_file, cache)
+    assert load_rules_from_yaml(rules_file, cache) == rules
+    assert not list((tmp_path / "cache").glob("*.json"))
+
+
+@pytest.mark.asyncio
+async def test_watch_rules_folder_reloads_engine(tmp_path: Path) -> None:
+    """File changes are handed to the change callback, which swaps them in."""
+    (tmp_path / "a.yaml").write_text(
+        "name: a\nwhen:\n  - type: x\nthen:\n  - target: dummy\n",
+    )
+    engine = DecisionEngine(load_rules_from_folder(tmp_path), [])
+    reloaded = asyncio.Event()
+
+    async def on_change(rules: list[dict]) -> None:
+        await engine.reload(rules)
+        reloaded.set()
+
+    watcher = asyncio.create_task(
+        watch_rules_folder(tmp_path, engine, interval=0.05, on_change=on_change),
+    )
+    await asyncio.sleep(0.1)
+    (tmp_path / "b.yaml").write_text(
+        "name: b\nwhen:\n  - type: y\nthen:\n  - target: dummy\n",
+    )
+    await asyncio.wait_for(reloaded.wait(), timeout=2)
+    watcher.cancel()
+    assert [rule["name"] for rule in engine.rules] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_watch_rules_folder_refreshes_off_the_loop(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Folder scans and rule parsing run in a worker thread."""
+    (tmp_path / "a.yaml").write_text("name: a\nwhen: []\nthen: []\n")
+    threads: list[int] = []
+    refresh = RulesFolder.refresh
+
+    def recording_refresh(self: RulesFolder) -> set[str]:
+        threads.append(threading.get_ident())
+        return refresh(self)
+
+    monkeypatch.setattr(RulesFolder, "refresh", recording_refresh)
+    changed = asyncio.Event()
+
+    async def on_change(_rules: list[dict]) -> None:
+        changed.set()
+
+    watcher = asyncio.create_task(
+        watch_rules_folder(tmp_path, None, interval=0.05, on_change=on_change),
+    )
+    await asyncio.sleep(0.1)
+    (tmp_path / "b.yaml").write_text("name: b\nwhen: []\nthen: []\n")
+    await asyncio.wait_for(changed.wait(), timeout=2)
+    watcher.cancel()
+    assert threads
+    assert threading.get_ident() not in threads
@@ -0,0 +1,41 @@
+# ruff: noqa: S101, PLR2004
+"""Tests for the bounded, time-based rule state."""
+
+from motus.windows import LRUDict, SlidingWindow, TokenBucket, TTLSet
+
+
+def test_lru_dict_and_ttl_set_are_bounded() -> None:
+    """The least recently used or oldest keys are evicted."""
+    lru: LRUDict[int] = LRUDict(2)
+    lru.setdefault("a", lambda: 1)
+    lru.setdefault("b", lambda: 2)
+    lru.get("a")
+    lru.setdefault("c", lambda: 3)
+    assert list(lru) == ["a", "c"]
+    assert lru.items() == [("a", 1), ("c", 3)]
+    lru.setdefault("d", lambda: 4)
+    assert lru.values() == [3, 4]
+
+    seen = TTLSet(ttl=5, max_size=2)
+    assert seen.add("a", 0)
+    assert not seen.add("a", 1)
+    assert seen.add("b", 1)
+    assert seen.add("c", 2)
+    assert len(seen) == 2
+    assert seen.add("a", 3)
+
+
+def test_token_bucket_and_sliding_window() -> None:
+    """Tokens refill at the rate; the window only sums its recent buckets."""
+    bucket = TokenBucket(burst=1, now=0)
+    assert bucket.take(1, 1, 0)
+    assert not bucket.take(1, 1, 0.5)
+    assert bucket.take(1, 1, 1.5)
+
+    window = SlidingWindow(span=10, buckets=2)
+    window.add(1, 1)
+    window.add(4, 6)
+    assert window.totals(1) == (2, 5.0, 4.0)
+    window.add(2, 11)
+    assert window.totals(2) == (2, 6.0, 4.0)
+    assert window.newest == 2